@@ -0,0 +1,93 @@
+"""
+Benchmark for the on-disk cache format
+Compares the JSON cache files (daily news pretty-printed, search cache compact) with the packed
+format (msgpack + zstd records behind a header index): file size, full load, and reading one
+key (one ranked story / one topic's headlines), using the committed cache files as data
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.packed import PackedReader, pack, unpack_file
+
+BACKEND = Path(__file__).parent.parent
+
+
+def timed(call, repeat: int) -> float:
+    """Mean milliseconds per call"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def compare(label: str, json_path: Path, packed_path: Path, key: str, json_lookup, repeat: int):
+    def json_load():
+        with open(json_path, 'r') as f:
+            return json.load(f)
+
+    def json_one():
+        return json_lookup(json_load(), key)
+
+    json_size = json_path.stat().st_size
+    packed_size = packed_path.stat().st_size
+    rows = [
+        ("json", json_size, timed(json_load, repeat), timed(json_one, repeat)),
+        ("packed", packed_size, timed(lambda: unpack_file(packed_path), repeat),
+         timed(lambda: PackedReader(packed_path).get(key), repeat)),
+    ]
+    print(f"\n{label}")
+    print(f"  {'format':<8} {'size':>10} {'full load':>12} {'one key':>12}")
+    for name, size, load_ms, lookup_ms in rows:
+        print(f"  {name:<8} {size:>9,}B {load_ms:>10.3f}ms {lookup_ms:>10.3f}ms")
+    (_, _, json_load_ms, json_one_ms), (_, _, packed_load_ms, packed_one_ms) = rows
+    print(f"  packed: {json_size / packed_size:.1f}x smaller, load {json_load_ms / packed_load_ms:.1f}x, "
+          f"one key {json_one_ms / packed_one_ms:.1f}x faster")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--topics", type=int, default=500,
+                        help="Search cache topics (the committed ones repeated up to SEARCH_CACHE_MAX_ENTRIES)")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="bench-cache-format-"))
+
+    # Daily news as save_daily_news wrote it (indent=2) vs a packed snapshot keyed by rank
+    with open(BACKEND / "daily_news_cache.json", 'r') as f:
+        daily = json.load(f)
+    daily_json = workdir / "daily_news_cache.json"
+    daily_json.write_text(json.dumps(daily, indent=2))
+    daily_packed = workdir / "daily_news_cache.pack"
+    daily_packed.write_bytes(pack(
+        {key: value for key, value in daily.items() if key != "news"},
+        {str(rank): story for rank, story in enumerate(daily["news"], start=1)},
+    ))
+    compare(f"daily news ({len(daily['news'])} stories), one key = story #5", daily_json, daily_packed, "5",
+            lambda data, key: data["news"][int(key) - 1], args.repeat)
+
+    # Search cache as the write-behind wrote it (compact JSON) vs packed, one record per topic
+    with open(BACKEND / "search_cache.json", 'r') as f:
+        recorded = list(json.load(f).items())
+    searches = {}
+    for i in range(max(args.topics, len(recorded))):
+        topic, entry = recorded[i % len(recorded)]
+        searches[topic if i < len(recorded) else f"{topic} {i}"] = entry
+    search_json = workdir / "search_cache.json"
+    search_json.write_text(json.dumps(searches, separators=(',', ':')))
+    search_packed = workdir / "search_cache.pack"
+    search_packed.write_bytes(pack({}, searches))
+    key = list(searches)[len(searches) // 2]
+    compare(f"search cache ({len(searches)} topics), one key = one topic's headlines", search_json, search_packed,
+            key, lambda data, key: data[key], args.repeat)
+
+
+if __name__ == "__main__":
+    main()
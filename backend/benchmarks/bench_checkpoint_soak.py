@@ -0,0 +1,84 @@
+"""
+Soak benchmark for agent checkpoint retention
+Runs thousands of analyses against a fake chat model and search tool and reports
+process RSS and checkpoint store size for each AGENT_CHECKPOINT_MODE.
+Exits with status 1 if RSS grows by more than the budget after warm-up in any mode but "unbounded".
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agent import NewsAnalysisAgent
+from src.checkpointing import CHECKPOINT_MODES
+from src.telemetry import current_rss_bytes
+from src.fakes import FakeChatModel, FakeSearchProvider
+from src.tools import SharedTavilySearch
+
+
+# The one mode expected to grow without limit
+GROWING_MODES = {"unbounded"}
+
+
+async def soak(mode: str, analyses: int, report_every: int, warmup: int) -> float:
+    """Run the analyses, returns RSS growth in bytes from the end of warm-up to the last one"""
+    agent = NewsAnalysisAgent(
+        gemini_api_key="", tavily_api_key="",
+        checkpoint_mode=mode,
+        llm=FakeChatModel(latency_ms=0),
+        search_tool=SharedTavilySearch(client=FakeSearchProvider(latency_ms=0))
+    )
+
+    print(f"\n--- AGENT_CHECKPOINT_MODE={mode} ---")
+    baseline = warm = rss = None
+    for i in range(1, analyses + 1):
+        # The agent logs every analysis; keep the benchmark output readable
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            await agent.analyze_news(location=f"Soak {i}", topic="checkpoint retention")
+        if i % report_every == 0:
+            gc.collect()
+            rss = current_rss_bytes() or 0
+            baseline = baseline or rss
+            if i >= warmup and warm is None:
+                warm = rss
+            stats = agent.checkpoint_stats()
+            print(f"{i:>6} analyses  rss={rss / 2**20:7.1f} MiB (+{(rss - baseline) / 2**20:6.1f})  "
+                  f"threads={stats['threads']:<5} store={stats['bytes'] / 2**20:7.2f} MiB", flush=True)
+    return rss - warm if warm is not None else 0.0
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--analyses", type=int, default=2000)
+    parser.add_argument("--report-every", type=int, default=250)
+    parser.add_argument("--modes", nargs="+", default=list(CHECKPOINT_MODES), choices=CHECKPOINT_MODES)
+    parser.add_argument("--warmup", type=int, default=500,
+                        help="Analyses before RSS is expected to level off (allocator and store filling up)")
+    parser.add_argument("--max-growth-mib", type=float, default=16,
+                        help="RSS growth allowed after warm-up")
+    args = parser.parse_args()
+    if args.warmup >= args.analyses:
+        parser.error("--warmup must be smaller than --analyses")
+    if current_rss_bytes() is None:
+        sys.exit("❌ Can't read this process's RSS on this platform")
+
+    failures = []
+    for mode in args.modes:
+        growth = await soak(mode, args.analyses, args.report_every, args.warmup) / 2**20
+        print(f"RSS growth after {args.warmup} analyses: {growth:+.1f} MiB"
+              + ("  (expected to grow)" if mode in GROWING_MODES else f"   budget {args.max_growth_mib:.0f} MiB"))
+        if mode not in GROWING_MODES and growth > args.max_growth_mib:
+            failures.append(f"{mode} (+{growth:.1f} MiB)")
+
+    if failures:
+        print(f"\n❌ RSS kept growing: {'; '.join(failures)}")
+        sys.exit(1)
+    print("\n✅ RSS flat after warm-up")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
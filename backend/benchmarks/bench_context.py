@@ -0,0 +1,80 @@
+"""
+Search output compaction benchmark
+Runs the same analyses with and without compaction against a fake chat model whose latency
+grows with its prompt (FAKE_LLM_MS_PER_1K_INPUT_TOKENS) and reports latency, model input tokens
+and search output tokens for each pipeline
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.agent import PIPELINES, NewsAnalysisAgent
+from src.fakes import FakeChatModel, FakeSearchProvider
+from src.tools import SharedTavilySearch
+
+TOPICS = [
+    ("Kenya", "drought relief funding"),
+    ("Brazil", "Amazon deforestation policy"),
+    ("Japan", "central bank interest rate decision"),
+    ("Germany", "coalition budget dispute"),
+]
+
+
+async def run(pipeline: str, compact: bool, analyses: int, latency_ms: float, ms_per_1k: float, budget: int):
+    agent = NewsAnalysisAgent(
+        gemini_api_key="", tavily_api_key="",
+        pipeline=pipeline,
+        llm=FakeChatModel(latency_ms=latency_ms, ms_per_1k_input_tokens=ms_per_1k),
+        search_tool=SharedTavilySearch(client=FakeSearchProvider(latency_ms=0)),
+        compact_tool_output=compact
+    )
+    if agent.compactor is not None:
+        agent.compactor.budget_tokens = budget
+    seconds, input_tokens, sent, raw, sources = [], [], [], [], []
+    for i in range(analyses):
+        location, topic = TOPICS[i % len(TOPICS)]
+        # The agent logs every analysis; keep the benchmark output readable
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            analysis = await agent.analyze_news(location=location, topic=topic)
+        metrics = analysis._metrics
+        seconds.append(metrics["seconds"])
+        input_tokens.append(metrics["input_tokens"])
+        tool_output = metrics.get("tool_output")
+        if tool_output is not None:
+            sent.append(tool_output["tokens"])
+            raw.append(tool_output["raw_tokens"])
+        sources.append(sum(len(p.sources) for p in analysis.perspectives))
+    label = "compacted" if compact else "raw"
+    line = (f"{pipeline:<13} {label:<10} {statistics.mean(seconds):7.2f}s  "
+            f"{statistics.mean(input_tokens):>10,.0f} input tokens  {statistics.mean(sources):5.1f} sources")
+    if raw:
+        line += f"  search output {statistics.mean(sent):,.0f} / {statistics.mean(raw):,.0f} tokens"
+    print(line, flush=True)
+    return statistics.mean(seconds), statistics.mean(input_tokens)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--analyses", type=int, default=4)
+    parser.add_argument("--pipelines", nargs="+", default=list(PIPELINES), choices=PIPELINES)
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--ms-per-1k-input-tokens", type=float, default=20,
+                        help="Fake model latency added per 1000 prompt tokens")
+    parser.add_argument("--budget", type=int, default=int(os.getenv("ANALYSIS_CONTEXT_BUDGET", "24000")),
+                        help="Search output tokens per analysis (0 = no budget)")
+    args = parser.parse_args()
+
+    for pipeline in args.pipelines:
+        before = await run(pipeline, False, args.analyses, args.llm_latency_ms, args.ms_per_1k_input_tokens, args.budget)
+        after = await run(pipeline, True, args.analyses, args.llm_latency_ms, args.ms_per_1k_input_tokens, args.budget)
+        print(f"{'':<13} {'':<10} {before[0] / after[0]:6.2f}x faster, "
+              f"{1 - after[1] / before[1]:.0%} fewer input tokens\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
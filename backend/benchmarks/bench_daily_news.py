@@ -0,0 +1,84 @@
+"""
+Benchmark for GET /daily-news
+Compares the old handler (re-read + re-parse daily_news_cache.json, re-serialize per request)
+with the pre-encoded snapshot, in-process over ASGI (no network, no API keys)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+
+import src.main as main
+from src.coordination import SnapshotFile
+from src.daily_refresh import DailyNewsRefresher
+
+
+def legacy_app() -> FastAPI:
+    """The /daily-news handler as it was before snapshots were pre-encoded"""
+    app = FastAPI()
+
+    @app.get("/daily-news")
+    def get_daily_news():
+        with open(main.LEGACY_CACHE_FILE, 'r') as f:
+            return json.load(f)
+
+    return app
+
+
+async def measure(app, label: str, requests: int, concurrency: int, headers=None):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get("/daily-news", headers=headers)
+        size = int(response.headers.get("content-length", len(response.content)))
+        status = response.status_code
+        queue = asyncio.Queue()
+        for _ in range(requests):
+            queue.put_nowait(None)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                await client.get("/daily-news", headers=headers)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    rps = requests / elapsed
+    print(f"{label:<34} status={status} wire={size:>6}B  {rps:8.0f} req/s")
+    return rps
+
+
+async def main_async():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    # Serve the committed cache file through the real app without running startup
+    main.daily_news_file = SnapshotFile(main.CACHE_FILE, legacy_path=main.LEGACY_CACHE_FILE)
+    main.refresher = DailyNewsRefresher(build=main.fetch_daily_news, snapshot=main.load_daily_news())
+    etag = main.encoded_daily_news().etag
+
+    before = await measure(legacy_app(), "before: re-read + re-serialize", args.requests, args.concurrency)
+    after = await measure(main.app, "after: pre-encoded, identity", args.requests, args.concurrency,
+                          {"Accept-Encoding": "identity"})
+    await measure(main.app, "after: pre-encoded, gzip", args.requests, args.concurrency,
+                  {"Accept-Encoding": "gzip"})
+    await measure(main.app, "after: pre-encoded, zstd", args.requests, args.concurrency,
+                  {"Accept-Encoding": "zstd"})
+    not_modified = await measure(main.app, "after: If-None-Match (304)", args.requests, args.concurrency,
+                                 {"If-None-Match": etag})
+
+    print(f"\nspeedup (identity): {after / before:.1f}x   speedup (304): {not_modified / before:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async())
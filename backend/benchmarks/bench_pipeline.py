@@ -0,0 +1,147 @@
+"""
+End-to-end load benchmark for /search, /analyze and /daily-news
+Runs the real app with the fake search and chat providers (no network, no API keys),
+so changes to caching, coalescing and concurrency can be compared run to run
+"""
+
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+
+def report(line: str = ""):
+    """Print past the redirected stdout (the app logs every analysis)"""
+    print(line, file=sys.__stdout__, flush=True)
+
+
+def percentile(samples: List[float], p: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def measure(client: httpx.AsyncClient, label: str, requests: int, concurrency: int,
+                  make_request: Callable[[int], Any]) -> Dict[str, Any]:
+    """Send `requests` requests from `concurrency` workers and report throughput and latency"""
+    latencies: List[float] = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            i = queue.get_nowait()
+            started = time.perf_counter()
+            response = await make_request(i)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "rps": requests / elapsed,
+        "p50": percentile(latencies, 50) * 1000,
+        "p95": percentile(latencies, 95) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "errors": errors,
+    }
+    report(f"{label:<30} {result['rps']:9.1f} req/s  p50={result['p50']:8.1f}ms  "
+           f"p95={result['p95']:8.1f}ms  p99={result['p99']:8.1f}ms  errors={errors}")
+    return result
+
+
+async def main_async():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--topics", type=int, default=20, help="distinct /analyze and /search topics")
+    parser.add_argument("--search-latency-ms", type=float, default=50)
+    parser.add_argument("--llm-latency-ms", type=float, default=100)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--result-chars", type=int, default=1500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="show the app's own logging")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        await run(args)
+
+
+async def run(args: argparse.Namespace):
+    """Start the app on fake providers in a scratch directory and load each endpoint"""
+    # Providers read their configuration at import time
+    os.environ.update({
+        "SEARCH_PROVIDER": "fake",
+        "CHAT_PROVIDER": "fake",
+        "FAKE_SEARCH_LATENCY_MS": str(args.search_latency_ms),
+        "FAKE_LLM_LATENCY_MS": str(args.llm_latency_ms),
+        "FAKE_ERROR_RATE": str(args.error_rate),
+        "FAKE_RESULT_CHARS": str(args.result_chars),
+        "FAKE_SEED": str(args.seed),
+    })
+
+    import src.main as main
+    from src.cache import SearchCache
+
+    # Keep the committed cache files untouched
+    workdir = Path(tempfile.mkdtemp(prefix="bench-pipeline-"))
+    main.CACHE_FILE = workdir / "daily_news_cache.pack"
+    main.LEGACY_CACHE_FILE = workdir / "daily_news_cache.json"
+    main.ANALYSIS_CACHE_FILE = workdir / "analysis_cache.db"
+    main.JOBS_FILE = workdir / "jobs.db"
+    main.OUTLETS_FILE = workdir / "outlets.db"
+    main.COORDINATION_FILE = workdir / "coordination.db"
+    main.search_cache = SearchCache(workdir / "search_cache.pack")
+
+    await main.startup_event()
+    try:
+        started = time.perf_counter()
+        while main.refresher.snapshot is None:
+            if main.refresher.status().get("last_error"):
+                raise RuntimeError(f"daily refresh failed: {main.refresher.status()['last_error']}")
+            await asyncio.sleep(0.05)
+        report(f"daily refresh (10 headlines):  {time.perf_counter() - started:6.2f}s\n")
+
+        topics = [f"benchmark topic {i}" for i in range(args.topics)]
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            await measure(client, "GET /daily-news", args.requests, args.concurrency,
+                          lambda i: client.get("/daily-news"))
+            await measure(client, "POST /search (cold + repeats)", args.requests, args.concurrency,
+                          lambda i: client.post("/search", json={"topic": topics[i % len(topics)]}))
+            await measure(client, "POST /analyze (cold + repeats)", args.requests, args.concurrency,
+                          lambda i: client.post("/analyze", json={"location": "Global", "topic": topics[i % len(topics)]}))
+            await measure(client, "POST /analyze (cached)", args.requests, args.concurrency,
+                          lambda i: client.post("/analyze", json={"location": "Global", "topic": topics[i % len(topics)]}))
+            await measure(client, "mixed (all three)", args.requests, args.concurrency,
+                          lambda i: [
+                              lambda: client.get("/daily-news"),
+                              lambda: client.post("/search", json={"topic": f"mixed {i}"}),
+                              lambda: client.post("/analyze", json={"location": "Global", "topic": f"mixed {i}"}),
+                          ][i % 3]())
+
+        report(f"\nfake search: {main.search_client.stats()}")
+    finally:
+        await main.shutdown_event()
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async())
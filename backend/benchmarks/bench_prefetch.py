@@ -0,0 +1,88 @@
+"""
+Benchmark for the daily news prefetch engine
+Runs PrefetchEngine against a stubbed agent with artificial latency and rate limits
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Any, Dict, List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.prefetch import PrefetchEngine
+
+
+class StubAnalysis:
+    """Minimal stand-in for NewsAnalysis"""
+
+    def __init__(self, topic: str):
+        self.topic = topic
+
+    def dict(self):
+        return {"topic": self.topic}
+
+
+class StubAgent:
+    """NewsAnalysisAgent stand-in that sleeps instead of calling Gemini/Tavily"""
+
+    def __init__(self, latency: float, rate_limit_rate: float = 0.0):
+        self.latency = latency
+        self.rate_limit_rate = rate_limit_rate
+        self.calls = 0
+
+    async def analyze_news(self, location: str, topic: str = None):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if random.random() < self.rate_limit_rate:
+            raise RuntimeError("429 RESOURCE_EXHAUSTED: rate limit exceeded")
+        return StubAnalysis(topic)
+
+
+async def analyze_headlines(engine: PrefetchEngine, headlines: List[str]) -> List[Dict[str, Any]]:
+    """Every headline through the engine at once (the executor caps concurrency), in rank order"""
+    async def analyze(rank: int, headline: str) -> Dict[str, Any]:
+        try:
+            analysis = (await engine.analyze("Global", headline)).dict()
+        except Exception as e:
+            print(f"⚠️  Error analyzing headline {rank}: {e}")
+            analysis = None
+        return {"rank": rank, "headline": headline, "analysis": analysis}
+
+    return list(await asyncio.gather(*(analyze(rank, headline) for rank, headline in enumerate(headlines, 1))))
+
+
+async def run(concurrency: int, latency: float, rate_limit_rate: float, count: int) -> float:
+    agent = StubAgent(latency, rate_limit_rate)
+    engine = PrefetchEngine(agent, concurrency=concurrency, backoff_base=latency / 4)
+    headlines = [f"Headline number {i}" for i in range(1, count + 1)]
+
+    started = time.perf_counter()
+    results = await analyze_headlines(engine, headlines)
+    elapsed = time.perf_counter() - started
+
+    assert [item["rank"] for item in results] == list(range(1, count + 1))
+    failed = sum(1 for item in results if item["analysis"] is None)
+    print(f"concurrency={concurrency:<3} elapsed={elapsed:6.2f}s calls={agent.calls:<3} failed={failed}")
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per stub analysis")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.1, help="Fraction of calls that raise a 429")
+    parser.add_argument("--count", type=int, default=10, help="Number of headlines")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 3, 5, 10])
+    args = parser.parse_args()
+
+    baseline = None
+    for concurrency in args.concurrency:
+        elapsed = await run(concurrency, args.latency, args.rate_limit_rate, args.count)
+        baseline = baseline or elapsed
+        print(f"   speedup vs concurrency={args.concurrency[0]}: {baseline / elapsed:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+"""
+Speculative pre-analysis benchmark
+Simulated users search, read the headlines for a while, then click one (usually one of the
+first) and wait for /analyze. Runs with speculation off and on, reporting click-to-analysis
+latency, speculative hit rate and wasted work; fake providers, caches in a temp directory
+"""
+
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from bench_pipeline import percentile, report
+
+
+def topic(i: int) -> str:
+    # Unrelated strings: similar topics would be answered from one cached search
+    return f"topic {hashlib.md5(str(i).encode()).hexdigest()[:12]}"
+
+
+async def sessions(client: httpx.AsyncClient, users: int, concurrency: int,
+                   think_seconds: float, click_weights: List[float], rng: random.Random) -> Dict[str, Any]:
+    """`users` search-then-click sessions, `concurrency` at a time; returns click latencies"""
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def session(i: int):
+        async with semaphore:
+            search = await client.post("/search", json={"topic": topic(i)})
+            headlines = [item["headline"] for item in search.json()["headlines"]]
+            await asyncio.sleep(think_seconds * rng.uniform(0.5, 1.5))
+            rank = rng.choices(range(len(click_weights)), weights=click_weights)[0]
+            started = time.perf_counter()
+            await client.post("/analyze", json={"location": "Global", "topic": headlines[min(rank, len(headlines) - 1)]})
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(session(i) for i in range(users)))
+    return {"p50": percentile(latencies, 50), "p95": percentile(latencies, 95),
+            "mean": sum(latencies) / len(latencies)}
+
+
+async def main_async():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=2, help="users searching and clicking at once")
+    parser.add_argument("--think-seconds", type=float, default=1.0, help="time between the search and the click")
+    parser.add_argument("--click-weights", type=float, nargs="+", default=[0.6, 0.25, 0.1, 0.05],
+                        help="chance of clicking the 1st, 2nd, ... headline")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--max-jobs", type=int, default=4)
+    parser.add_argument("--search-latency-ms", type=float, default=50)
+    parser.add_argument("--llm-latency-ms", type=float, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="show the app's own logging")
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        await run(args)
+
+
+async def run(args: argparse.Namespace):
+    # Providers read their configuration at import time
+    os.environ.update({
+        "SEARCH_PROVIDER": "fake",
+        "CHAT_PROVIDER": "fake",
+        "FAKE_SEARCH_LATENCY_MS": str(args.search_latency_ms),
+        "FAKE_LLM_LATENCY_MS": str(args.llm_latency_ms),
+        "FAKE_SEED": str(args.seed),
+    })
+
+    import src.main as main
+    from src.analysis_cache import AnalysisCache
+    from src.cache import SearchCache
+
+    # Keep the committed cache files untouched
+    workdir = Path(tempfile.mkdtemp(prefix="bench-speculative-"))
+    main.CACHE_FILE = workdir / "daily_news_cache.pack"
+    main.LEGACY_CACHE_FILE = workdir / "daily_news_cache.json"
+    main.ANALYSIS_CACHE_FILE = workdir / "analysis_cache.db"
+    main.JOBS_FILE = workdir / "jobs.db"
+    main.OUTLETS_FILE = workdir / "outlets.db"
+    main.COORDINATION_FILE = workdir / "coordination.db"
+    main.search_cache = SearchCache(workdir / "search_cache.pack")
+    main.speculator.top_k = args.top_k
+    main.speculator.max_jobs = args.max_jobs
+
+    await main.startup_event()
+    try:
+        # Measure once the daily refresh is done, so its analyses don't count as load
+        while main.refresher.snapshot is None:
+            if main.refresher.status().get("last_error"):
+                raise RuntimeError(f"daily refresh failed: {main.refresher.status()['last_error']}")
+            await asyncio.sleep(0.05)
+
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            results = {}
+            for enabled in (False, True):
+                main.speculator.enabled = enabled
+                label = "speculative" if enabled else "baseline"
+                # Same searches and clicks in both runs, each starting from an empty analysis cache
+                main.analysis_cache.close()
+                main.analysis_cache = AnalysisCache(workdir / f"analysis_cache_{label}.db")
+                results[label] = await sessions(client, args.users, args.concurrency, args.think_seconds,
+                                                 args.click_weights, random.Random(args.seed))
+                # Let speculation nobody clicked finish, so its work is counted
+                while main.speculator.stats()["running"] + main.speculator.stats()["queued"]:
+                    await asyncio.sleep(0.05)
+                result = results[label]
+                report(f"{label:<12} click -> analysis  mean={result['mean'] * 1000:8.1f}ms  "
+                       f"p50={result['p50'] * 1000:8.1f}ms  p95={result['p95'] * 1000:8.1f}ms")
+
+        # Count speculation still waiting for a click as wasted
+        main.speculator.hit_window = 0
+        stats = main.speculator.stats()
+        report(f"\nspeculation: {stats['completed']} completed, {stats['cancelled']} cancelled, "
+               f"{stats['skipped_budget']} over budget, {stats['skipped_load']} under load, "
+               f"{stats['skipped_available']} already available")
+        report(f"hits: {stats['hits']}  hit rate {stats['hit_rate']}  awaiting a click {stats['awaiting_claim']}")
+        report(f"agent seconds: {stats['work_seconds']}  wasted work rate {stats['wasted_work_rate']}")
+    finally:
+        await main.shutdown_event()
+
+
+if __name__ == "__main__":
+    asyncio.run(main_async())
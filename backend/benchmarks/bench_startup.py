@@ -0,0 +1,155 @@
+"""
+Cold start benchmark with a budget
+Measures `import src.main` in fresh interpreters, then starts the API under uvicorn (fake providers,
+caches in a temp directory, the committed daily news as the cached snapshot) and times the first
+answers from /health, /, /examples and /daily-news and the agent becoming ready.
+Exits with status 1 if a budget is exceeded or the LangChain/Gemini stack is imported eagerly.
+"""
+
+import argparse
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+BACKEND = Path(__file__).parent.parent
+
+# Must not be imported by `import src.main`; the agent loads them in the background (LangChain
+# adapters live in tools.py and callbacks.py, which only the agent imports)
+HEAVY_MODULES = ("langchain_core", "langsmith", "langchain_google_genai", "langchain.agents", "langgraph",
+                 "langchain_tavily")
+
+IMPORT_PROBE = f"""
+import sys, time
+started = time.perf_counter()
+import src.main
+elapsed = time.perf_counter() - started
+heavy = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def measure_import(runs: int):
+    """Median seconds of `import src.main` over fresh interpreters, and heavy modules it pulled in"""
+    times, heavy = [], set()
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-W", "ignore", "-c", IMPORT_PROBE], cwd=BACKEND,
+                                capture_output=True, text=True, check=True).stdout.split()
+        times.append(float(output[0]))
+        if len(output) > 1:
+            heavy.update(output[1].split(","))
+    return statistics.median(times), sorted(heavy)
+
+
+def serve(port: int, workdir: Path):
+    """Child process: the API with every cache file in `workdir`"""
+    import uvicorn
+    import src.main as main
+    from src.cache import SearchCache
+
+    main.CACHE_FILE = workdir / "daily_news_cache.pack"
+    main.LEGACY_CACHE_FILE = workdir / "daily_news_cache.json"
+    main.ANALYSIS_CACHE_FILE = workdir / "analysis_cache.db"
+    main.JOBS_FILE = workdir / "jobs.db"
+    main.OUTLETS_FILE = workdir / "outlets.db"
+    main.COORDINATION_FILE = workdir / "coordination.db"
+    main.search_cache = SearchCache(workdir / "search_cache.pack")
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_startup(timeout: float):
+    """Seconds from process start to the first successful answer of each endpoint and to agent readiness"""
+    workdir = Path(tempfile.mkdtemp(prefix="bench-startup-"))
+    shutil.copy(BACKEND / "daily_news_cache.json", workdir / "daily_news_cache.json")
+    port = free_port()
+    env = {**os.environ, "SEARCH_PROVIDER": "fake", "CHAT_PROVIDER": "fake", "PYTHONWARNINGS": "ignore"}
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, __file__, "--serve", str(port), str(workdir)], cwd=BACKEND,
+                               env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    results = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=5) as client:
+            pending = ["/health", "/", "/examples", "/daily-news", "agent ready"]
+            while pending and time.perf_counter() - started < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError(f"API process exited with status {process.returncode}")
+                target = pending[0]
+                try:
+                    if target == "agent ready":
+                        done = client.get("/health").json().get("agent") == "ready"
+                    else:
+                        done = client.get(target).status_code == 200
+                except httpx.TransportError:
+                    done = False
+                if done:
+                    results[target] = time.perf_counter() - started
+                    pending.pop(0)
+                else:
+                    time.sleep(0.005)
+    finally:
+        process.terminate()
+        process.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time the import in")
+    parser.add_argument("--import-budget-ms", type=float, default=600)
+    parser.add_argument("--first-response-budget-ms", type=float, default=1500,
+                        help="Process start to the first /health answer (interpreter + import + startup)")
+    parser.add_argument("--ready-budget-ms", type=float, default=0, help="Process start to agent ready (0 = no budget)")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--serve", nargs=2, metavar=("PORT", "WORKDIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(int(args.serve[0]), Path(args.serve[1]))
+        return
+
+    failures = []
+    import_seconds, heavy = measure_import(args.runs)
+    print(f"import src.main (median of {args.runs}):  {import_seconds * 1000:7.0f} ms   budget {args.import_budget_ms:.0f} ms")
+    if import_seconds * 1000 > args.import_budget_ms:
+        failures.append("import time")
+    if heavy:
+        print(f"   imported eagerly: {', '.join(heavy)}")
+        failures.append("heavy modules imported by src.main")
+
+    results = measure_startup(args.timeout)
+    for target in ("/health", "/", "/examples", "/daily-news", "agent ready"):
+        if target in results:
+            print(f"{target + ' after process start:':<35} {results[target] * 1000:7.0f} ms")
+        else:
+            print(f"{target + ' after process start:':<35} no answer within {args.timeout:.0f}s")
+            failures.append(f"{target} never answered")
+    first = results.get("/health")
+    if first is not None and first * 1000 > args.first_response_budget_ms:
+        failures.append(f"first response ({first * 1000:.0f} ms > {args.first_response_budget_ms:.0f} ms)")
+    ready = results.get("agent ready")
+    if args.ready_budget_ms and ready is not None and ready * 1000 > args.ready_budget_ms:
+        failures.append(f"agent ready ({ready * 1000:.0f} ms > {args.ready_budget_ms:.0f} ms)")
+
+    if failures:
+        print(f"\n❌ Over budget: {'; '.join(failures)}")
+        sys.exit(1)
+    print("\n✅ Within budget")
+
+
+if __name__ == "__main__":
+    main()
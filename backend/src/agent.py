@@ -3,61 +3,54 @@ Multi-Perspective News Analysis Agent
 Finds opposing viewpoints on major news stories and analyzes bias/support
 """
 
-from typing import List, Optional
+from typing import Annotated, Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, TypedDict, Union
 from pydantic import BaseModel, Field
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_tavily import TavilySearch
 from langchain.agents import create_agent
-from langchain.agents.structured_output import ToolStrategy
-from langgraph.checkpoint.memory import InMemorySaver
+from langchain.agents.structured_output import StructuredOutputValidationError, ToolStrategy
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.language_models import BaseChatModel
+from langchain_core.tools import BaseTool
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Send
+from datetime import datetime
+import json
+import operator
 import os
 import time
 
+try:
+    from .checkpointing import CHECKPOINT_MODE, checkpoint_stats, make_checkpointer
+    from .callbacks import APICallCounter, LLMCircuitCallback
+    from .compaction import TOOL_OUTPUT_COMPACTION, load_tokenizer
+    from .models import NewsAnalysis, NewsSource, Perspective, SupporterInfo
+    from .providers import make_chat_model
+    from .outlets import OutletRegistry
+    from .resilience import check_circuits, run_stage
+    from .tools import CompactSearchTool, OutletLookupTool
+except ImportError:  # run as a script (python src/agent.py, src/test_agent.py)
+    from checkpointing import CHECKPOINT_MODE, checkpoint_stats, make_checkpointer
+    from callbacks import APICallCounter, LLMCircuitCallback
+    from compaction import TOOL_OUTPUT_COMPACTION, load_tokenizer
+    from models import NewsAnalysis, NewsSource, Perspective, SupporterInfo
+    from providers import make_chat_model
+    from outlets import OutletRegistry
+    from resilience import check_circuits, run_stage
+    from tools import CompactSearchTool, OutletLookupTool
 
-# ============= OUTPUT STRUCTURES =============
-
-class NewsSource(BaseModel):
-    """Information about a news source"""
-    name: str = Field(description="Name of the news organization or platform")
-    url: str = Field(description="URL to the article or source")
-    type: str = Field(description="Type: 'mainstream_media', 'independent_journalist', 'social_media', 'government'")
-    political_leaning: str = Field(description="Political leaning: 'left', 'center', 'right', 'unknown'")
-    
-
-class SupporterInfo(BaseModel):
-    """Who supports or funds this source"""
-    supporters: List[str] = Field(description="List of supporters (political parties, governments, corporations)")
-    funding_sources: List[str] = Field(description="Known funding sources")
-    ownership: str = Field(description="Who owns or controls this outlet")
-
-
-class Perspective(BaseModel):
-    """One side of the story"""
-    side_name: str = Field(description="Name of this perspective (e.g., 'Pro-Government', 'Opposition', 'Left-Wing', 'Right-Wing')")
-    summary: str = Field(description="Summary of this perspective's main arguments and framing")
-    key_claims: List[str] = Field(description="Key claims made by this side")
-    sources: List[NewsSource] = Field(description="News sources presenting this perspective")
-    supporter_info: SupporterInfo = Field(description="Who supports these sources")
-    bias_indicators: List[str] = Field(description="Detected bias indicators (loaded language, omissions, framing)")
-    bias_score: float = Field(description="Bias score from 0 (neutral) to 10 (highly biased)")
 
+# parallel:     identify the sides, then research each side and social media voices concurrently
+# single_agent: one agent does every step in a single sequential tool-calling loop (previous behavior)
+PIPELINES = ("parallel", "single_agent")
+PIPELINE = os.getenv("AGENT_PIPELINE", "parallel")
 
-class NewsAnalysis(BaseModel):
-    """Complete analysis of a news story from multiple perspectives"""
-    location: str = Field(description="Geographic location (country, state, city)")
-    topic: str = Field(description="Main news topic being analyzed")
-    headline: str = Field(description="Neutral headline summarizing the story")
-    date_analyzed: str = Field(description="When this analysis was performed")
-    
-    perspectives: List[Perspective] = Field(description="Different perspectives on this story (minimum 2)")
-    
-    common_facts: List[str] = Field(description="Facts agreed upon by all sides")
-    key_disagreements: List[str] = Field(description="Main points of disagreement between sides")
-    
-    social_media_voices: List[NewsSource] = Field(description="Independent journalists and social media perspectives")
-    
-    summary: str = Field(description="Neutral summary explaining the situation and different viewpoints")
-    information_quality: str = Field(description="Assessment of information quality and reliability")
+# single_agent pipeline only (the parallel pipeline's synthesize step always returns structured
+# output in one call, so the setting is ignored there):
+# single_pass: the agent returns NewsAnalysis itself (ToolStrategy); a separate structuring call
+#              runs only when that output fails validation or never arrives
+# two_pass:    free-text research, then a separate with_structured_output call (previous behavior)
+OUTPUT_MODES = ("single_pass", "two_pass")
+OUTPUT_MODE = os.getenv("AGENT_OUTPUT_MODE", "single_pass")
 
 
 # ============= AGENT CONFIGURATION =============
@@ -101,117 +94,676 @@ WORKFLOW - Follow these steps in order:
    - Identify key points of disagreement
    - Assess overall information quality and reliability
    - Provide a balanced, neutral summary
-API call counter
-        self.api_counter = APICallCounter()
-        
-        # Initialize Gemini LLM
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-flash-lite-latest",
-            google_api_key=gemini_api_key,
-            temperature=0.3,
-            callbacks=[self.api_counter]- aim for comprehensive coverage in minimal searches
+
+IMPORTANT GUIDELINES:
+- Be efficient with searches - aim for comprehensive coverage in minimal searches
 - Remain objective and balanced - don't favor any perspective
 - Focus on factual analysis, not opinions
 
 Return your complete analysis in the structured format provided."""
 
+
+# ============= PARALLEL RESEARCH =============
+
+class Side(BaseModel):
+    """One side of the story to research"""
+    name: str = Field(description="Name of this perspective (e.g., 'Pro-Government', 'Opposition', 'Left-Wing', 'Right-Wing')")
+    description: str = Field(description="Who holds this view and what they broadly argue")
+
+
+class StoryPlan(BaseModel):
+    """The story and its opposing sides, found before the sides are researched"""
+    topic: str = Field(description="Main news topic being analyzed")
+    headline: str = Field(description="Neutral headline summarizing the story")
+    background: str = Field(description="Short factual background: what happened, when, and who is involved")
+    sides: List[Side] = Field(description="The main opposing perspectives on this story (2, at most 3)")
+
+
+class SocialMediaVoices(BaseModel):
+    """Independent coverage of the story"""
+    voices: List[NewsSource] = Field(description="Independent journalists and social media perspectives")
+
+
+class Synthesis(BaseModel):
+    """Comparison of the researched perspectives"""
+    common_facts: List[str] = Field(description="Facts agreed upon by all sides")
+    key_disagreements: List[str] = Field(description="Main points of disagreement between sides")
+    summary: str = Field(description="Neutral summary explaining the situation and different viewpoints")
+    information_quality: str = Field(description="Assessment of information quality and reliability")
+
+
+IDENTIFY_SIDES_PROMPT = """You are an expert news analyst specializing in multi-perspective analysis.
+
+Your task is ONLY to pin down the story and its opposing sides. Other analysts will research each side in depth, in parallel, based on your answer.
+
+1. FIND THE NEWS:
+   - If no topic is provided, search for the biggest current news story in the specified location
+   - If a topic is provided, search for details about that specific story
+2. IDENTIFY OPPOSING PERSPECTIVES:
+   - Identify the TWO main opposing sides (a third only if it is clearly distinct)
+   - These could be: political parties, ideological positions, stakeholders, etc.
+   - Name each perspective clearly (e.g., "Liberal Position", "Conservative Position")
+   - Create a neutral headline and a short factual background
+
+Use at most 2-3 searches. Do not research the sides' sources, funding or bias yourself.
+
+Return the story and its sides in the structured format provided."""
+
+PERSPECTIVE_PROMPT = """You are an expert news analyst specializing in bias detection.
+
+You research ONE side of a news story; other analysts cover the other sides at the same time. For this side, search and find:
+- At least 3-5 news sources representing this view
+- **IMPORTANT: For each source, include the full article URL**
+- Their main arguments and key claims
+- Who supports/funds these sources (political parties, corporations, governments)
+- Media ownership information
+- Bias indicators (loaded language, emotional appeals, omissions, selective facts)
+- A bias score from 0 (neutral) to 10 (highly biased)
+
+Aim for comprehensive coverage in minimal searches. Remain objective - describe this side, don't argue for it.
+
+Return this perspective in the structured format provided."""
+
+SOCIAL_MEDIA_PROMPT = """You are an expert news analyst tracking independent and social media coverage.
+
+For the given news story, search for:
+- Independent journalists and citizen journalists
+- Grassroots media and other non-mainstream perspectives
+- Voices on platforms like Twitter/X, TikTok, YouTube, Instagram
+- **IMPORTANT: Include URLs for all sources**
+
+Aim for comprehensive coverage in minimal searches.
+
+Return the voices you found in the structured format provided."""
+
+SYNTHESIS_PROMPT = """You are an expert news analyst. You are given a news story and research on each of its opposing perspectives.
+
+COMPARE AND SYNTHESIZE:
+- Identify facts that all sides agree on (common ground)
+- Identify key points of disagreement
+- Assess overall information quality and reliability
+- Provide a balanced, neutral summary
+
+Remain objective and balanced - don't favor any perspective. Use only the research provided."""
+
+UPDATE_PROMPT = """You are an expert news analyst. You are given an existing multi-perspective analysis of a news story and the latest search results about it.
+
+Update the analysis with the latest developments:
+- Keep perspectives, sources (with their URLs) and facts that still apply
+- Add new facts, claims, sources and points of disagreement from the search results, with their full article URLs
+- Revise the headline, summary and information quality assessment to reflect the current state of the story
+- Remain objective and balanced - don't favor any perspective
+
+Return the complete updated analysis in the NewsAnalysis format."""
+
+# Appended to the prompts of agents that research outlets, when an outlet registry is available
+OUTLET_LOOKUP_GUIDELINE = """
+
+OUTLET METADATA:
+- Before searching for an outlet's ownership, funding, supporters or political leaning, call lookup_outlets with the domains of the sources you found
+- Reuse what it returns for known outlets; only search for outlets it reports as unknown (null)"""
+
+
+class ResearchState(TypedDict, total=False):
+    """State of the parallel research graph"""
+    location: str
+    topic: Optional[str]
+    plan: StoryPlan
+    # (index of the side in plan.sides, researched perspective), in completion order
+    perspectives: Annotated[List[Tuple[int, Perspective]], operator.add]
+    social_media_voices: List[NewsSource]
+    analysis: NewsAnalysis
+
+
+def _story_query(location: str, topic: Optional[str]) -> str:
+    """The user request that starts an analysis"""
+    if topic:
+        return f"Analyze the news story about '{topic}' in {location}. Provide a complete multi-perspective analysis. IMPORTANT: Include the full article URL for every news source you cite."
+    return f"Find the biggest current news story in {location} and provide a complete multi-perspective analysis. IMPORTANT: Include the full article URL for every news source you cite."
+
+
+def build_research_graph(llm: BaseChatModel, search_tool: BaseTool, checkpointer: Any = None,
+                         outlet_tool: Optional[BaseTool] = None):
+    """
+    Graph that identifies the sides of a story, researches them concurrently and merges the results
+
+        identify_sides --+--> research_perspective (one per side) --+--> synthesize
+                         +--> research_social_media ----------------+
+    
+    With an outlet_tool, the perspective researchers look outlets up before searching for them.
+    Each node is a retry unit: a failed branch is run again on its own, not the whole graph.
+    """
+    planner = create_agent(
+        model=llm, tools=[search_tool], system_prompt=IDENTIFY_SIDES_PROMPT,
+        response_format=ToolStrategy(StoryPlan), name="identify_sides"
+    )
+    perspective_researcher = create_agent(
+        model=llm,
+        tools=[search_tool, outlet_tool] if outlet_tool else [search_tool],
+        system_prompt=PERSPECTIVE_PROMPT + (OUTLET_LOOKUP_GUIDELINE if outlet_tool else ""),
+        response_format=ToolStrategy(Perspective), name="research_perspective"
+    )
+    social_media_researcher = create_agent(
+        model=llm, tools=[search_tool], system_prompt=SOCIAL_MEDIA_PROMPT,
+        response_format=ToolStrategy(SocialMediaVoices), name="research_social_media"
+    )
+    synthesizer = llm.with_structured_output(Synthesis)
+    
+    async def identify_sides(state: ResearchState) -> Dict[str, Any]:
+        result = await run_stage("identify_sides", lambda: planner.ainvoke(
+            {"messages": [{"role": "user", "content": _story_query(state["location"], state.get("topic"))}]}
+        ))
+        return {"plan": result["structured_response"]}
+    
+    def fan_out(state: ResearchState) -> List[Send]:
+        branch = {"location": state["location"], "plan": state["plan"]}
+        sends = [Send("research_perspective", {**branch, "index": i}) for i in range(len(state["plan"].sides))]
+        sends.append(Send("research_social_media", branch))
+        return sends
+    
+    async def research_perspective(branch: Dict[str, Any]) -> Dict[str, Any]:
+        plan, index = branch["plan"], branch["index"]
+        side = plan.sides[index]
+        others = ", ".join(f"'{other.name}'" for other in plan.sides if other is not side) or "none"
+        result = await run_stage("research_perspective", lambda: perspective_researcher.ainvoke({"messages": [{"role": "user", "content": (
+            f"Research the '{side.name}' perspective on the news story about '{plan.topic}' in {branch['location']}.\n\n"
+            f"Story: {plan.headline}\n{plan.background}\n\n"
+            f"This side: {side.description}\n"
+            f"Other sides (researched separately): {others}\n\n"
+            f"Use '{side.name}' as the side_name. IMPORTANT: Include the full article URL for every news source you cite."
+        )}]}))
+        return {"perspectives": [(index, result["structured_response"])]}
+    
+    async def research_social_media(branch: Dict[str, Any]) -> Dict[str, Any]:
+        plan = branch["plan"]
+        result = await run_stage("research_social_media", lambda: social_media_researcher.ainvoke({"messages": [{"role": "user", "content": (
+            f"Find independent and social media voices on the news story about '{plan.topic}' in {branch['location']}.\n\n"
+            f"Story: {plan.headline}\n{plan.background}\n\n"
+            f"Sides in the debate: {', '.join(side.name for side in plan.sides)}"
+        )}]}))
+        return {"social_media_voices": result["structured_response"].voices}
+    
+    async def synthesize(state: ResearchState) -> Dict[str, Any]:
+        plan = state["plan"]
+        perspectives = [perspective for _, perspective in sorted(state.get("perspectives", []), key=lambda item: item[0])]
+        voices = state.get("social_media_voices", [])
+        synthesis = await run_stage("synthesize", lambda: synthesizer.ainvoke([
+            {"role": "system", "content": SYNTHESIS_PROMPT},
+            {"role": "user", "content": (
+                f"News story about '{plan.topic}' in {state['location']}: {plan.headline}\n{plan.background}\n\n"
+                f"Perspectives:\n{json.dumps([p.dict() for p in perspectives], indent=2, ensure_ascii=False)}\n\n"
+                f"Independent and social media voices:\n{json.dumps([v.dict() for v in voices], indent=2, ensure_ascii=False)}"
+            )}
+        ]))
+        return {"analysis": NewsAnalysis(
+            location=state["location"],
+            topic=plan.topic,
+            headline=plan.headline,
+            date_analyzed=datetime.now().isoformat(),
+            perspectives=perspectives,
+            common_facts=synthesis.common_facts,
+            key_disagreements=synthesis.key_disagreements,
+            social_media_voices=voices,
+            summary=synthesis.summary,
+            information_quality=synthesis.information_quality
+        )}
+    
+    graph = StateGraph(ResearchState)
+    graph.add_node("identify_sides", identify_sides)
+    graph.add_node("research_perspective", research_perspective)
+    graph.add_node("research_social_media", research_social_media)
+    graph.add_node("synthesize", synthesize)
+    graph.add_edge(START, "identify_sides")
+    graph.add_conditional_edges("identify_sides", fan_out, ["research_perspective", "research_social_media"])
+    graph.add_edge("research_perspective", "synthesize")
+    graph.add_edge("research_social_media", "synthesize")
+    graph.add_edge("synthesize", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
 class NewsAnalysisAgent:
     """Agent that analyzes news from multiple perspectives"""
     
-    def __init__(self, gemini_api_key: str, tavily_api_key: str):
-        """Initialize the agent with API keys"""
+    def __init__(
+        self,
+        gemini_api_key: str,
+        tavily_api_key: str,
+        checkpoint_mode: str = CHECKPOINT_MODE,
+        pipeline: str = PIPELINE,
+        output_mode: str = OUTPUT_MODE,
+        llm: Optional[BaseChatModel] = None,
+        search_tool: Optional[BaseTool] = None,
+        outlet_registry: Optional[OutletRegistry] = None,
+        compact_tool_output: bool = TOOL_OUTPUT_COMPACTION
+    ):
+        """
+        Initialize the agent with API keys
+        
+        Args:
+            gemini_api_key: Gemini API key
+            tavily_api_key: Tavily API key
+            checkpoint_mode: Checkpoint retention, one of "none", "cleanup", "bounded", "unbounded"
+            pipeline: "parallel" (research the sides concurrently) or "single_agent"
+            output_mode: single_agent pipeline: "single_pass" (agent emits NewsAnalysis directly) or "two_pass"
+            llm: Chat model to use instead of Gemini (tests and benchmarks)
+            search_tool: Search tool to use instead of Tavily (tests and benchmarks)
+            outlet_registry: Known outlet metadata; gives the agent a lookup_outlets tool, fills
+                unknown source leanings/types in results and learns from every analysis
+            compact_tool_output: Dedupe and trim search results before the model sees them, within
+                a per-analysis token budget (ANALYSIS_CONTEXT_BUDGET)
+        """
         
         # Initialize Gemini LLM
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-flash-lite-latest",
-            google_api_key=gemini_api_key,
-            temperature=0.3,
-        )
+        if llm is None:
+            llm = make_chat_model(gemini_api_key, "gemini")
         
         # Initialize web search tool
-        search_tool = TavilySearch(
-            api_key=tavily_api_key,
-            max_results=10
-        )
+        if search_tool is None:
+            search_tool = TavilySearch(
+                api_key=tavily_api_key,
+                max_results=10
+            )
+        
+        # Search results stay in the message history for every later turn: keep them small
+        self.compactor: Optional[CompactSearchTool] = None
+        if compact_tool_output:
+            self.compactor = search_tool = CompactSearchTool(search_tool)
+            # Load the token counter here rather than on the first search (it reads its encoding from disk)
+            load_tokenizer()
         
-        # Initialize memory/checkpointer
-        checkpointer = InMemorySaver()
+        # Initialize memory/checkpointer (bounded so a long-running server doesn't grow forever)
+        self.checkpoint_mode = checkpoint_mode
+        self.checkpointer = make_checkpointer(checkpoint_mode)
         
-        # Create ONE agent that does research
+        if pipeline not in PIPELINES:
+            raise ValueError(f"Unknown pipeline '{pipeline}', expected one of {', '.join(PIPELINES)}")
+        self.pipeline = pipeline
+        if output_mode not in OUTPUT_MODES:
+            raise ValueError(f"Unknown output mode '{output_mode}', expected one of {', '.join(OUTPUT_MODES)}")
+        self.output_mode = output_mode
+        if pipeline == "parallel" and "AGENT_OUTPUT_MODE" in os.environ:
+            print(f"ℹ️  AGENT_OUTPUT_MODE={OUTPUT_MODE} is ignored by the parallel pipeline "
+                  f"(set AGENT_PIPELINE=single_agent to use it)")
+        
+        # Outlet metadata from earlier analyses, so the agent only searches for unknown outlets
+        self.outlet_registry = outlet_registry
+        outlet_tool = OutletLookupTool(registry=outlet_registry) if outlet_registry is not None else None
+        
+        # Create ONE agent that does research (and, in single_pass mode, returns the NewsAnalysis too)
         self.agent = create_agent(
             model=llm,
-            tools=[search_tool],
-            system_prompt=SYSTEM_PROMPT,
-            checkpointer=checkpointer
+            tools=[search_tool, outlet_tool] if outlet_tool else [search_tool],
+            system_prompt=SYSTEM_PROMPT + (OUTLET_LOOKUP_GUIDELINE if outlet_tool else ""),
+            checkpointer=self.checkpointer,
+            # handle_errors=False: invalid output goes to the structuring pass instead of another agent turn
+            response_format=ToolStrategy(NewsAnalysis, handle_errors=False) if output_mode == "single_pass" else None
         )
         
-        # Separate model with structured output for final parsing
+        # Separate model with structured output for final parsing (two_pass mode and fallback)
         self.structured_model = llm.with_structured_output(NewsAnalysis)
+        self.search_tool = search_tool
+        
+        # Sides researched concurrently, merged by a synthesis step
+        self.research_graph = build_research_graph(llm, search_tool, self.checkpointer, outlet_tool)
+        
+        # How each analysis got structured
+        self.output_paths = {"parallel": 0, "single_pass": 0, "fallback_invalid": 0, "fallback_missing": 0, "two_pass": 0}
+    
+    
+    def checkpoint_stats(self) -> Dict[str, Any]:
+        """Size of the agent's checkpoint store"""
+        return {"mode": self.checkpoint_mode, **checkpoint_stats(self.checkpointer)}
+    
+    
+    def tool_output_stats(self) -> Dict[str, Any]:
+        """Search output compaction totals (tokens as returned vs as sent to the model)"""
+        if self.compactor is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.compactor.stats()}
+    
     
+    def output_stats(self) -> Dict[str, Any]:
+        """How often analyses came out of the agent directly vs the separate structuring pass"""
+        structured = sum(self.output_paths.values())
+        fallbacks = self.output_paths["fallback_invalid"] + self.output_paths["fallback_missing"]
+        return {
+            "pipeline": self.pipeline,
+            # Output modes only apply to the single_agent pipeline
+            "mode": self.output_mode if self.pipeline == "single_agent" else None,
+            **self.output_paths,
+            "fallback_rate": round(fallbacks / structured, 3) if self.output_mode == "single_pass" and structured else 0.0,
+        }
     
-    async def analyze_news(self, location: str, topic: Optional[str] = None) -> NewsAnalysis:
+    
+    async def analyze_news_stream(self, location: str, topic: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
         """
-        Main method to analyze news from multiple perspectives
+        Analyze news from multiple perspectives, yielding progress events as the agent works
         
         Args:
             location: Geographic location (e.g., "United States", "California", "New York City")
             topic: Optional specific topic. If None, finds biggest current news in location
         
-        Returns:
-            NewsAnalysis: Complete analysis with multiple perspectives
+        Yields:
+            {"event": name, "data": payload} dicts, in order (branches of the parallel
+            pipeline interleave their tool_call/sources events):
+            - "started": {location, topic}
+            - "plan": {topic, headline, sides} once the sides are identified (parallel pipeline)
+            - "tool_call": {tool, query} for every search the agent issues
+            - "sources": {tool, sources: [{title, url}]} for every search result
+            - "reasoning": {content} for intermediate model output
+            - "perspective": {side_name, sources} as each side's research finishes (parallel pipeline)
+            - "social_media": {voices} when the social media research finishes (parallel pipeline)
+            - "structuring": {reason} when the research is converted to NewsAnalysis by a separate
+              call (always in two_pass mode, otherwise only when the agent's own output is invalid)
+            - "metrics": {seconds, llm_calls, tool_calls, input_tokens, output_tokens, errors, stages,
+              tool_output} for this analysis (also kept on the result as analysis._metrics)
+            - "analysis": the final NewsAnalysis object
         """
-        from datetime import datetime
+        # Per-analysis spans, call counts and tokens; also feeds the /metrics counters
+        counter = APICallCounter()
+        circuit = LLMCircuitCallback()
+        finished = False
+        try:
+            # Start timer
+            start_time = time.time()
+            
+            # Don't start a run that can't finish: fail fast while the model or search API is down
+            check_circuits()
         
-        # Start timer
-        start_time = time.time()
+            # Prepare the query for the agent
+            query = _story_query(location, topic)
         
-        # Prepare the query for the agent
-        if topic:
-            query = f"Analyze the news story about '{topic}' in {location}. Provide a complete multi-perspective analysis. IMPORTANT: Include the full article URL for every news source you cite."
-        else:
-            query = f"Find the biggest current news story in {location} and provide a complete multi-perspective analysis. IMPORTANT: Include the full article URL for every news source you cite."
+            print(f"\n{'='*80}")
+            print(f"🔍 Analyzing news in {location}...")
+            print(f"⏱️  Started at: {datetime.now().strftime('%H:%M:%S')}")
+            print(f"{'='*80}\n")
         
-        print(f"\n{'='*80}")
-        print(f"🔍 Analyzing news in {location}...")
-        print(f"⏱️  Started at: {datetime.now().strftime('%H:%M:%S')}")
-        print(f"{'='*80}\n")
+            yield {"event": "started", "data": {"location": location, "topic": topic}}
         
-        # Use a unique thread_id for this analysis
-        config = {"configurable": {"thread_id": f"{location}_{datetime.now().timestamp()}"}}
+            # Use a unique thread_id for this analysis
+            thread_id = f"{location}_{datetime.now().timestamp()}"
+            config = {"configurable": {"thread_id": thread_id}, "callbacks": [counter, circuit]}
+            if self.compactor is not None:
+                self.compactor.begin(thread_id)
+            if self.checkpoint_mode == "bounded" and self.checkpointer is not None:
+                # Not evicted while the run needs it, however many other runs write checkpoints
+                self.checkpointer.begin(thread_id)
+            tool_output = None
         
-        # Single agent call - it orchestrates everything internally
-        result = await self.agent.ainvoke(
-            {"messages": [{"role": "user", "content": query}]},
-            config=config
-        )
+            research_output = ""
+            analysis = None
+            path = "two_pass"
+            try:
+                if self.pipeline == "parallel":
+                    # Sides researched concurrently; subgraphs=True streams the branches' own agent steps
+                    async for namespace, update in self.research_graph.astream(
+                        {"location": location, "topic": topic},
+                        config=config,
+                        stream_mode="updates",
+                        subgraphs=True
+                    ):
+                        for node, node_update in update.items():
+                            node_update = node_update or {}
+                            if namespace:
+                                for message in node_update.get('messages', []):
+                                    for event in _progress_events(message):
+                                        yield event
+                            else:
+                                for event in _research_events(node, node_update):
+                                    yield event
+                                if node == "synthesize":
+                                    analysis = node_update["analysis"]
+                    path = "parallel"
+                else:
+                    # Single agent run - it orchestrates everything internally; stream each step as it finishes
+                    with counter.span("agent_loop"):
+                        async for update in self.agent.astream(
+                            {"messages": [{"role": "user", "content": query}]},
+                            config=config,
+                            stream_mode="updates"
+                        ):
+                            for node_update in update.values():
+                                node_update = node_update or {}
+                                for message in node_update.get('messages', []):
+                                    for event in _progress_events(message):
+                                        yield event
+                                    if isinstance(message, AIMessage) and not message.tool_calls:
+                                        research_output = _message_text(message)
+                                if isinstance(node_update.get('structured_response'), NewsAnalysis):
+                                    analysis = node_update['structured_response']
+                                    path = "single_pass"
+                    if analysis is None and self.output_mode == "single_pass":
+                        path = "fallback_missing"
+            except StructuredOutputValidationError as e:
+                # The agent answered, but not with a valid NewsAnalysis; structure its answer separately
+                print(f"⚠️  Agent output failed validation, structuring separately: {e}")
+                research_output = "\n\n".join(filter(None, [research_output, _invalid_output_text(e.ai_message)]))
+                path = "fallback_invalid"
+            finally:
+                # The run is never resumed, so its message history can go right away
+                if self.checkpoint_mode == "cleanup" and self.checkpointer is not None:
+                    self.checkpointer.delete_thread(thread_id)
+                elif self.checkpoint_mode == "bounded" and self.checkpointer is not None:
+                    self.checkpointer.end(thread_id)
+                if self.compactor is not None:
+                    tool_output = self.compactor.end(thread_id)
         
-        # Get the agent's research output
-        research_output = result['messages'][-1].content
+            if analysis is None:
+                print(f"\n📊 Structuring analysis...")
+                yield {"event": "structuring", "data": {"reason": path}}
+            
+                # Parse into structured format with a single LLM call
+                # Only this call is retried if it fails; the research is kept
+                with counter.span("structuring"):
+                    analysis = await run_stage("structuring", lambda: self.structured_model.ainvoke([
+                        {"role": "system", "content": "You are a data structuring assistant. Convert the news analysis into the required NewsAnalysis format. Be accurate and preserve all information. CRITICAL: Ensure all NewsSource objects include their full article URLs - do not omit or leave URLs empty."},
+                        {"role": "user", "content": f"Location: {location}\n\nAnalysis:\n{research_output}"}
+                    ], config={"callbacks": [counter, circuit]}))
+            self.output_paths[path] += 1
         
-        print(f"\n📊 Structuring analysis...")
+            # Ensure date_analyzed is set
+            if not analysis.date_analyzed:
+                analysis.date_analyzed = datetime.now().isoformat()
+            
+            if self.outlet_registry is not None:
+                # Learn from what the agent found before filling gaps from earlier analyses
+                self.outlet_registry.record_analysis(analysis)
+                self.outlet_registry.fill(analysis)
         
-        # Parse into structured format with a single LLM call
-        analysis = await self.structured_model.ainvoke([
-            {"role": "system", "content": "You are a data structuring assistant. Convert the news analysis into the required NewsAnalysis format. Be accurate and preserve all information. CRITICAL: Ensure all NewsSource objects include their full article URLs - do not omit or leave URLs empty."},
-            {"role": "user", "content": f"Location: {location}\n\nAnalysis:\n{research_output}"}
-        ])
+            # Calculate total time
+            total_time = time.time() - start_time
+            metrics = counter.finish(self.pipeline, "ok")
+            finished = True
+            if tool_output is not None:
+                metrics["tool_output"] = tool_output
+            analysis._metrics = metrics
         
-        # Ensure date_analyzed is set
-        if not analysis.date_analyzed:
-            analysis.date_analyzed = datetime.now().isoformat()
+            # Print metrics
+            print(f"\n{'='*80}")
+            print(f"✅ Analysis complete!")
+            print(f"⏱️  Total time: {total_time:.2f}s ({total_time/60:.2f} minutes)")
+            print(f"📈 {metrics['llm_calls']} LLM calls, {metrics['tool_calls']} tool calls, "
+                  f"{metrics['input_tokens']:,} input / {metrics['output_tokens']:,} output tokens")
+            if tool_output is not None:
+                print(f"✂️  Search output: {tool_output['tokens']:,} of {tool_output['raw_tokens']:,} tokens sent "
+                      f"({tool_output['duplicates']} duplicates, {tool_output['trimmed']} trimmed, {tool_output['over_budget']} over budget)")
+            print(f"🧩 Structured output: {path}")
+            print(f"{'='*80}\n")
         
-        # Calculate total time
-        total_time = time.time() - start_time
+            yield {"event": "metrics", "data": metrics}
+            yield {"event": "analysis", "data": analysis}
+        finally:
+            if not finished:
+                counter.finish(self.pipeline, "error")
+    
+    
+    async def update_analysis(self, previous: Union[NewsAnalysis, Dict[str, Any]], location: str, topic: str) -> NewsAnalysis:
+        """
+        Delta update of an earlier analysis of a continuing story: one search plus one structuring call
         
-        # Print metrics
-        print(f"\n{'='*80}")
-        print(f"✅ Analysis complete!")
-        print(f"⏱️  Total time: {total_time:.2f}s ({total_time/60:.2f} minutes)")
-        print(f"{'='*80}\n")
+        Much cheaper than analyze_news; used by the daily refresh for stories it already analyzed.
+        
+        Args:
+            previous: The earlier NewsAnalysis (or its dict)
+            location: Geographic location of the story
+            topic: Today's headline for the story
+        
+        Returns:
+            NewsAnalysis: The earlier analysis revised with the latest developments
+        """
+        if isinstance(previous, NewsAnalysis):
+            previous = previous.model_dump()
+        counter = APICallCounter()
+        callbacks = [counter, LLMCircuitCallback()]
+        thread_id = f"delta_{location}_{datetime.now().timestamp()}"
+        print(f"🔁 Updating analysis of '{topic[:60]}'...")
+        if self.compactor is not None:
+            self.compactor.begin(thread_id)
+        try:
+            check_circuits()
+            with counter.span("delta_update"):
+                results = await run_stage("delta_search", lambda: self.search_tool.ainvoke(
+                    {"query": f"{topic} latest developments"},
+                    config={"callbacks": callbacks, "configurable": {"thread_id": thread_id}}
+                ))
+                if isinstance(results, dict) and "error" in results:
+                    raise RuntimeError(f"Search failed: {results['error']}")
+                analysis = await run_stage("delta_structuring", lambda: self.structured_model.ainvoke([
+                    {"role": "system", "content": UPDATE_PROMPT},
+                    {"role": "user", "content": f"Location: {location}\nToday's headline: {topic}\n\n"
+                                                f"EXISTING ANALYSIS:\n{json.dumps(previous)}\n\n"
+                                                f"LATEST SEARCH RESULTS:\n{json.dumps(results, default=str)}"}
+                ], config={"callbacks": callbacks}))
+        except BaseException:
+            counter.finish("delta", "error")
+            raise
+        finally:
+            tool_output = self.compactor.end(thread_id) if self.compactor is not None else None
+        analysis.date_analyzed = datetime.now().isoformat()
+        analysis._metrics = counter.finish("delta", "ok")
+        if tool_output is not None:
+            analysis._metrics["tool_output"] = tool_output
+        if self.outlet_registry is not None:
+            self.outlet_registry.record_analysis(analysis)
+            self.outlet_registry.fill(analysis)
+        return analysis
+    
+    
+    async def analyze_news(
+        self,
+        location: str,
+        topic: Optional[str] = None,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> NewsAnalysis:
+        """
+        Main method to analyze news from multiple perspectives
+        
+        Args:
+            location: Geographic location (e.g., "United States", "California", "New York City")
+            topic: Optional specific topic. If None, finds biggest current news in location
+            on_event: Optional callback receiving each progress event from analyze_news_stream
+        
+        Returns:
+            NewsAnalysis: Complete analysis with multiple perspectives
+        """
+        analysis = None
+        async for event in self.analyze_news_stream(location, topic):
+            if on_event:
+                on_event(event)
+            if event["event"] == "analysis":
+                analysis = event["data"]
         
         return analysis
 
 
+# ============= PROGRESS EVENTS =============
+
+# Names of the tools ToolStrategy binds for structured answers (NewsAnalysis, StoryPlan, ...)
+OUTPUT_TOOLS = {schema.__name__ for schema in (NewsAnalysis, StoryPlan, Perspective, SocialMediaVoices)}
+
+
+def _message_text(message: BaseMessage) -> str:
+    """Plain text of a message (Gemini may return a list of content parts)"""
+    if isinstance(message.content, str):
+        return message.content
+    return "".join(
+        part.get("text", "") if isinstance(part, dict) else str(part)
+        for part in message.content
+    )
+
+
+def _invalid_output_text(message: AIMessage) -> str:
+    """The agent's rejected NewsAnalysis answer, as text for the structuring pass"""
+    parts = [_message_text(message).strip()]
+    for call in message.tool_calls:
+        if call["name"] == NewsAnalysis.__name__:
+            parts.append(json.dumps(call["args"], indent=2, ensure_ascii=False))
+    return "\n\n".join(part for part in parts if part)
+
+
+def _progress_events(message: BaseMessage) -> List[Dict[str, Any]]:
+    """Translate one agent message into streaming progress events"""
+    events = []
+    
+    # The structured-output tool call is the answer itself, not a step worth reporting
+    if isinstance(message, ToolMessage) and message.name in OUTPUT_TOOLS:
+        return events
+    
+    if isinstance(message, AIMessage):
+        text = _message_text(message).strip()
+        if text and message.tool_calls:
+            events.append({"event": "reasoning", "data": {"content": text}})
+        for call in message.tool_calls:
+            if call["name"] in OUTPUT_TOOLS:
+                continue
+            events.append({
+                "event": "tool_call",
+                "data": {"tool": call["name"], "query": call["args"].get("query", call["args"])}
+            })
+    
+    elif isinstance(message, ToolMessage):
+        try:
+            results = json.loads(_message_text(message)).get("results", [])
+        except (ValueError, AttributeError):
+            results = []
+        events.append({
+            "event": "sources",
+            "data": {
+                "tool": message.name,
+                "sources": [
+                    {"title": item.get("title", ""), "url": item.get("url", "")}
+                    for item in results if isinstance(item, dict)
+                ]
+            }
+        })
+    
+    return events
+
+
+def _research_events(node: str, update: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Translate one parallel research step into streaming progress events"""
+    if node == "identify_sides" and update.get("plan"):
+        plan = update["plan"]
+        return [{"event": "plan", "data": {
+            "topic": plan.topic,
+            "headline": plan.headline,
+            "sides": [side.name for side in plan.sides]
+        }}]
+    if node == "research_perspective":
+        return [
+            {"event": "perspective", "data": {
+                "side_name": perspective.side_name,
+                "sources": [{"name": source.name, "url": source.url} for source in perspective.sources]
+            }}
+            for _, perspective in update.get("perspectives", [])
+        ]
+    if node == "research_social_media":
+        return [{"event": "social_media", "data": {
+            "voices": [{"name": voice.name, "url": voice.url} for voice in update.get("social_media_voices", [])]
+        }}]
+    return []
+
+
 # ============= EXAMPLE USAGE =============
 
 async def main():
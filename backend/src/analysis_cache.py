@@ -0,0 +1,235 @@
+"""
+Persistent cache of NewsAnalysis results
+Stored in a local SQLite file, keyed by a hash of the normalized location + topic
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from .models import NewsAnalysis
+from .cache import normalize_topic
+from .similarity import HASHER, MinHasher, headline_words
+
+
+# ============= CONFIGURATION =============
+
+# Analyses younger than this are served as-is
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", "21600"))  # 6 hours
+# Older (but younger than this) analyses are served immediately and refreshed in the background
+ANALYSIS_CACHE_MAX_STALE = float(os.getenv("ANALYSIS_CACHE_MAX_STALE", "604800"))  # 7 days
+
+
+def analysis_cache_key(location: str, topic: Optional[str]) -> str:
+    """Content address for an analysis request"""
+    raw = f"{normalize_topic(location)}\x1f{normalize_topic(topic or '')}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class AnalysisCache:
+    """SQLite-backed NewsAnalysis store that survives restarts"""
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: float = ANALYSIS_CACHE_TTL,
+        max_stale: float = ANALYSIS_CACHE_MAX_STALE,
+    ):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_stale = max(max_stale, ttl)
+
+        # Sync endpoints run in a threadpool, so share one connection behind a lock (other
+        # processes wait up to `timeout` for the write lock)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS analyses (
+                key TEXT PRIMARY KEY,
+                location TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                data TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS analyses_location ON analyses (location, created_at)")
+        self._conn.commit()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def get(self, location: str, topic: Optional[str]) -> Optional[Tuple[NewsAnalysis, bool]]:
+        """
+        Cached analysis for location + topic
+
+        Returns:
+            (analysis, is_fresh), or None if missing or older than max_stale
+        """
+        key = analysis_cache_key(location, topic)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at, data FROM analyses WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return None
+
+        age = time.time() - row[0]
+        if age > self.max_stale:
+            self.misses += 1
+            return None
+
+        try:
+            analysis = NewsAnalysis.model_validate_json(row[1])
+        except Exception as e:
+            print(f"⚠️  Dropping unreadable cached analysis: {e}")
+            self.delete(location, topic)
+            self.misses += 1
+            return None
+
+        fresh = age <= self.ttl
+        if fresh:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return analysis, fresh
+
+    def has(self, location: str, topic: Optional[str]) -> bool:
+        """True if get() would return an analysis (fresh or stale), without counting a lookup"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created_at FROM analyses WHERE key = ?", (analysis_cache_key(location, topic),)
+            ).fetchone()
+        return row is not None and time.time() - row[0] <= self.max_stale
+
+    def nearest(self, location: str, topic: Optional[str], threshold: float,
+                limit: int = 500) -> Optional[Tuple[NewsAnalysis, float, float]]:
+        """
+        Closest stored analysis to stand in when a new one can't be made (at any age)
+
+        The exact location + topic if stored, otherwise the analysis of the same location whose
+        topic is most similar (at least `threshold`), looking at the `limit` most recent ones.
+        A similar topic must contain every significant word of the requested one: "earthquake hits
+        japan" is close to "earthquake hits turkey" but must not be answered with it.
+        Requests without a topic get the location's most recent analysis.
+
+        Returns:
+            (analysis, topic similarity (1.0 if exact), age in seconds), or None
+        """
+        wanted = normalize_topic(topic or "")
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT topic, created_at, data FROM analyses WHERE location = ? ORDER BY created_at DESC LIMIT ?",
+                (normalize_topic(location), limit)
+            ).fetchall()
+        if not rows:
+            return None
+
+        best, best_score = None, 0.0
+        if not wanted:
+            best, best_score = rows[0], 1.0
+        else:
+            signature = HASHER.signature(wanted)
+            key_terms = headline_words(wanted)
+            for row in rows:
+                if row[0] != wanted and not key_terms <= headline_words(row[0]):
+                    continue
+                score = 1.0 if row[0] == wanted else MinHasher.similarity(signature, HASHER.signature(row[0]))
+                if score > best_score:
+                    best, best_score = row, score
+                    if score == 1.0:
+                        break
+        if best is None or best_score < threshold:
+            return None
+
+        try:
+            analysis = NewsAnalysis.model_validate_json(best[2])
+        except Exception as e:
+            print(f"⚠️  Skipping unreadable cached analysis: {e}")
+            return None
+        return analysis, best_score, time.time() - best[1]
+
+    def put(self, location: str, topic: Optional[str], analysis: Union[NewsAnalysis, Dict[str, Any]]):
+        """Store (or replace) the analysis for location + topic"""
+        data = analysis.model_dump_json() if isinstance(analysis, NewsAnalysis) else json.dumps(analysis)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, location, topic, created_at, data) VALUES (?, ?, ?, ?, ?)",
+                (
+                    analysis_cache_key(location, topic),
+                    normalize_topic(location),
+                    normalize_topic(topic or ""),
+                    time.time(),
+                    data,
+                )
+            )
+            self._conn.commit()
+        self.writes += 1
+
+    def put_if_missing(self, location: str, topic: Optional[str], analysis: Dict[str, Any], created_at: float):
+        """Seed an analysis (e.g. from the daily news file) without replacing a newer one"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO analyses (key, location, topic, created_at, data) VALUES (?, ?, ?, ?, ?)",
+                (
+                    analysis_cache_key(location, topic),
+                    normalize_topic(location),
+                    normalize_topic(topic or ""),
+                    created_at,
+                    json.dumps(analysis),
+                )
+            )
+            self._conn.commit()
+
+    def iter_analyses(self) -> Iterator[Dict[str, Any]]:
+        """Every stored analysis as a dict (unreadable rows skipped), oldest first"""
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM analyses ORDER BY created_at").fetchall()
+        for (data,) in rows:
+            try:
+                yield json.loads(data)
+            except ValueError:
+                continue
+
+    def delete(self, location: str, topic: Optional[str]):
+        with self._lock:
+            self._conn.execute("DELETE FROM analyses WHERE key = ?", (analysis_cache_key(location, topic),))
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete analyses older than max_stale, returns how many were removed"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM analyses WHERE created_at < ?", (time.time() - self.max_stale,)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "size": size,
+            "ttl_seconds": self.ttl,
+            "max_stale_seconds": self.max_stale,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+            "writes": self.writes,
+        }
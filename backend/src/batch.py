@@ -0,0 +1,151 @@
+"""
+Batch analysis jobs
+Runs many (location, topic) analyses as one job with per-item progress and partial results
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+# ============= CONFIGURATION =============
+
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "50"))
+# Finished jobs kept for polling (oldest dropped first) and for how long
+BATCH_MAX_JOBS = int(os.getenv("BATCH_MAX_JOBS", "100"))
+BATCH_JOB_TTL = float(os.getenv("BATCH_JOB_TTL", "3600"))
+
+# run_item(location, topic, priority) -> (analysis, "cached" | "analyzed")
+RunItem = Callable[[str, Optional[str], str], Awaitable[Tuple[Any, str]]]
+
+
+class BatchJob:
+    """One batch of analyses and the state of each item"""
+
+    def __init__(self, items: List[Dict[str, Any]], priority: str):
+        self.id = uuid.uuid4().hex
+        self.priority = priority
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.items = [
+            {
+                "index": index,
+                "location": item["location"],
+                "topic": item.get("topic"),
+                "status": "queued",  # queued | running | done | cached | error
+                "error": None,
+                "analysis": None,
+                "elapsed": None,
+            }
+            for index, item in enumerate(items)
+        ]
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def status(self) -> str:
+        if self.task is not None and self.task.cancelled():
+            return "cancelled"
+        if self.finished_at is None:
+            return "queued" if all(item["status"] == "queued" for item in self.items) else "running"
+        return "failed" if all(item["status"] == "error" for item in self.items) else "done"
+
+    def progress(self) -> Dict[str, int]:
+        counts = {"total": len(self.items), "completed": 0, "cached": 0, "failed": 0, "running": 0}
+        for item in self.items:
+            if item["status"] in ("done", "cached", "error"):
+                counts["completed"] += 1
+            if item["status"] == "cached":
+                counts["cached"] += 1
+            elif item["status"] == "error":
+                counts["failed"] += 1
+            elif item["status"] == "running":
+                counts["running"] += 1
+        return counts
+
+    def to_dict(self, include_results: bool = True) -> Dict[str, Any]:
+        """Job status with each item's progress and, if finished, its analysis"""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress(),
+            "items": [
+                item if include_results else {key: value for key, value in item.items() if key != "analysis"}
+                for item in self.items
+            ],
+        }
+
+
+class BatchManager:
+    """Starts batch jobs and keeps them around for polling"""
+
+    def __init__(self, run_item: RunItem, max_jobs: int = BATCH_MAX_JOBS, ttl: float = BATCH_JOB_TTL):
+        self.run_item = run_item
+        self.max_jobs = max(1, max_jobs)
+        self.ttl = ttl
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+        self.submitted = 0
+        self.items_submitted = 0
+
+    def submit(self, items: List[Dict[str, Any]], priority: str = "normal") -> BatchJob:
+        """Start a job for the items ({location, topic} dicts) and return it right away"""
+        self._prune()
+        job = BatchJob(items, priority)
+        job.task = asyncio.create_task(self._run(job))
+        self._jobs[job.id] = job
+        self.submitted += 1
+        self.items_submitted += len(items)
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        return self._jobs.get(job_id)
+
+    async def _run(self, job: BatchJob):
+        async def run(item: Dict[str, Any]):
+            started = time.time()
+            item["status"] = "running"
+            try:
+                analysis, source = await self.run_item(item["location"], item["topic"], job.priority)
+                item["analysis"] = analysis.dict() if hasattr(analysis, "dict") else analysis
+                item["status"] = "cached" if source == "cached" else "done"
+            except Exception as e:
+                item["status"] = "error"
+                item["error"] = str(e)
+            item["elapsed"] = round(time.time() - started, 3)
+
+        try:
+            # Items queue in the shared executor; results land on the job as each one finishes
+            await asyncio.gather(*(run(item) for item in job.items))
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        """Drop expired finished jobs, then the oldest finished ones beyond max_jobs"""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished_at is not None]
+        for job in finished:
+            if now - job.finished_at > self.ttl:
+                del self._jobs[job.id]
+        finished = [job for job in finished if job.id in self._jobs]
+        for job in finished[:max(0, len(self._jobs) - self.max_jobs + 1)]:
+            del self._jobs[job.id]
+
+    async def close(self):
+        """Cancel jobs that are still running"""
+        tasks = [job.task for job in self._jobs.values() if job.task is not None and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "jobs": len(self._jobs),
+            "running": sum(1 for job in self._jobs.values() if job.finished_at is None),
+            "submitted": self.submitted,
+            "items_submitted": self.items_submitted,
+        }
@@ -0,0 +1,370 @@
+"""
+In-process caches
+LRU + TTL cache with hit/miss counters, and the persisted search headline cache built on it
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-process use only
+    fcntl = None
+
+try:
+    from .packed import PackedReader, is_packed, pack, unpack_file
+    from .similarity import TOPIC_MATCH_THRESHOLD, SimilarityIndex
+except ImportError:  # imported by agent.py run as a script
+    from packed import PackedReader, is_packed, pack, unpack_file
+    from similarity import TOPIC_MATCH_THRESHOLD, SimilarityIndex
+
+
+# ============= CONFIGURATION =============
+
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "21600"))  # 6 hours
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "500"))
+SEARCH_CACHE_FLUSH_DELAY = float(os.getenv("SEARCH_CACHE_FLUSH_DELAY", "2.0"))
+
+
+def normalize_topic(topic: str) -> str:
+    """Cache key for a topic: lowercase with collapsed whitespace"""
+    return " ".join(topic.lower().split())
+
+
+def atomic_write(path: Path, data: bytes):
+    """Write a file atomically: write a temp file in the same directory, then rename over"""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates 0600 files; keep the permissions of the file being replaced
+        os.chmod(tmp_path, path.stat().st_mode & 0o777 if path.exists() else 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@contextlib.contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    Exclusive lock shared by every process using `path` (flock on a `<name>.lock` file next to it)
+
+    Blocks until the lock is free. Held across read-modify-write cycles so processes don't
+    overwrite each other's changes.
+    """
+    path = Path(path)
+    if fcntl is None:
+        yield
+        return
+    with open(path.with_name(f"{path.name}.lock"), "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire `ttl` seconds after they were stored"""
+
+    def __init__(self, max_entries: int, ttl: Optional[float]):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl if ttl and ttl > 0 else None
+        # key -> (stored_at epoch seconds, value), least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self._peek(key) is not None
+
+    def _is_expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def _peek(self, key: str) -> Optional[Tuple[float, Any]]:
+        """Entry for key without touching LRU order or counters (None if missing/expired)"""
+        entry = self._entries.get(key)
+        if entry is None or self._is_expired(entry[0], time.time()):
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[Any]:
+        """Value for key, or None if missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if self._is_expired(entry[0], time.time()):
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None):
+        """Store value, evicting the least recently used entries over max_entries"""
+        self._entries[key] = (stored_at if stored_at is not None else time.time(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        return self._entries.pop(key, None) is not None
+
+    def items(self) -> List[Tuple[str, float, Any]]:
+        """(key, stored_at, value) for every live entry, least recently used first"""
+        now = time.time()
+        return [
+            (key, stored_at, value)
+            for key, (stored_at, value) in self._entries.items()
+            if not self._is_expired(stored_at, now)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+        }
+
+
+class SearchCache(TTLCache):
+    """
+    Headlines for /search, keyed by normalized topic
+
+    Lookups only touch memory. A topic with no entry of its own is answered from the most
+    similar cached topic if that is at least `match_threshold` similar ("lagos, nigeria news"
+    finds "lagos nigeria"); 1.0 or more disables this. Writes are persisted write-behind:
+    changes made within `flush_delay` seconds are coalesced into one atomic rewrite of the file,
+    a packed cache file with one record per topic. Several processes can share the file: each
+    write holds a file lock and merges in the entries other processes wrote since (newest wins),
+    so no process drops another's results. A JSON cache (at `path` or `legacy_path`) is read
+    on load and rewritten packed.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+        ttl: Optional[float] = SEARCH_CACHE_TTL,
+        flush_delay: float = SEARCH_CACHE_FLUSH_DELAY,
+        match_threshold: float = TOPIC_MATCH_THRESHOLD,
+        legacy_path: Optional[Path] = None,
+    ):
+        super().__init__(max_entries=max_entries, ttl=ttl)
+        self.path = Path(path)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self.flush_delay = flush_delay
+        self.match_threshold = match_threshold
+        self.writes = 0
+        self.near_hits = 0
+        # Signatures of the cached topics, brought up to date on the first near-miss lookup after a change
+        self._index = SimilarityIndex()
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+
+    # ---------- persistence ----------
+
+    def _read_file(self, path: Optional[Path] = None) -> Dict[str, Any]:
+        path = path or self.path
+        if not path.exists():
+            return {}
+        try:
+            if is_packed(path):
+                return unpack_file(path)[1]
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️  Error loading search cache: {e}")
+            return {}
+
+    def read_entry(self, topic: str) -> Optional[Dict[str, Any]]:
+        """A topic's saved entry straight from the file, decoding only that record (None if missing)"""
+        if not is_packed(self.path):
+            return self._read_file().get(normalize_topic(topic))
+        try:
+            return PackedReader(self.path).get(normalize_topic(topic))
+        except Exception as e:
+            print(f"⚠️  Error reading search cache: {e}")
+            return None
+
+    def _merge(self, data: Dict[str, Any]) -> int:
+        """Adopt file entries that are newer than ours (and not expired), returns how many"""
+        merged = 0
+        now = time.time()
+        for key, entry in data.items():
+            key = normalize_topic(key)
+            stored_at = self._stored_at(entry)
+            if self._is_expired(stored_at, now):
+                continue
+            current = self._entries.get(key)
+            if current is None or current[0] < stored_at:
+                self.set(key, entry.get('headlines', []), stored_at=stored_at)
+                merged += 1
+        return merged
+
+    def load(self):
+        """Load entries from the cache file (expired entries are dropped), migrating a JSON cache"""
+        source = self.path
+        if not source.exists():
+            if self.legacy_path is None or not self.legacy_path.exists():
+                return
+            source = self.legacy_path
+        self._merge(self._read_file(source))
+        print(f"✅ Loaded {len(self)} cached searches from {source.name}")
+        if source != self.path or not is_packed(self.path):
+            self._dirty = True
+            self.flush_now()
+            if not self._dirty:
+                print(f"📦 Migrated {source.name} to {self.path.name}")
+
+    @staticmethod
+    def _stored_at(entry: Dict[str, Any]) -> float:
+        """Epoch time an entry was cached (older files only have the calendar date)"""
+        try:
+            if entry.get('cached_at'):
+                return datetime.fromisoformat(entry['cached_at']).timestamp()
+            return datetime.strptime(entry['date'], '%Y-%m-%d').timestamp()
+        except (KeyError, TypeError, ValueError):
+            return 0.0
+
+    def _file_entries(self) -> Dict[str, Any]:
+        data = {}
+        for key, stored_at, headlines in self.items():
+            cached_at = datetime.fromtimestamp(stored_at)
+            data[key] = {
+                'date': cached_at.strftime('%Y-%m-%d'),
+                'cached_at': cached_at.isoformat(),
+                'headlines': headlines,
+            }
+        return data
+
+    def _write_merged(self, ours: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Under the file lock, combine our entries with what other processes saved (newest wins)
+        and rewrite the file
+
+        Returns:
+            The entries that were in the file, to merge into memory afterwards
+        """
+        with file_lock(self.path):
+            theirs = self._read_file()
+            now = time.time()
+            combined = {key: entry for key, entry in theirs.items()
+                        if not self._is_expired(self._stored_at(entry), now)}
+            for key, entry in ours.items():
+                if key not in combined or self._stored_at(combined[key]) <= self._stored_at(entry):
+                    combined[key] = entry
+            newest = sorted(combined.items(), key=lambda item: self._stored_at(item[1]), reverse=True)
+            atomic_write(self.path, pack({}, dict(newest[:self.max_entries])))
+        return theirs
+
+    def flush_now(self):
+        """Write the cache file synchronously if there are unsaved changes"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            self._merge(self._write_merged(self._file_entries()))
+            self.writes += 1
+        except Exception as e:
+            self._dirty = True
+            print(f"⚠️  Error saving search cache: {e}")
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_delay)
+        self._flush_task = None
+        if not self._dirty:
+            return
+        self._dirty = False
+        # Snapshot and merge on the loop (consistent view); wait for the file lock and write off the loop
+        ours = self._file_entries()
+        try:
+            theirs = await asyncio.to_thread(self._write_merged, ours)
+            self._merge(theirs)
+            self.writes += 1
+        except Exception as e:
+            self._dirty = True
+            print(f"⚠️  Error saving search cache: {e}")
+
+    def _schedule_flush(self):
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_now()
+            return
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush_later())
+
+    async def close(self):
+        """Cancel the pending write-behind and flush synchronously"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self.flush_now()
+
+    # ---------- headlines ----------
+
+    def find_similar(self, topic: str) -> Optional[Tuple[str, float]]:
+        """Most similar cached topic other than `topic` itself and its similarity, if above the threshold"""
+        if self.match_threshold >= 1.0:
+            return None
+        key = normalize_topic(topic)
+        self._index.sync({cached: cached for cached, _, _ in self.items()})
+        return self._index.nearest(key, self.match_threshold, exclude=key)
+
+    def get_headlines(self, topic: str) -> Optional[List[Dict[str, str]]]:
+        key = normalize_topic(topic)
+        if key not in self:
+            match = self.find_similar(key)
+            if match is not None:
+                print(f"≈ Search topic '{topic}' matches cached '{match[0]}' ({match[1]:.2f})")
+                self.near_hits += 1
+                key = match[0]
+        return self.get(key)
+
+    def put_headlines(self, topic: str, headlines: List[Dict[str, str]]):
+        self.set(normalize_topic(topic), headlines)
+        self._schedule_flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "near_hits": self.near_hits,
+            "match_threshold": self.match_threshold,
+            "file_writes": self.writes,
+            "pending_write": self._dirty,
+        }
@@ -0,0 +1,232 @@
+"""
+LangChain callback handlers for analyses
+APICallCounter records one analysis' stage spans, LLM/tool calls and tokens into the metrics in
+telemetry.py; LLMCircuitCallback puts chat model calls behind the "llm" circuit breaker. Only the
+agent imports this module, so the API starts without loading LangChain
+"""
+
+import contextlib
+import time
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+try:
+    from .resilience import BREAKERS, CircuitBreaker
+    from .telemetry import (
+        ANALYSES, ANALYSIS_SECONDS, LLM_CALLS, LLM_SECONDS, LLM_TOKENS, STAGE_SECONDS, TOOL_CALLS, TOOL_SECONDS,
+    )
+except ImportError:  # imported by agent.py run as a script
+    from resilience import BREAKERS, CircuitBreaker
+    from telemetry import (
+        ANALYSES, ANALYSIS_SECONDS, LLM_CALLS, LLM_SECONDS, LLM_TOKENS, STAGE_SECONDS, TOOL_CALLS, TOOL_SECONDS,
+    )
+
+
+# ============= PER-ANALYSIS COUNTER =============
+
+# Top-level research graph nodes timed as stages
+GRAPH_STAGES = ("identify_sides", "research_perspective", "research_social_media", "synthesize")
+
+
+class APICallCounter(BaseCallbackHandler):
+    """
+    LangChain callback that records one analysis: stage spans, every LLM and tool call, tokens
+
+    Pass it in the run config ({"callbacks": [counter]}); it follows sub-agents and graph branches.
+    Call finish() once at the end to publish to the Prometheus metrics.
+    """
+
+    # Called synchronously from the event loop, so no locking is needed
+    run_inline = True
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self._open: Dict[UUID, Dict[str, Any]] = {}
+        # checkpoint namespace -> run id of the stage span open for it
+        self._stage_runs: Dict[str, UUID] = {}
+        self._current_stage = "agent_loop"
+        self.llm_calls = 0
+        self.tool_calls = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.duration: Optional[float] = None
+
+    def _stage_of(self, metadata: Optional[Dict[str, Any]]) -> str:
+        """Stage a call belongs to: the top-level graph node it runs under"""
+        namespace = (metadata or {}).get("langgraph_checkpoint_ns") or ""
+        node = namespace.split("|")[0].split(":")[0]
+        return node if node in GRAPH_STAGES else self._current_stage
+
+    def _open_span(self, run_id: UUID, kind: str, name: str, stage: str):
+        self._open[run_id] = {"kind": kind, "name": name, "stage": stage, "start": time.perf_counter()}
+
+    def _close_span(self, run_id: UUID, error: Optional[BaseException] = None, **fields: Any) -> Optional[Dict[str, Any]]:
+        span = self._open.pop(run_id, None)
+        if span is None:
+            return None
+        span["seconds"] = round(time.perf_counter() - span["start"], 4)
+        span["start"] = round(span["start"] - self.started, 4)
+        if error is not None:
+            span["error"] = f"{type(error).__name__}: {error}"[:200]
+            self.errors += 1
+        span.update(fields)
+        self.spans.append(span)
+        return span
+
+    @contextlib.contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time a stage run outside the research graph (agent loop, structuring)"""
+        previous, self._current_stage = self._current_stage, stage
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._current_stage = previous
+            span = {"kind": "stage", "name": stage, "stage": stage,
+                    "start": round(start - self.started, 4), "seconds": round(time.perf_counter() - start, 4)}
+            if error is not None and not isinstance(error, GeneratorExit):
+                span["error"] = f"{type(error).__name__}: {error}"[:200]
+            self.spans.append(span)
+
+    # ----- graph stages -----
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        namespace = metadata.get("langgraph_checkpoint_ns") or ""
+        name = kwargs.get("name")
+        # The node's own run, not the sub-agent or chains nested inside it
+        if name in GRAPH_STAGES and metadata.get("langgraph_node") == name and "|" not in namespace \
+                and namespace not in self._stage_runs:
+            self._stage_runs[namespace] = run_id
+            self._open_span(run_id, "stage", name, name)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        if run_id in self._open and self._open[run_id]["kind"] == "stage":
+            self._close_span(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        if run_id in self._open and self._open[run_id]["kind"] == "stage":
+            self._close_span(run_id, error)
+
+    # ----- LLM calls -----
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self.llm_calls += 1
+        self._open_span(run_id, "llm", (metadata or {}).get("ls_model_name") or "chat_model", self._stage_of(metadata))
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self.on_chat_model_start(serialized, [], run_id=run_id, metadata=metadata, **kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = {}
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or usage
+        input_tokens = int(usage.get("input_tokens", 0) or 0)
+        output_tokens = int(usage.get("output_tokens", 0) or 0)
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self._close_span(run_id, input_tokens=input_tokens, output_tokens=output_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._close_span(run_id, error)
+
+    # ----- tool calls -----
+
+    def on_tool_start(self, serialized, input_str, *, run_id, metadata=None, **kwargs):
+        self.tool_calls += 1
+        self._open_span(run_id, "tool", (serialized or {}).get("name") or kwargs.get("name") or "tool", self._stage_of(metadata))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        # Search failures come back as {"error": ...} so the agent can carry on; still count them
+        content = getattr(output, "content", output)
+        failed = isinstance(content, dict) and "error" in content or isinstance(content, str) and content.startswith('{"error"')
+        span = self._close_span(run_id)
+        if span is not None and failed:
+            span["error"] = "tool returned an error"
+            self.errors += 1
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._close_span(run_id, error)
+
+    # ----- results -----
+
+    def stages(self) -> Dict[str, Dict[str, float]]:
+        """Seconds per stage, summed over parallel branches, with how many spans each had"""
+        stages: Dict[str, Dict[str, float]] = {}
+        for span in self.spans:
+            if span["kind"] == "stage":
+                stage = stages.setdefault(span["name"], {"count": 0, "seconds": 0.0})
+                stage["count"] += 1
+                stage["seconds"] = round(stage["seconds"] + span["seconds"], 4)
+        return stages
+
+    def summary(self, include_spans: bool = False) -> Dict[str, Any]:
+        summary = {
+            "seconds": round(self.duration if self.duration is not None else time.perf_counter() - self.started, 4),
+            "llm_calls": self.llm_calls,
+            "tool_calls": self.tool_calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "errors": self.errors,
+            "stages": self.stages(),
+        }
+        if include_spans:
+            summary["spans"] = sorted(self.spans, key=lambda span: span["start"])
+        return summary
+
+    def finish(self, pipeline: str, outcome: str) -> Dict[str, Any]:
+        """Stop the clock and record this analysis in the Prometheus metrics"""
+        self.duration = time.perf_counter() - self.started
+        ANALYSES.inc(pipeline=pipeline, outcome=outcome)
+        ANALYSIS_SECONDS.observe(self.duration, pipeline=pipeline)
+        for span in self.spans:
+            outcome = "error" if "error" in span else "ok"
+            if span["kind"] == "stage":
+                STAGE_SECONDS.observe(span["seconds"], stage=span["name"])
+            elif span["kind"] == "llm":
+                LLM_CALLS.inc(stage=span["stage"], outcome=outcome)
+                LLM_SECONDS.observe(span["seconds"], stage=span["stage"])
+                LLM_TOKENS.inc(span.get("input_tokens", 0), stage=span["stage"], type="input")
+                LLM_TOKENS.inc(span.get("output_tokens", 0), stage=span["stage"], type="output")
+            elif span["kind"] == "tool":
+                TOOL_CALLS.inc(tool=span["name"], outcome=outcome)
+                TOOL_SECONDS.observe(span["seconds"], tool=span["name"])
+        return self.summary()
+
+
+# ============= CIRCUIT BREAKER =============
+
+class LLMCircuitCallback(BaseCallbackHandler):
+    """
+    Puts every chat model call behind the "llm" circuit breaker
+
+    Rejects calls while the circuit is open (raise_error lets the CircuitOpenError through
+    LangChain's callback manager) and reports each call's outcome to the breaker.
+    """
+
+    raise_error = True
+    run_inline = True
+
+    def __init__(self, breaker: Optional[CircuitBreaker] = None):
+        self.breaker = breaker or BREAKERS["llm"]
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        self.breaker.check()
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        self.breaker.check()
+
+    def on_llm_end(self, response, **kwargs):
+        self.breaker.record_success()
+
+    def on_llm_error(self, error, **kwargs):
+        self.breaker.record_failure(error)
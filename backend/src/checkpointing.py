@@ -0,0 +1,124 @@
+"""
+Checkpoint retention for the LangGraph agent
+Keeps the in-memory checkpoint store from growing with every analysis
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+
+# ============= CONFIGURATION =============
+
+# none:      no checkpointer at all (analyses are single-shot, nothing is resumed)
+# cleanup:   keep checkpoints while an analysis runs, delete its thread when it finishes
+# bounded:   keep the most recent AGENT_CHECKPOINT_MAX_THREADS finished threads, each for at most
+#            AGENT_CHECKPOINT_TTL seconds (threads of analyses still running are never dropped)
+# unbounded: plain InMemorySaver, never freed (previous behavior)
+CHECKPOINT_MODES = ("none", "cleanup", "bounded", "unbounded")
+CHECKPOINT_MODE = os.getenv("AGENT_CHECKPOINT_MODE", "cleanup")
+CHECKPOINT_MAX_THREADS = int(os.getenv("AGENT_CHECKPOINT_MAX_THREADS", "100"))
+CHECKPOINT_TTL = float(os.getenv("AGENT_CHECKPOINT_TTL", "3600"))
+
+
+class BoundedInMemorySaver(InMemorySaver):
+    """
+    InMemorySaver that drops the least recently used threads beyond max_threads or idle longer than ttl
+
+    Only finished threads are dropped: the agent marks a thread active with begin() for as long as
+    its run goes on (so more than max_threads concurrent runs can't lose each other's state) and
+    calls end() when it finishes.
+    """
+
+    def __init__(self, max_threads: int = CHECKPOINT_MAX_THREADS, ttl: Optional[float] = CHECKPOINT_TTL):
+        super().__init__()
+        self.max_threads = max(1, max_threads)
+        self.ttl = ttl if ttl and ttl > 0 else None
+        # thread_id -> last write time, least recently used first
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        # Threads with a run in progress
+        self._active: Set[str] = set()
+        self.evicted_threads = 0
+
+    def begin(self, thread_id: str):
+        self._active.add(thread_id)
+
+    def end(self, thread_id: str):
+        """The thread's run finished: it may be evicted from now on"""
+        self._active.discard(thread_id)
+        if thread_id in self._last_used:
+            self._touch(thread_id)
+
+    def _touch(self, thread_id: str):
+        now = time.time()
+        self._last_used[thread_id] = now
+        self._last_used.move_to_end(thread_id)
+        self._evict(now)
+
+    def _evict(self, now: float):
+        finished = [thread for thread in self._last_used if thread not in self._active]
+        # Active threads count towards max_threads, but only finished ones make room
+        excess = len(self._last_used) - self.max_threads
+        for thread in finished:
+            expired = self.ttl is not None and now - self._last_used[thread] > self.ttl
+            if excess <= 0 and not expired:
+                break
+            self.delete_thread(thread)
+            self.evicted_threads += 1
+            excess -= 1
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        result = super().put(config, checkpoint, metadata, new_versions)
+        self._touch(config["configurable"]["thread_id"])
+        return result
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        super().put_writes(config, writes, task_id, task_path)
+        self._touch(config["configurable"]["thread_id"])
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        self._last_used.pop(thread_id, None)
+
+
+def make_checkpointer(mode: str = CHECKPOINT_MODE) -> Optional[InMemorySaver]:
+    """Checkpointer for the agent according to the retention mode"""
+    if mode not in CHECKPOINT_MODES:
+        raise ValueError(f"Unknown checkpoint mode '{mode}', expected one of {', '.join(CHECKPOINT_MODES)}")
+    if mode == "none":
+        return None
+    if mode == "bounded":
+        return BoundedInMemorySaver()
+    return InMemorySaver()
+
+
+def _payload_bytes(value: Any) -> int:
+    """Serialized bytes held in a checkpoint store entry (nested tuples of (type, bytes))"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(_payload_bytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_payload_bytes(item) for item in value.values())
+    return 0
+
+
+def checkpoint_stats(saver: Optional[InMemorySaver]) -> Dict[str, Any]:
+    """Size of an in-memory checkpoint store (threads, checkpoints, writes, serialized bytes)"""
+    if saver is None:
+        return {"threads": 0, "checkpoints": 0, "writes": 0, "blobs": 0, "bytes": 0}
+
+    threads = [thread for thread, namespaces in saver.storage.items() if any(namespaces.values())]
+    stats = {
+        "threads": len(threads),
+        "checkpoints": sum(len(checkpoints) for namespaces in saver.storage.values() for checkpoints in namespaces.values()),
+        "writes": sum(len(writes) for writes in saver.writes.values()),
+        "blobs": len(saver.blobs),
+        "bytes": _payload_bytes(dict(saver.storage)) + _payload_bytes(dict(saver.writes)) + _payload_bytes(dict(saver.blobs)),
+    }
+    if isinstance(saver, BoundedInMemorySaver):
+        stats["evicted_threads"] = saver.evicted_threads
+    return stats
@@ -0,0 +1,251 @@
+"""
+Compact search results before they reach the model
+Every search result the agent sees stays in its message history and is re-read on every later
+turn. Results are deduped by URL within a conversation, their content is cut down to the passages
+relevant to the query, and each analysis gets a token budget for search output
+"""
+
+import contextlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+try:
+    import tiktoken
+except ImportError:  # token counts fall back to a characters-per-token estimate
+    tiktoken = None
+
+try:
+    from .similarity import STOPWORDS, normalize_url
+    from .telemetry import Counter, METRICS
+except ImportError:  # imported by agent.py run as a script
+    from similarity import STOPWORDS, normalize_url
+    from telemetry import Counter, METRICS
+
+
+# ============= CONFIGURATION =============
+
+TOOL_OUTPUT_COMPACTION = os.getenv("TOOL_OUTPUT_COMPACTION", "true").lower() in ("1", "true", "yes")
+# Characters of content kept per search result (the most relevant sentences, in article order)
+TOOL_RESULT_MAX_CHARS = int(os.getenv("TOOL_RESULT_MAX_CHARS", "700"))
+# Tokens of search output one analysis may add to the model's context (0 = no budget); past it,
+# results keep only their title and URL
+ANALYSIS_CONTEXT_BUDGET = int(os.getenv("ANALYSIS_CONTEXT_BUDGET", "24000"))
+# tiktoken encoding for token accounting (an estimate for Gemini, which tokenizes differently)
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+# Let tiktoken download the encoding if it isn't in its local cache (otherwise tokens are estimated)
+TOKENIZER_DOWNLOAD = os.getenv("TOKENIZER_DOWNLOAD", "false").lower() in ("1", "true", "yes")
+
+# Result fields the model never uses
+DROPPED_FIELDS = ("raw_content", "images", "favicon", "score")
+DUPLICATE_NOTE = "(same article as an earlier result)"
+BUDGET_NOTE = "Search output budget for this analysis is used up: results show only titles and URLs."
+
+TOOL_OUTPUT_TOKENS = Counter("news_tool_output_tokens_total",
+                             "Search tool output tokens as returned by the provider and as sent to the model", ("kind",))
+TOOL_RESULTS = Counter("news_tool_results_total", "Search results by what compaction did to them", ("outcome",))
+METRICS.extend([TOOL_OUTPUT_TOKENS, TOOL_RESULTS])
+
+
+# ============= TOKEN ACCOUNTING =============
+
+_encoder_lock = threading.Lock()
+_encoder: Any = None
+_encoder_loaded = False
+
+
+class TokenizerDownloadDisabled(Exception):
+    """tiktoken needed to download an encoding while TOKENIZER_DOWNLOAD is off"""
+
+
+@contextlib.contextmanager
+def _local_files_only():
+    """Make tiktoken refuse remote reads, so only encodings already in its local cache load"""
+    from tiktoken import load
+    read_file = load.read_file
+
+    def read_local_file(blobpath: str) -> bytes:
+        if "://" in blobpath:
+            raise TokenizerDownloadDisabled(blobpath)
+        return read_file(blobpath)
+
+    load.read_file = read_local_file
+    try:
+        yield
+    finally:
+        load.read_file = read_file
+
+
+def load_tokenizer(download: bool = TOKENIZER_DOWNLOAD) -> str:
+    """
+    Load the tiktoken encoding once, downloading it only if `download` is set
+
+    Returns:
+        "tiktoken" or "estimate" (4 characters a token) if tiktoken or its encoding isn't available
+    """
+    global _encoder, _encoder_loaded
+    with _encoder_lock:
+        if not _encoder_loaded:
+            _encoder_loaded = True
+            if tiktoken is not None:
+                try:
+                    with contextlib.nullcontext() if download else _local_files_only():
+                        _encoder = tiktoken.get_encoding(TOKENIZER_ENCODING)
+                except TokenizerDownloadDisabled:
+                    print(f"ℹ️  tiktoken encoding '{TOKENIZER_ENCODING}' isn't cached locally "
+                          f"(TOKENIZER_DOWNLOAD is off), estimating tokens")
+                except Exception as e:
+                    print(f"⚠️  tiktoken encoding '{TOKENIZER_ENCODING}' unavailable, estimating tokens: {e}")
+    return "tiktoken" if _encoder is not None else "estimate"
+
+
+def count_tokens(text: str) -> int:
+    load_tokenizer()
+    if _encoder is None:
+        return (len(text) + 3) // 4
+    return len(_encoder.encode(text, disallowed_special=()))
+
+
+def _json(value: Any) -> str:
+    """The tool output as the model sees it (ToolMessage content is the JSON of the returned dict)"""
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+# ============= COMPACTION =============
+
+def _terms(text: str) -> Set[str]:
+    return {word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS and len(word) > 2}
+
+
+def _join_passages(sentences: List[str], kept: List[int]) -> str:
+    """The kept sentences (sorted indexes) in order, with "…" wherever sentences were left out"""
+    text = sentences[kept[0]] if kept[0] == 0 else "… " + sentences[kept[0]]
+    for previous, i in zip(kept, kept[1:]):
+        text += (" " if i == previous + 1 else " … ") + sentences[i]
+    return text if kept[-1] == len(sentences) - 1 else text + " …"
+
+
+def relevant_passages(content: str, query: str, max_chars: int = TOOL_RESULT_MAX_CHARS) -> str:
+    """
+    The sentences of `content` that share the most words with `query`, in their original order,
+    up to `max_chars` including the gap marks (the first sentence counts a little extra: ledes
+    summarize the article)
+
+    Gaps between kept sentences are marked with "…".
+    """
+    content = " ".join(content.split())
+    if max_chars <= 0 or len(content) <= max_chars:
+        return content
+    sentences = re.split(r"(?<=[.!?])\s+", content)
+    terms = _terms(query)
+    scores = [len(terms & _terms(sentence)) + (0.5 if i == 0 else 0) for i, sentence in enumerate(sentences)]
+    kept: List[int] = []
+    for i in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)):
+        candidate = sorted(kept + [i])
+        if len(_join_passages(sentences, candidate)) <= max_chars:
+            kept = candidate
+    if not kept:
+        # No sentence fits: cut the best one at a word boundary
+        best = sentences[max(range(len(sentences)), key=lambda i: (scores[i], -i))]
+        return best[:max(0, max_chars - 2)].rsplit(" ", 1)[0] + " …"
+    return _join_passages(sentences, kept)
+
+
+class ToolOutputBudget:
+    """
+    Search output accounting for one analysis
+
+    Remembers the URLs each conversation (an agent's message history; each research branch of
+    the parallel pipeline has its own) has already been shown, and the tokens sent so far
+    against `budget` (0 = no budget).
+    """
+
+    def __init__(self, budget: int = ANALYSIS_CONTEXT_BUDGET):
+        self.budget = max(0, budget)
+        self._seen: Dict[str, Set[str]] = {}
+        self.calls = 0
+        self.results = 0
+        self.duplicates = 0
+        self.trimmed = 0
+        self.over_budget = 0
+        self.raw_tokens = 0
+        self.tokens = 0
+
+    def seen(self, conversation: str) -> Set[str]:
+        """Normalized URLs already shown in a conversation (the set is updated in place)"""
+        return self._seen.setdefault(conversation, set())
+
+    def remaining(self) -> Optional[int]:
+        return max(0, self.budget - self.tokens) if self.budget else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "results": self.results,
+            "duplicates": self.duplicates,
+            "trimmed": self.trimmed,
+            "over_budget": self.over_budget,
+            "raw_tokens": self.raw_tokens,
+            "tokens": self.tokens,
+            "budget": self.budget or None,
+            "saved_rate": round(1 - self.tokens / self.raw_tokens, 4) if self.raw_tokens else None,
+        }
+
+
+def compact_results(output: Any, query: str, budget: ToolOutputBudget, conversation: str = "",
+                    max_chars: int = TOOL_RESULT_MAX_CHARS) -> Any:
+    """
+    Compacted copy of one search tool output (the input is not modified; it may be a cached response)
+
+    Titles and URLs are always kept. A result already shown in this conversation keeps only its
+    title and URL, others keep the passages relevant to the query; once the analysis' budget is
+    used up, results keep only their title and URL. Errors and non-dict outputs pass through.
+    """
+    if not isinstance(output, dict) or "error" in output:
+        return output
+    seen = budget.seen(conversation)
+    budget.calls += 1
+    budget.raw_tokens += count_tokens(_json(output))
+
+    compacted: Dict[str, Any] = {"query": output.get("query", query)}
+    if output.get("answer"):
+        compacted["answer"] = relevant_passages(output["answer"], query, max_chars)
+    results: List[Dict[str, Any]] = []
+    compacted["results"] = results
+    used = count_tokens(_json(compacted))
+    for result in output.get("results", []):
+        budget.results += 1
+        url = result.get("url") or ""
+        key = normalize_url(url) if url else None
+        slim = {"title": result.get("title", ""), "url": url}
+        if key is not None and key in seen:
+            slim["content"] = DUPLICATE_NOTE
+            outcome = "duplicate"
+            budget.duplicates += 1
+        else:
+            content = result.get("content") or ""
+            passages = relevant_passages(content, query, max_chars)
+            full = {**{k: v for k, v in result.items() if k not in DROPPED_FIELDS}, "content": passages}
+            remaining = budget.remaining()
+            if remaining is not None and used + count_tokens(_json(full)) > remaining:
+                outcome = "over_budget"
+                budget.over_budget += 1
+                compacted["note"] = BUDGET_NOTE
+            else:
+                slim = full
+                outcome = "trimmed" if len(passages) < len(" ".join(content.split())) else "kept"
+                if outcome == "trimmed":
+                    budget.trimmed += 1
+            if key is not None:
+                seen.add(key)
+        TOOL_RESULTS.inc(outcome=outcome)
+        results.append(slim)
+        used += count_tokens(_json(slim)) + 1
+
+    tokens = count_tokens(_json(compacted))
+    budget.tokens += tokens
+    TOOL_OUTPUT_TOKENS.inc(count_tokens(_json(output)), kind="raw")
+    TOOL_OUTPUT_TOKENS.inc(tokens, kind="sent")
+    return compacted
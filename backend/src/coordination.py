@@ -0,0 +1,191 @@
+"""
+Coordination between API worker processes
+A SQLite lease electing the one process that rebuilds the daily news, and the shared snapshot
+file the other processes pick new snapshots up from
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from .cache import atomic_write, file_lock
+from .packed import PackedFormatError, PackedReader, is_packed, pack, unpack_file
+
+
+# ============= CONFIGURATION =============
+
+# A leader that stopped renewing its lease this long ago is replaced by another process
+LEADER_LEASE_SECONDS = float(os.getenv("LEADER_LEASE_SECONDS", "60"))
+# Seconds between checks of the daily news file for a snapshot written by the leader
+SNAPSHOT_POLL_INTERVAL = float(os.getenv("SNAPSHOT_POLL_INTERVAL", "10"))
+
+
+def process_id() -> str:
+    """Identity of this process in leases (same format as job queue workers)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaderLease:
+    """
+    Named lease in a local SQLite file held by at most one process at a time
+
+    The holder renews it well within `ttl`; if it dies, the lease runs out and the next
+    process to try takes over.
+    """
+
+    def __init__(self, path: Path, name: str, owner: Optional[str] = None, ttl: float = LEADER_LEASE_SECONDS):
+        self.path = Path(path)
+        self.name = name
+        self.owner = owner or process_id()
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        # Autocommit, so acquire can take the write lock up front with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS leases (
+                name TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+
+        self.held = False
+        self.acquisitions = 0
+
+    def acquire(self) -> bool:
+        """Take the lease if it is free or expired, or renew it if we hold it; returns whether we hold it"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (self.name,)).fetchone()
+                if row is not None and row[0] != self.owner and row[1] > now:
+                    self._conn.execute("COMMIT")
+                    held = False
+                else:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO leases (name, owner, expires_at) VALUES (?, ?, ?)",
+                        (self.name, self.owner, now + self.ttl)
+                    )
+                    self._conn.execute("COMMIT")
+                    held = True
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if held and not self.held:
+            self.acquisitions += 1
+            print(f"👑 {self.owner} is now the {self.name} leader")
+        self.held = held
+        return held
+
+    def release(self):
+        """Give the lease up (if we hold it) so another process can take over right away"""
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (self.name, self.owner))
+        self.held = False
+
+    def holder(self) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (self.name,)).fetchone()
+        return row[0] if row is not None and row[1] > time.time() else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"name": self.name, "owner": self.owner, "leader": self.held, "holder": self.holder(),
+                "acquisitions": self.acquisitions}
+
+
+class SnapshotFile:
+    """
+    Daily news snapshot shared by several processes, stored as a packed cache file
+
+    The header holds everything but the stories; each story is its own record keyed by rank,
+    so one story can be read without decoding the others. Writes are atomic (readers see the
+    old or the new file, never a truncated one) and serialized by a file lock; readers notice
+    new versions by the file's mtime and size. A JSON snapshot (at `path` or `legacy_path`)
+    is migrated to the packed format the first time it is loaded.
+    """
+
+    def __init__(self, path: Path, legacy_path: Optional[Path] = None):
+        self.path = Path(path)
+        self.legacy_path = Path(legacy_path) if legacy_path else None
+        self._seen: Optional[Tuple[int, int]] = None
+        self.reloads = 0
+
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _read(path: Path) -> Dict[str, Any]:
+        if not is_packed(path):
+            with open(path, 'r') as f:
+                return json.load(f)
+        meta, stories = unpack_file(path)
+        return {**meta, "news": list(stories.values())}
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Current snapshot, or None if there is none (or it can't be read)"""
+        signature = self._signature()
+        source = self.path
+        if signature is None:
+            if self.legacy_path is None or not self.legacy_path.exists():
+                return None
+            source = self.legacy_path
+        try:
+            data = self._read(source)
+        except Exception as e:
+            print(f"⚠️  Error loading cache: {e}")
+            return None
+        if source != self.path or not is_packed(self.path):
+            self._migrate(source, data)
+        else:
+            self._seen = signature
+        return data
+
+    def _migrate(self, source: Path, data: Dict[str, Any]):
+        """Rewrite a JSON snapshot in the packed format (the JSON file itself is left alone)"""
+        try:
+            self.save(data)
+            print(f"📦 Migrated {source.name} to {self.path.name}")
+        except Exception as e:
+            print(f"⚠️  Error migrating {source.name}: {e}")
+
+    def load_story(self, rank: int) -> Optional[Dict[str, Any]]:
+        """One ranked story of the saved snapshot, decoding only its record (None if missing)"""
+        try:
+            return PackedReader(self.path).get(str(rank))
+        except (OSError, PackedFormatError):
+            return None
+
+    def save(self, data: Dict[str, Any]):
+        meta = {key: value for key, value in data.items() if key != "news"}
+        # Keyed by each story's own rank (its list position only if it has none), in rank order
+        ranked = [(story.get("rank", position), story) for position, story in enumerate(data.get("news", []), start=1)]
+        stories = {str(rank): story for rank, story in sorted(ranked, key=lambda item: item[0])}
+        with file_lock(self.path):
+            atomic_write(self.path, pack(meta, stories))
+            self._seen = self._signature()
+
+    def load_if_changed(self) -> Optional[Dict[str, Any]]:
+        """The snapshot if another process wrote a new one since we last loaded or saved it, else None"""
+        signature = self._signature()
+        if signature is None or signature == self._seen:
+            return None
+        data = self.load()
+        if data is not None:
+            self.reloads += 1
+        return data
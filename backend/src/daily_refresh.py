@@ -0,0 +1,255 @@
+"""
+Background refresher for the daily news snapshot
+Rebuilds the top-10 analysis on a schedule while the API keeps serving the previous snapshot;
+with several API processes only the lease holder rebuilds, the others pick its snapshot up
+"""
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+# ============= CONFIGURATION =============
+
+# Local time of day ("HH:MM") to rebuild the daily news
+DEFAULT_REFRESH_TIME = os.getenv("DAILY_REFRESH_TIME", "00:05")
+# If set, rebuild every N seconds instead of once a day at DAILY_REFRESH_TIME
+DEFAULT_REFRESH_INTERVAL = float(os.getenv("DAILY_REFRESH_INTERVAL", "0")) or None
+# Wait this long before retrying after a failed build
+DEFAULT_RETRY_DELAY = float(os.getenv("DAILY_REFRESH_RETRY_DELAY", "900"))
+
+ProgressCallback = Callable[[int, int], None]
+BuildFunction = Callable[[ProgressCallback], Awaitable[Dict[str, Any]]]
+
+
+def today() -> str:
+    """Today's date in the format used by the daily news cache"""
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+def snapshot_last_modified(snapshot: Dict[str, Any], stale: bool) -> Optional[datetime]:
+    """
+    When the served daily news last changed: the snapshot's fetch time, or once it is stale, the
+    local midnight after its date (the response gains "stale": true, and a new ETag, then).
+    Derived from the snapshot alone, so every API process sends the same Last-Modified
+    """
+    try:
+        fetched = datetime.fromisoformat(snapshot['fetched_at']).astimezone()
+    except (KeyError, TypeError, ValueError):
+        fetched = None
+    if not stale:
+        return fetched
+    try:
+        became_stale = (datetime.strptime(snapshot['date'], '%Y-%m-%d') + timedelta(days=1)).astimezone()
+    except (KeyError, TypeError, ValueError):
+        return fetched
+    return max(fetched, became_stale) if fetched else became_stale
+
+
+class DailyNewsRefresher:
+    """Owns the in-memory daily news snapshot and the task that rebuilds it"""
+
+    def __init__(
+        self,
+        build: BuildFunction,
+        snapshot: Optional[Dict[str, Any]] = None,
+        refresh_time: str = DEFAULT_REFRESH_TIME,
+        interval: Optional[float] = DEFAULT_REFRESH_INTERVAL,
+        retry_delay: float = DEFAULT_RETRY_DELAY,
+        lease: Any = None,
+        reload: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+        poll_interval: float = 10.0,
+    ):
+        """
+        Args:
+            build: Coroutine function that builds a new snapshot, given a progress callback
+            snapshot: Previously saved snapshot to serve until the first rebuild finishes
+            refresh_time: Local "HH:MM" at which to rebuild each day
+            interval: Rebuild every `interval` seconds instead of at refresh_time
+            retry_delay: Seconds to wait before retrying a failed build
+            lease: LeaderLease shared with the other API processes; only its holder rebuilds
+            reload: Returns a snapshot another process saved since we last looked, else None
+            poll_interval: Seconds between reload checks (and lease renewals)
+        """
+        self._build = build
+        self.snapshot = snapshot
+        self.refresh_time = refresh_time
+        self.interval = interval
+        self.retry_delay = retry_delay
+        self.lease = lease
+        self._reload = reload
+        self.poll_interval = poll_interval
+
+        self.running = False
+        self.completed = 0
+        self.total = 0
+        self.last_started: Optional[str] = None
+        self.last_success: Optional[str] = snapshot.get('fetched_at') if snapshot else None
+        self.last_error: Optional[str] = None
+        self.next_run: Optional[datetime] = None
+
+        self._task: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    # ---------- snapshot ----------
+
+    def is_stale(self) -> bool:
+        """True if there is no snapshot or it is not from today"""
+        return not self.snapshot or self.snapshot.get('date') != today()
+
+    def status(self) -> Dict[str, Any]:
+        """Refresh status for /daily-news/status and readiness probes"""
+        return {
+            "ready": self.snapshot is not None,
+            "stale": self.is_stale(),
+            "snapshot_date": self.snapshot.get('date') if self.snapshot else None,
+            "running": self.running,
+            "progress": {"completed": self.completed, "total": self.total},
+            "last_started": self.last_started,
+            "last_success": self.last_success,
+            "last_error": self.last_error,
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+            # Only the leader rebuilds; followers serve the snapshot it saves
+            "role": "leader" if self.is_leader() else "follower",
+            # New/updated/reused stories and LLM calls saved by the incremental rebuild
+            "last_refresh": self.snapshot.get('refresh') if self.snapshot else None,
+        }
+
+    # ---------- leadership ----------
+
+    def is_leader(self) -> bool:
+        return self.lease is None or self.lease.held
+
+    def pick_up_snapshot(self) -> bool:
+        """Swap in a snapshot another process saved, returns True if there was one"""
+        if self._reload is None or self._lock.locked():
+            return False
+        news_data = self._reload()
+        if not news_data or news_data.get('error') or not news_data.get('news'):
+            return False
+        self.snapshot = news_data
+        self.last_success = news_data.get('fetched_at') or self.last_success
+        print(f"📥 Picked up daily news from {news_data.get('fetched_at')} saved by another process")
+        return True
+
+    async def _keep_lease(self):
+        """Take the lease when it is free and renew it while we hold it"""
+        while True:
+            try:
+                await asyncio.to_thread(self.lease.acquire)
+            except Exception as e:
+                print(f"⚠️  Could not renew the daily refresh lease: {e}")
+            await asyncio.sleep(min(self.poll_interval, self.lease.ttl / 3))
+
+    async def _wait_until(self, run_at: datetime) -> bool:
+        """Sleep until run_at, picking up other processes' snapshots; False if we stopped being the leader"""
+        while True:
+            remaining = (run_at - datetime.now()).total_seconds()
+            if remaining <= 0:
+                return True
+            await asyncio.sleep(min(remaining, self.poll_interval))
+            self.pick_up_snapshot()
+            if not self.is_leader():
+                return False
+
+    # ---------- refreshing ----------
+
+    def _on_progress(self, completed: int, total: int):
+        self.completed = completed
+        self.total = total
+
+    async def refresh(self) -> bool:
+        """
+        Build a new snapshot and swap it in
+
+        The previous snapshot keeps being served until the new one is complete.
+        Concurrent calls wait for the running build instead of starting another one.
+
+        Returns:
+            True if a new snapshot was swapped in
+        """
+        if self._lock.locked():
+            async with self._lock:
+                return not self.is_stale()
+
+        async with self._lock:
+            self.running = True
+            self.completed = 0
+            self.total = 0
+            self.last_started = datetime.now().isoformat()
+            try:
+                news_data = await self._build(self._on_progress)
+                if news_data.get('error') or not news_data.get('news'):
+                    raise RuntimeError(news_data.get('error') or "No headlines analyzed")
+
+                # Single reference assignment, so readers never see a half-built snapshot
+                self.snapshot = news_data
+                self.last_success = news_data.get('fetched_at') or datetime.now().isoformat()
+                self.last_error = None
+                return True
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"⚠️  Daily news refresh failed, keeping previous snapshot: {e}")
+                return False
+            finally:
+                self.running = False
+
+    def _next_scheduled_run(self, now: datetime) -> datetime:
+        """Next time the snapshot should be rebuilt"""
+        if self.interval:
+            return now + timedelta(seconds=self.interval)
+
+        hour, minute = (int(part) for part in self.refresh_time.split(':'))
+        run_at = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if run_at <= now:
+            run_at += timedelta(days=1)
+        return run_at
+
+    async def _run(self):
+        """Scheduler loop: refresh now if stale, then on every scheduled run (followers only poll)"""
+        while True:
+            self.pick_up_snapshot()
+            if not self.is_leader():
+                self.next_run = None
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            if self.is_stale():
+                print("🔄 Daily news missing or outdated, rebuilding in the background...")
+                success = await self.refresh()
+                if not success:
+                    self.next_run = datetime.now() + timedelta(seconds=self.retry_delay)
+                    await self._wait_until(self.next_run)
+                    continue
+
+            self.next_run = self._next_scheduled_run(datetime.now())
+            if not await self._wait_until(self.next_run):
+                continue
+
+            if self.interval:
+                await self.refresh()
+
+    async def start(self):
+        """Start the background scheduler task (and the lease heartbeat)"""
+        if self.lease is not None and (self._heartbeat is None or self._heartbeat.done()):
+            # Decide who leads before the scheduler's first check (waits on SQLite's write lock, off the loop)
+            await asyncio.to_thread(self.lease.acquire)
+            self._heartbeat = asyncio.create_task(self._keep_lease())
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Cancel the scheduler task (and any build in progress) and hand the lease to another process"""
+        for task in (self._task, self._heartbeat):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._heartbeat = None
+        if self.lease is not None and self.lease.held:
+            self.lease.release()
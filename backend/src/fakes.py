@@ -0,0 +1,283 @@
+"""
+Deterministic local stand-ins for Tavily and Gemini
+Used to run the whole pipeline offline (SEARCH_PROVIDER=fake, CHAT_PROVIDER=fake) for benchmarks
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel
+
+from .search_client import SearchError
+
+
+# ============= CONFIGURATION =============
+
+FAKE_SEARCH_LATENCY_MS = float(os.getenv("FAKE_SEARCH_LATENCY_MS", "300"))
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "800"))
+# Extra model latency per 1000 prompt tokens (prefill), so context size shows up in latency
+FAKE_LLM_MS_PER_1K_INPUT_TOKENS = float(os.getenv("FAKE_LLM_MS_PER_1K_INPUT_TOKENS", "0"))
+FAKE_ERROR_RATE = float(os.getenv("FAKE_ERROR_RATE", "0"))
+FAKE_RESULT_CHARS = int(os.getenv("FAKE_RESULT_CHARS", "1500"))
+FAKE_SEARCHES_PER_TASK = int(os.getenv("FAKE_SEARCHES_PER_TASK", "3"))
+FAKE_INVALID_OUTPUT_RATE = float(os.getenv("FAKE_INVALID_OUTPUT_RATE", "0"))
+FAKE_SEED = int(os.getenv("FAKE_SEED", "0"))
+
+RECORDED_SEARCHES = Path(__file__).parent.parent / "search_cache.json"
+
+FILLER = (
+    "Officials and analysts offered competing accounts of the events, with supporters "
+    "citing economic data and critics pointing to the human cost and the lack of consultation. "
+)
+
+
+def _stable_hash(text: str) -> int:
+    return int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+
+
+def _jittered(latency_ms: float, rng: random.Random) -> float:
+    """Latency in seconds with +/-25% jitter"""
+    return max(0.0, latency_ms * rng.uniform(0.75, 1.25) / 1000)
+
+
+# ============= SEARCH =============
+
+class FakeSearchProvider:
+    """
+    In-process Tavily stand-in replaying recorded headlines (search_cache.json)
+
+    Same interface as SearchClient. Latency, error rate and payload size are configurable;
+    results for a query are deterministic for a given seed.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = FAKE_SEARCH_LATENCY_MS,
+        error_rate: float = FAKE_ERROR_RATE,
+        result_chars: int = FAKE_RESULT_CHARS,
+        max_results: int = 10,
+        recorded: Path = RECORDED_SEARCHES,
+        seed: int = FAKE_SEED,
+    ):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.result_chars = result_chars
+        self.max_results = max_results
+        self._rng = random.Random(seed)
+
+        self._recorded: List[Dict[str, str]] = []
+        try:
+            with open(recorded, 'r') as f:
+                for entry in json.load(f).values():
+                    self._recorded.extend(h for h in entry.get('headlines', []) if h.get('headline'))
+        except (OSError, ValueError):
+            pass
+        if not self._recorded:
+            self._recorded = [
+                {"headline": f"Recorded headline {i}", "url": f"https://news.example/{i}"}
+                for i in range(50)
+            ]
+
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+
+    async def search(self, query: str, max_results: Optional[int] = None, **params: Any) -> Dict[str, Any]:
+        self.requests += 1
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(_jittered(self.latency_ms, self._rng))
+        finally:
+            self.in_flight -= 1
+
+        if self._rng.random() < self.error_rate:
+            self.errors += 1
+            raise SearchError(429, "fake rate limit")
+
+        count = max_results or self.max_results
+        start = _stable_hash(query.lower()) % len(self._recorded)
+        content = (FILLER * (self.result_chars // len(FILLER) + 1))[:self.result_chars]
+        results = []
+        for i in range(count):
+            recorded = self._recorded[(start + i) % len(self._recorded)]
+            results.append({
+                "title": recorded["headline"],
+                "url": recorded.get("url") or f"https://news.example/{start + i}",
+                "content": content,
+                "score": round(1 - i / (count + 1), 3),
+            })
+        return {"query": query, "results": results, "response_time": self.latency_ms / 1000}
+
+    async def aclose(self):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": "fake",
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+        }
+
+
+# ============= CHAT MODEL =============
+
+def _synthesize(schema: Dict[str, Any], name: str, topic: str, urls: List[str], defs: Dict[str, Any]) -> Any:
+    """A plausible value for a JSON schema property"""
+    if "$ref" in schema:
+        return _synthesize(defs[schema["$ref"].split("/")[-1]], name, topic, urls, defs)
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [option for option in schema[key] if option.get("type") != "null"]
+            return _synthesize(options[0], name, topic, urls, defs) if options else None
+
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            field: _synthesize(prop, field, topic, urls, defs)
+            for field, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [_synthesize(schema.get("items", {}), f"{name} {i + 1}", topic, urls, defs) for i in range(2)]
+    if kind == "number":
+        return 5.0
+    if kind == "integer":
+        return 1
+    if kind == "boolean":
+        return False
+    if "url" in name:
+        return urls.pop(0) if urls else "https://news.example/article"
+    if "leaning" in name:
+        return "center"
+    if name == "type":
+        return "mainstream_media"
+    return f"{name.replace('_', ' ').capitalize()} for {topic}"
+
+
+def synthesize_model(schema: Union[Type[BaseModel], Dict[str, Any]], topic: str,
+                     urls: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Arguments for a structured-output tool call that validate against `schema` (pydantic model or JSON schema)"""
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        schema = schema.model_json_schema()
+    return _synthesize(schema, "", topic, list(urls or []), schema.get("$defs", {}))
+
+
+def _tool_spec(tool: Any) -> Tuple[str, Union[Type[BaseModel], Dict[str, Any]]]:
+    """Name and argument schema of anything bind_tools accepts"""
+    if isinstance(tool, type) and issubclass(tool, BaseModel):
+        return tool.__name__, tool
+    if isinstance(tool, BaseTool):
+        return tool.name, tool.args_schema if isinstance(tool.args_schema, dict) else tool.tool_call_schema.model_json_schema()
+    function = convert_to_openai_tool(tool)["function"]
+    return function["name"], function.get("parameters", {})
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Gemini stand-in that drives the agent like a real model would
+
+    In the agent loop it issues `searches` tool calls (one per turn) per research task, then
+    writes research notes. An agent following the full sequential WORKFLOW prompt has
+    `workflow_tasks` tasks; the focused parallel-research agents have one each. Bound tools whose
+    name contains "search" are searches. A "lookup_*" tool (lookup_outlets) is called once after
+    the first search with the domains seen so far; if it knows any of them, one search per task
+    is skipped. Any other bound tool is a structured-output schema (with_structured_output, ToolStrategy). Once the searches are done
+    it calls that tool with arguments that validate against its schema, filled from the topic
+    and the URLs it has seen. With `invalid_rate` it sometimes leaves out required fields
+    when answering inside the agent loop, to exercise the separate structuring fallback.
+    """
+
+    latency_ms: float = FAKE_LLM_LATENCY_MS
+    ms_per_1k_input_tokens: float = FAKE_LLM_MS_PER_1K_INPUT_TOKENS
+    searches: int = FAKE_SEARCHES_PER_TASK
+    # Research tasks in the single-agent WORKFLOW prompt (story, side A, side B, social media)
+    workflow_tasks: int = 4
+    error_rate: float = FAKE_ERROR_RATE
+    invalid_rate: float = FAKE_INVALID_OUTPUT_RATE
+    seed: int = FAKE_SEED
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def bind_tools(self, tools: List[Any], **kwargs: Any):
+        return self.bind(fake_tools=list(tools))
+
+    def _respond(self, messages: List[BaseMessage], fake_tools: Optional[List[Any]] = None) -> AIMessage:
+        fake_tools = fake_tools or []
+        conversation = " ".join(str(m.content) for m in messages)
+        # The agent prompt quotes the topic; the structuring prompt carries our own notes
+        match = re.search(r"about '([^']+)'", conversation) or re.search(r"Research notes on (.+?)\.\n", conversation)
+        topic = match.group(1) if match else "the biggest story"
+        urls = re.findall(r'https?://[^\s"\'\\]+', " ".join(
+            str(m.content) for m in messages if isinstance(m, ToolMessage)
+        ))
+
+        specs = [_tool_spec(t) for t in fake_tools]
+        schemas = [(name, schema) for name, schema in specs if "search" not in name and not name.startswith("lookup_")]
+        search_tools = [name for name, _ in specs if "search" in name]
+        lookup_tools = [name for name, _ in specs if name.startswith("lookup_")]
+
+        # Structured output: answer with the schema once the research is done
+        tool_messages = [m for m in messages if isinstance(m, ToolMessage)]
+        lookups = [m for m in tool_messages if (m.name or "").startswith("lookup_")]
+        searched = len(tool_messages) - len(lookups)
+        tasks = self.workflow_tasks if "WORKFLOW" in conversation else 1
+        searches = self.searches * tasks
+        # Outlets the lookup already knew need no ownership search
+        if lookups and '"domain"' in str(lookups[-1].content):
+            searches = max(1, searches - tasks)
+
+        if lookup_tools and not lookups and searched >= 1 and searched < searches:
+            domains = sorted({url.split("/")[2] for url in urls if url.count("/") >= 2})[:10]
+            return AIMessage(content="", tool_calls=[{
+                "name": lookup_tools[0], "id": "call_lookup", "args": {"outlets": domains},
+            }])
+        if schemas and (not search_tools or searched >= searches):
+            name, schema = schemas[0]
+            args = synthesize_model(schema, topic, urls)
+            rng = random.Random(self.seed + _stable_hash(topic) + len(messages))
+            if search_tools and rng.random() < self.invalid_rate:
+                args.pop(next(iter(args)), None)
+            return AIMessage(content="", tool_calls=[{"name": name, "id": f"call_{name}", "args": args}])
+
+        if search_tools and searched < searches:
+            angle = ["background", "supporters", "critics", "ownership and funding", "social media reaction"][searched % 5]
+            return AIMessage(content="", tool_calls=[{
+                "name": search_tools[0],
+                "id": f"call_{searched}",
+                "args": {"query": f"{topic} {angle}"},
+            }])
+
+        notes = "\n".join(f"- Source: {url}" for url in urls[:20])
+        return AIMessage(content=f"Research notes on {topic}.\n{FILLER * 5}\n{notes}")
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, fake_tools: Optional[List[Any]] = None, **kwargs: Any) -> ChatResult:
+        message = self._respond(messages, fake_tools)
+        # Rough token estimate (~4 characters a token) so usage metrics have something to count
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        output_tokens = (len(str(message.content)) + len(json.dumps([c["args"] for c in message.tool_calls]))) // 4
+        message.usage_metadata = {"input_tokens": prompt_tokens, "output_tokens": output_tokens,
+                                  "total_tokens": prompt_tokens + output_tokens}
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, fake_tools: Optional[List[Any]] = None, **kwargs: Any) -> ChatResult:
+        rng = random.Random(self.seed + _stable_hash(str(messages[-1].content)) + len(messages))
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4
+        await asyncio.sleep(_jittered(self.latency_ms + self.ms_per_1k_input_tokens * prompt_tokens / 1000, rng))
+        if rng.random() < self.error_rate:
+            raise RuntimeError("429 RESOURCE_EXHAUSTED: fake model quota exceeded")
+        return self._generate(messages, stop, run_manager, fake_tools=fake_tools, **kwargs)
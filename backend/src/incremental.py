@@ -0,0 +1,175 @@
+"""
+Incremental daily news refresh
+Matches today's headlines to the previous snapshot so unchanged stories reuse their analysis,
+continuing stories get a cheap delta update and only new stories get a full analysis
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from .similarity import headline_similarity, headline_words, normalize_url
+
+
+# ============= CONFIGURATION =============
+
+DAILY_INCREMENTAL = os.getenv("DAILY_INCREMENTAL", "true").lower() in ("1", "true", "yes")
+# What a continuing story (similar headline, different article) gets: update | reuse | full
+DAILY_CONTINUING_STORIES = os.getenv("DAILY_CONTINUING_STORIES", "update")
+# Headlines at least this similar (0-1, shared significant words) are treated as the same story
+DAILY_MATCH_SIMILARITY = float(os.getenv("DAILY_MATCH_SIMILARITY", "0.6"))
+# Analyses older than this are never reused as-is; matching stories get an update instead
+DAILY_REUSE_MAX_AGE = float(os.getenv("DAILY_REUSE_MAX_AGE", "172800"))  # 2 days
+
+CONTINUING_ACTIONS = ("update", "reuse", "full")
+
+
+def _analyzed_at(item: Dict[str, Any], fallback: Optional[str]) -> float:
+    try:
+        return datetime.fromisoformat(item.get("analyzed_at") or fallback or "").timestamp()
+    except ValueError:
+        return 0.0
+
+
+def plan_refresh(
+    candidates: List[Dict[str, str]],
+    previous: Optional[Dict[str, Any]],
+    continuing: str = DAILY_CONTINUING_STORIES,
+    threshold: float = DAILY_MATCH_SIMILARITY,
+    max_age: float = DAILY_REUSE_MAX_AGE,
+) -> List[Dict[str, Any]]:
+    """
+    Decide what each of today's headlines needs
+
+    A headline is unchanged if its article URL or its significant words match a previous item,
+    continuing if its headline is at least `threshold` similar to one; each previous item is
+    matched at most once, best matches first.
+
+    Args:
+        candidates: Today's {headline, url} in rank order
+        previous: Previous daily news snapshot (None for the first build)
+        continuing: What continuing stories get: "update" (delta), "reuse" or "full"
+
+    Returns:
+        One {rank, headline, url, action, previous} per candidate; action is "new", "reuse" or "update",
+        previous is the matched item from the previous snapshot
+    """
+    if continuing not in CONTINUING_ACTIONS:
+        raise ValueError(f"Unknown continuing-story action '{continuing}', expected one of {', '.join(CONTINUING_ACTIONS)}")
+
+    previous_items = [item for item in (previous or {}).get("news", []) if item.get("analysis")]
+    fallback_time = (previous or {}).get("fetched_at")
+
+    # (score, candidate index, previous index); exact matches score above any similarity
+    pairs = []
+    for i, candidate in enumerate(candidates):
+        url = normalize_url(candidate.get("url", ""))
+        tokens = headline_words(candidate["headline"])
+        for j, item in enumerate(previous_items):
+            if url and url == normalize_url(item.get("url", "")) or tokens and tokens == headline_words(item["headline"]):
+                pairs.append((2.0, i, j))
+                continue
+            similarity = headline_similarity(candidate["headline"], item["headline"])
+            if similarity >= threshold:
+                pairs.append((similarity, i, j))
+
+    matches: Dict[int, tuple] = {}
+    used: Set[int] = set()
+    for score, i, j in sorted(pairs, key=lambda pair: -pair[0]):
+        if i not in matches and j not in used:
+            matches[i] = (score, previous_items[j])
+            used.add(j)
+
+    now = time.time()
+    plan = []
+    for rank, candidate in enumerate(candidates, 1):
+        entry = {"rank": rank, "headline": candidate["headline"], "url": candidate.get("url", ""),
+                 "action": "new", "previous": None}
+        if rank - 1 in matches:
+            score, item = matches[rank - 1]
+            fresh = now - _analyzed_at(item, fallback_time) <= max_age
+            action = "reuse" if score >= 2.0 else continuing
+            if action == "reuse" and not fresh:
+                action = "update" if continuing != "full" else "full"
+            entry["action"] = "new" if action == "full" else action
+            entry["previous"] = item
+            entry["previous_analyzed_at"] = item.get("analyzed_at") or fallback_time
+        plan.append(entry)
+    return plan
+
+
+async def run_refresh_plan(
+    plan: List[Dict[str, Any]],
+    analyze: Callable[[str], Awaitable[Any]],
+    update: Callable[[Dict[str, Any], str], Awaitable[Any]],
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    baseline_llm_calls: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Carry out a refresh plan concurrently (the callables queue in the shared executor)
+
+    Args:
+        analyze: Full analysis for a headline -> NewsAnalysis
+        update: Delta update of a previous NewsAnalysis dict for a headline -> NewsAnalysis
+        baseline_llm_calls: LLM calls a full analysis took last time, used to estimate savings
+            when this refresh runs no full analysis itself
+
+    Returns:
+        {"news": [{rank, headline, url, status, analyzed_at, analysis[, error]}], "report": {...}}
+    """
+    total = len(plan)
+    completed = 0
+    # LLM calls per finished analysis/update, from their _metrics
+    calls: Dict[str, List[int]] = {"new": [], "update": []}
+
+    async def run(entry: Dict[str, Any]) -> Dict[str, Any]:
+        nonlocal completed
+        item = {"rank": entry["rank"], "headline": entry["headline"], "url": entry["url"]}
+        action = entry["action"]
+        try:
+            if action == "reuse":
+                previous = entry["previous"]
+                item.update(status="reused", analysis=previous["analysis"],
+                            analyzed_at=entry["previous_analyzed_at"])
+            else:
+                if action == "update":
+                    try:
+                        analysis = await update(entry["previous"]["analysis"], entry["headline"])
+                    except Exception as e:
+                        print(f"⚠️  Delta update failed for '{entry['headline'][:50]}', running full analysis: {e}")
+                        action = "new"
+                if action == "new":
+                    analysis = await analyze(entry["headline"])
+                metrics = getattr(analysis, "_metrics", None)
+                if metrics:
+                    calls[action].append(metrics["llm_calls"])
+                item.update(status="updated" if action == "update" else "new", analysis=analysis.dict(),
+                            analyzed_at=datetime.now().isoformat())
+        except Exception as e:
+            print(f"⚠️  Error analyzing headline {entry['rank']}: {e}")
+            item.update(status="error", error=str(e), analysis=None)
+
+        completed += 1
+        if on_progress:
+            on_progress(completed, total)
+        return item
+
+    news = await asyncio.gather(*(run(entry) for entry in plan))
+
+    per_analysis = sum(calls["new"]) / len(calls["new"]) if calls["new"] else baseline_llm_calls
+    statuses = [item["status"] for item in news]
+    report = {
+        "new": statuses.count("new"),
+        "updated": statuses.count("updated"),
+        "reused": statuses.count("reused"),
+        "failed": statuses.count("error"),
+        "llm_calls": sum(calls["new"]) + sum(calls["update"]),
+        "llm_calls_per_analysis": round(per_analysis, 1) if per_analysis else None,
+        # Versus analyzing every reused and updated story from scratch
+        "llm_calls_saved": round(
+            statuses.count("reused") * per_analysis + sum(per_analysis - used for used in calls["update"])
+        ) if per_analysis else None,
+    }
+    return {"news": sorted(news, key=lambda item: item["rank"]), "report": report}
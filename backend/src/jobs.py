@@ -0,0 +1,250 @@
+"""
+Durable analysis job queue
+SQLite-backed, shared by the API (enqueue, poll) and worker processes (claim, run, complete)
+"""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .analysis_cache import analysis_cache_key
+from .prefetch import PRIORITIES
+
+
+# ============= CONFIGURATION =============
+
+JOBS_MAX_ATTEMPTS = int(os.getenv("JOBS_MAX_ATTEMPTS", "4"))
+# A running job whose worker stopped renewing its lease this long ago is handed to another worker
+JOBS_LEASE_SECONDS = float(os.getenv("JOBS_LEASE_SECONDS", "120"))
+JOBS_RETRY_BASE = float(os.getenv("JOBS_RETRY_BASE", "10"))
+JOBS_RETRY_MAX = float(os.getenv("JOBS_RETRY_MAX", "600"))
+# Finished jobs are deleted after this many seconds
+JOBS_RETENTION = float(os.getenv("JOBS_RETENTION", "604800"))  # 7 days
+
+FINISHED_STATUSES = ("done", "failed")
+
+
+class JobQueue:
+    """
+    Analysis jobs in a local SQLite file
+
+    Status: queued -> running -> done | failed. A running job is leased to one worker; if the
+    worker dies, the lease runs out and the job is claimed again. Transient failures go back
+    to the queue with exponential backoff until max_attempts is reached.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+        # Autocommit, so claims can take the write lock up front with BEGIN IMMEDIATE
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                key TEXT NOT NULL,
+                location TEXT NOT NULL,
+                topic TEXT,
+                priority INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                available_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                progress TEXT,
+                result TEXT,
+                error TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority, available_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status)")
+
+    def enqueue(
+        self,
+        location: str,
+        topic: Optional[str],
+        priority: str = "normal",
+        max_attempts: int = JOBS_MAX_ATTEMPTS,
+        result: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Add an analysis job, or return the unfinished job already queued for the same request
+
+        Args:
+            result: NewsAnalysis JSON when the answer is already known (the job is created done)
+        """
+        key = analysis_cache_key(location, topic)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if result is None:
+                    row = self._conn.execute(
+                        "SELECT id FROM jobs WHERE key = ? AND status IN ('queued', 'running') ORDER BY created_at LIMIT 1",
+                        (key,)
+                    ).fetchone()
+                    if row is not None:
+                        # A higher-priority duplicate moves the existing job up
+                        self._conn.execute(
+                            "UPDATE jobs SET priority = MIN(priority, ?) WHERE id = ?", (PRIORITIES[priority], row["id"])
+                        )
+                        self._conn.execute("COMMIT")
+                        return self._get(row["id"])
+
+                job_id = uuid.uuid4().hex
+                self._conn.execute(
+                    """INSERT INTO jobs (id, key, location, topic, priority, status, max_attempts,
+                                         created_at, updated_at, available_at, result)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (job_id, key, location, topic, PRIORITIES[priority], "queued" if result is None else "done",
+                     max(1, max_attempts), now, now, now, result)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._get(job_id)
+
+    def claim(self, worker_id: str, lease: float = JOBS_LEASE_SECONDS) -> Optional[Dict[str, Any]]:
+        """Lease the next runnable job (highest priority, oldest first) to a worker"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose worker vanished after using up their attempts won't be retried again
+                self._conn.execute(
+                    """UPDATE jobs SET status = 'failed', error = 'Worker stopped responding', updated_at = ?,
+                                       lease_owner = NULL, lease_expires = NULL
+                       WHERE status = 'running' AND lease_expires < ? AND attempts >= max_attempts""",
+                    (now, now)
+                )
+                row = self._conn.execute(
+                    """SELECT id FROM jobs
+                       WHERE (status = 'queued' AND available_at <= ?)
+                          OR (status = 'running' AND lease_expires < ?)
+                       ORDER BY priority, created_at LIMIT 1""",
+                    (now, now)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    """UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?,
+                                       lease_expires = ?, updated_at = ?
+                       WHERE id = ?""",
+                    (worker_id, now + lease, now, row["id"])
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._get(row["id"])
+
+    def _update_leased(self, job_id: str, worker_id: str, assignments: str, values: tuple) -> bool:
+        """Update a running job only if `worker_id` still holds its lease"""
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE id = ? AND status = 'running' AND lease_owner = ?",
+                (*values, time.time(), job_id, worker_id)
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job_id: str, worker_id: str, lease: float = JOBS_LEASE_SECONDS) -> bool:
+        """Extend a lease; False if the job was taken over by another worker"""
+        return self._update_leased(job_id, worker_id, "lease_expires = ?", (time.time() + lease,))
+
+    def set_progress(self, job_id: str, worker_id: str, progress: Dict[str, Any]) -> bool:
+        return self._update_leased(job_id, worker_id, "progress = ?", (json.dumps(progress),))
+
+    def complete(self, job_id: str, worker_id: str, result: str) -> bool:
+        """Store the NewsAnalysis JSON and finish the job"""
+        return self._update_leased(
+            job_id, worker_id,
+            "status = 'done', result = ?, error = NULL, lease_owner = NULL, lease_expires = NULL",
+            (result,)
+        )
+
+    def fail(self, job_id: str, worker_id: str, error: str, transient: bool) -> str:
+        """
+        Record a failed attempt
+
+        Returns:
+            The job's new status: "queued" (retry scheduled) or "failed"
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT attempts, max_attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is not None and transient and row["attempts"] < row["max_attempts"]:
+            delay = min(JOBS_RETRY_MAX, JOBS_RETRY_BASE * (2 ** (row["attempts"] - 1))) * random.uniform(0.5, 1.0)
+            self._update_leased(
+                job_id, worker_id,
+                "status = 'queued', error = ?, available_at = ?, lease_owner = NULL, lease_expires = NULL",
+                (error, time.time() + delay)
+            )
+            return "queued"
+        self._update_leased(
+            job_id, worker_id,
+            "status = 'failed', error = ?, lease_owner = NULL, lease_expires = NULL",
+            (error,)
+        )
+        return "failed"
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """Give a job back untouched (worker shutting down), without counting the attempt"""
+        return self._update_leased(
+            job_id, worker_id,
+            "status = 'queued', attempts = MAX(attempts - 1, 0), available_at = 0, lease_owner = NULL, lease_expires = NULL",
+            ()
+        )
+
+    def _get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["priority"] = next((name for name, value in PRIORITIES.items() if value == job["priority"]), job["priority"])
+        job["progress"] = json.loads(job["progress"]) if job["progress"] else None
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job with its parsed result (NewsAnalysis dict) and progress"""
+        with self._lock:
+            return self._get(job_id)
+
+    def purge_finished(self, older_than: float = JOBS_RETENTION) -> int:
+        """Delete finished jobs last updated more than `older_than` seconds ago"""
+        with self._lock:
+            placeholders = ", ".join("?" * len(FINISHED_STATUSES))
+            cursor = self._conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({placeholders}) AND updated_at < ?",
+                (*FINISHED_STATUSES, time.time() - older_than)
+            )
+        return cursor.rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows: List[sqlite3.Row] = self._conn.execute(
+                "SELECT status, COUNT(*) AS count FROM jobs GROUP BY status"
+            ).fetchall()
+            retrying = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND attempts > 0"
+            ).fetchone()[0]
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        counts.update({row["status"]: row["count"] for row in rows})
+        return {**counts, "retrying": retrying}
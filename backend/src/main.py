@@ -1,13 +1,39 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Callable, AsyncIterator, Literal, Tuple, TYPE_CHECKING
 import os
 import json
+import asyncio
+import time
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
-from .agent import NewsAnalysisAgent, NewsAnalysis
+from .models import NewsAnalysis
+from .prefetch import AnalysisExecutor, PrefetchEngine
+from .batch import BATCH_MAX_ITEMS, BatchManager
+from .jobs import FINISHED_STATUSES, JobQueue
+from .daily_refresh import DailyNewsRefresher, snapshot_last_modified
+from .coordination import SNAPSHOT_POLL_INTERVAL, LeaderLease, SnapshotFile
+from .cache import SearchCache, normalize_topic
+from .singleflight import SingleFlight
+from .speculative import SpeculativeAnalyzer
+from .snapshot import EncodedSnapshot
+from .analysis_cache import AnalysisCache
+from .outlets import OutletRegistry
+from .incremental import DAILY_INCREMENTAL, plan_refresh, run_refresh_plan
+from .similarity import HEADLINE_DUPLICATE_THRESHOLD, cluster_texts
+from .resilience import (
+    ANALYSIS_DEADLINE, ANALYSIS_DEADLINE_MAX, ANALYSIS_ERRORS, CIRCUIT_RESET_TIMEOUT, DEGRADED_MATCH_THRESHOLD, DEGRADED_RESPONSES,
+    CircuitOpenError, classify_error, circuit_stats,
+)
+from .providers import SearchProvider, make_chat_model, make_search_provider, required_api_keys
+from .telemetry import current_rss_bytes, metrics_header, register_collected, render_metrics
+
+if TYPE_CHECKING:  # the agent (LangChain, LangGraph, Gemini) is imported in the background on startup
+    from .agent import NewsAnalysisAgent
 
 # Load environment variables from .env file
 load_dotenv()
@@ -34,8 +60,24 @@ class AnalysisRequest(BaseModel):
     topic: Optional[str] = None
 
 
+class AnalyzeRequest(AnalysisRequest):
+    # Seconds to wait for the analysis before answering from the cache (or failing); ANALYSIS_DEADLINE if unset
+    deadline: Optional[float] = Field(default=None, gt=0, le=ANALYSIS_DEADLINE_MAX)
+
+
+class BatchAnalysisRequest(BaseModel):
+    items: List[AnalysisRequest] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+    priority: Literal["high", "normal", "low"] = "normal"
+
+
+class JobRequest(AnalysisRequest):
+    priority: Literal["high", "normal", "low"] = "normal"
+
+
 class SearchRequest(BaseModel):
     topic: str
+    # Location the headlines will be analyzed for (/analyze's location); only used to pre-analyze them
+    location: str = "Global"
 
 
 class SearchResponse(BaseModel):
@@ -45,122 +87,322 @@ class SearchResponse(BaseModel):
     headlines: List[Dict[str, str]]  # List of {headline, source, url}
 
 
-# Initialize agent (will be done on startup)
-agent: Optional[NewsAnalysisAgent] = None
+# Initialize agent (built in the background after startup, see load_agent)
+agent: Optional["NewsAnalysisAgent"] = None
 
-# Daily news cache file path
-CACHE_FILE = Path(__file__).parent.parent / "daily_news_cache.json"
-SEARCH_CACHE_FILE = Path(__file__).parent.parent / "search_cache.json"
+# Background task importing the LangChain/Gemini stack and building the agent
+_agent_loader: Optional[asyncio.Task] = None
+_agent_load_error: Optional[str] = None
+_agent_load_seconds: Optional[float] = None
 
+# Shared search client, Tavily or the local fake (created on startup)
+search_client: Optional[SearchProvider] = None
 
-def load_search_cache() -> Dict[str, Any]:
-    """Load search cache from file"""
-    if not SEARCH_CACHE_FILE.exists():
-        return {}
-    
-    try:
-        with open(SEARCH_CACHE_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"⚠️  Error loading search cache: {e}")
-        return {}
+# Owns the in-memory daily news snapshot and its background rebuild (created on startup)
+refresher: Optional[DailyNewsRefresher] = None
 
+# Encoded /daily-news response, rebuilt only when the snapshot (or its staleness) changes
+_daily_news_encoded: Optional[EncodedSnapshot] = None
+_daily_news_encoded_source: Optional[tuple] = None
 
-def save_search_cache(cache: Dict[str, Any]):
-    """Save search cache to file"""
-    try:
-        with open(SEARCH_CACHE_FILE, 'w') as f:
-            json.dump(cache, f, indent=2)
-    except Exception as e:
-        print(f"⚠️  Error saving search cache: {e}")
+# Daily news and search cache files (packed format), and the JSON files they are migrated from
+CACHE_FILE = Path(__file__).parent.parent / "daily_news_cache.pack"
+SEARCH_CACHE_FILE = Path(__file__).parent.parent / "search_cache.pack"
+LEGACY_CACHE_FILE = Path(__file__).parent.parent / "daily_news_cache.json"
+LEGACY_SEARCH_CACHE_FILE = Path(__file__).parent.parent / "search_cache.json"
+ANALYSIS_CACHE_FILE = Path(__file__).parent.parent / "analysis_cache.db"
+JOBS_FILE = Path(__file__).parent.parent / "jobs.db"
+OUTLETS_FILE = Path(__file__).parent.parent / "outlets.db"
+COORDINATION_FILE = Path(__file__).parent.parent / "coordination.db"
 
+# CACHE_FILE shared with the other API processes (opened on startup)
+daily_news_file: Optional[SnapshotFile] = None
 
-def get_cached_search(topic: str) -> Optional[List[Dict[str, str]]]:
-    """Get cached search results if they exist and are from today"""
-    cache = load_search_cache()
-    today = datetime.now().strftime('%Y-%m-%d')
+# Elects the one API process that rebuilds daily news (opened on startup)
+refresh_lease: Optional[LeaderLease] = None
+
+# Concurrent identical /analyze and /search requests share one in-flight run
+analysis_flights = SingleFlight("analyze")
+search_flights = SingleFlight("search")
+
+# In-memory search cache, persisted write-behind to SEARCH_CACHE_FILE (loaded on startup)
+search_cache = SearchCache(SEARCH_CACHE_FILE, legacy_path=LEGACY_SEARCH_CACHE_FILE)
+
+# Persistent NewsAnalysis cache in ANALYSIS_CACHE_FILE (opened on startup)
+analysis_cache: Optional[AnalysisCache] = None
+
+# Outlet metadata learned from past analyses in OUTLETS_FILE (opened on startup)
+outlet_registry: Optional[OutletRegistry] = None
+
+# Durable job queue in JOBS_FILE, run by `python -m src.worker` (opened on startup)
+job_queue: Optional[JobQueue] = None
+
+# Bounded pool shared by daily news and batch analyses (one concurrency limit, prioritized)
+analysis_executor = AnalysisExecutor()
+
+# Stale-while-revalidate refreshes running in the background (kept so they aren't GC'd)
+_background_refreshes: set = set()
+
+# /analyze/stream clients waiting on an in-flight analysis, keyed like analysis_flights
+_analysis_listeners: Dict[tuple, List[asyncio.Queue]] = {}
+
+# Seconds between SSE keep-alive comments while the agent is quiet
+STREAM_KEEPALIVE = float(os.getenv("STREAM_KEEPALIVE", "15"))
+
+# Seconds between job status checks for /jobs/{job_id}/events subscribers
+JOBS_EVENTS_POLL_INTERVAL = float(os.getenv("JOBS_EVENTS_POLL_INTERVAL", "1.0"))
+
+# Add the X-Analysis-Metrics debug header to every /analyze response (otherwise only when the
+# request sends "X-Debug-Metrics: 1")
+DEBUG_METRICS_HEADER = os.getenv("DEBUG_METRICS_HEADER", "false").lower() in ("1", "true", "yes")
+
+# Search results fetched for the daily list, so near-duplicates can be dropped and 10 stories remain
+DAILY_CANDIDATE_HEADLINES = int(os.getenv("DAILY_CANDIDATE_HEADLINES", "20"))
+
+
+def analysis_key(location: str, topic: Optional[str]) -> tuple:
+    """Key identifying equivalent analyses (normalized location + topic)"""
+    return (normalize_topic(location), normalize_topic(topic or ""))
+
+
+async def analyze_and_cache(location: str, topic: Optional[str]) -> NewsAnalysis:
+    """Run the full agent pipeline and store the result in the analysis cache"""
+    key = analysis_key(location, topic)
     
-    topic_key = topic.lower().strip()
+    def publish(event: Dict[str, Any]):
+        # Progress goes to every /analyze/stream client attached to this run
+        for queue in _analysis_listeners.get(key, []):
+            queue.put_nowait(event)
     
-    if topic_key in cache:
-        cached_data = cache[topic_key]
-        if cached_data.get('date') == today:
-            print(f"✅ Using cached search results for: {topic}")
-            return cached_data.get('headlines', [])
+    analysis = await agent.analyze_news(location=location, topic=topic, on_event=publish)
+    analysis_cache.put(location, topic, analysis)
+    return analysis
+
+
+def keep_in_background(task: asyncio.Future, description: str):
+    """Let an analysis nobody waits for anymore finish (its result is cached), logging failures"""
+    _background_refreshes.add(task)
     
-    return None
+    def done(task: asyncio.Future):
+        _background_refreshes.discard(task)
+        if not task.cancelled() and task.exception():
+            print(f"⚠️  {description} failed: {task.exception()}")
+    
+    task.add_done_callback(done)
 
 
-def cache_search_results(topic: str, headlines: List[Dict[str, str]]):
-    """Cache search results with today's date"""
-    cache = load_search_cache()
-    today = datetime.now().strftime('%Y-%m-%d')
+def refresh_in_background(location: str, topic: Optional[str]):
+    """Re-run a stale cached analysis without making the caller wait for it"""
+    key = analysis_key(location, topic)
+    task = asyncio.create_task(analysis_flights.do(key, lambda: analyze_and_cache(location, topic)))
+    keep_in_background(task, f"Background refresh of '{topic or location}'")
+
+
+async def run_analysis(location: str, topic: Optional[str]) -> NewsAnalysis:
+    """
+    Get an analysis, from the cache when possible
     
-    topic_key = topic.lower().strip()
+    Fresh cached analyses are returned directly. Stale ones are returned immediately
+    and refreshed in the background. Otherwise the agent runs, sharing one in-flight
+    run between concurrent identical requests.
+    """
+    speculator.claim(location, topic)
+    cached = analysis_cache.get(location, topic)
+    if cached is not None:
+        analysis, fresh = cached
+        if not fresh:
+            print(f"♻️  Serving stale analysis for '{topic or location}', refreshing in background")
+            refresh_in_background(location, topic)
+        else:
+            print(f"✅ Using cached analysis for '{topic or location}'")
+        return analysis
     
-    cache[topic_key] = {
-        'date': today,
-        'headlines': headlines
+    return await analysis_flights.do(
+        analysis_key(location, topic),
+        lambda: analyze_and_cache(location, topic)
+    )
+
+
+def degraded_analysis(location: str, topic: Optional[str], error: BaseException) -> Optional[Tuple[NewsAnalysis, Dict[str, Any]]]:
+    """
+    Nearest cached analysis to serve instead of an error
+    
+    Returns:
+        (analysis, {reason, match, similarity, age_seconds}), or None if nothing close enough is cached
+    """
+    kind = classify_error(error)
+    nearest = analysis_cache.nearest(location, topic, DEGRADED_MATCH_THRESHOLD) if analysis_cache else None
+    if nearest is None:
+        return None
+    analysis, similarity, age = nearest
+    DEGRADED_RESPONSES.inc(reason=kind)
+    print(f"🩹 Analysis of '{topic or location}' failed ({kind}), serving '{analysis.topic}' "
+          f"from cache (similarity {similarity:.2f}, {age / 3600:.1f}h old)")
+    return analysis, {
+        "reason": kind,
+        "match": "exact" if similarity >= 1.0 else "similar",
+        "similarity": round(similarity, 2),
+        "age_seconds": round(age),
     }
+
+
+def analysis_error(error: BaseException) -> HTTPException:
+    """HTTP error for a failed analysis: 503 while rate limited or an upstream is down, 504 on timeout, 502 for bad model output"""
+    kind = classify_error(error)
+    if kind in ("rate_limit", "circuit_open"):
+        retry_after = error.retry_after if isinstance(error, CircuitOpenError) else CIRCUIT_RESET_TIMEOUT
+        return HTTPException(status_code=503, detail=f"Upstream unavailable ({kind}): {error}",
+                             headers={"Retry-After": str(max(1, round(retry_after)))})
+    status_code = {"timeout": 504, "parse": 502, "upstream": 502}.get(kind, 500)
+    return HTTPException(status_code=status_code, detail=f"Error analyzing news ({kind}): {error}")
+
+
+async def run_batch_item(location: str, topic: Optional[str], priority: str) -> Tuple[NewsAnalysis, str]:
+    """
+    One batch item: a cached analysis if there is one, otherwise an agent run in the shared executor
+    
+    Identical items (in the same batch, other batches or /analyze) share one in-flight run.
+    Returns (analysis, "cached" | "analyzed").
+    """
+    speculator.claim(location, topic)
+    cached = analysis_cache.get(location, topic)
+    if cached is not None:
+        analysis, fresh = cached
+        if not fresh:
+            refresh_in_background(location, topic)
+        return analysis, "cached"
+    
+    engine = PrefetchEngine(agent, executor=analysis_executor, priority=priority, analyze=analyze_and_cache)
+    analysis = await analysis_flights.do(
+        analysis_key(location, topic),
+        lambda: engine.analyze(location, topic)
+    )
+    return analysis, "analyzed"
+
+
+# Batch analysis jobs, polled through GET /analyze/batch/{job_id}
+batches = BatchManager(run_batch_item)
+
+
+def real_analysis_load() -> int:
+    """Analyses someone is waiting for: runs in flight and executor work queued, not counting unclaimed speculation"""
+    return (analysis_flights.in_flight() - speculator.running_unclaimed()
+            + analysis_executor.stats()["queued"] - speculator.queued())
+
+
+# Pre-analyzes the top /search results with spare capacity (SPECULATIVE_ANALYSIS); shares
+# in-flight runs with /analyze, so a click on a headline being analyzed joins that run
+speculator = SpeculativeAnalyzer(
+    run=lambda location, topic: analysis_flights.do(analysis_key(location, topic), lambda: analyze_and_cache(location, topic)),
+    key=analysis_key,
+    is_available=lambda location, topic: (analysis_cache.has(location, topic)
+                                          or analysis_flights.is_running(analysis_key(location, topic))),
+    load=real_analysis_load,
+    executor=analysis_executor
+)
+
+
+def seed_analysis_cache(news_data: Dict[str, Any]):
+    """Make daily news analyses available to /analyze (location "Global", topic = headline)"""
+    try:
+        created_at = datetime.fromisoformat(news_data['fetched_at']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        created_at = datetime.now().timestamp()
     
-    save_search_cache(cache)
+    for item in news_data.get('news', []):
+        if item.get('analysis'):
+            analysis_cache.put_if_missing("Global", item['headline'], item['analysis'], created_at)
+
+
+def get_cached_search(topic: str) -> Optional[List[Dict[str, str]]]:
+    """Get cached search results if they exist and have not expired"""
+    headlines = search_cache.get_headlines(topic)
+    if headlines is not None:
+        print(f"✅ Using cached search results for: {topic}")
+    return headlines
+
+
+def cache_search_results(topic: str, headlines: List[Dict[str, str]]):
+    """Cache search results (written to disk in the background)"""
+    search_cache.put_headlines(topic, headlines)
     print(f"💾 Cached search results for: {topic}")
 
 
+async def search_headlines(topic: str) -> List[Dict[str, str]]:
+    """Search Tavily for headlines about a topic and cache them"""
+    # Use the shared Tavily client to get headlines about the topic
+    print(f"🔍 Searching for: {topic}...")
+    results = await search_client.search(f"latest news about {topic}")
+    
+    # Parse results into headlines
+    headlines = []
+    
+    # Tavily returns a dict with 'results' key containing list of articles
+    if isinstance(results, dict) and 'results' in results:
+        for item in results['results']:
+            if isinstance(item, dict):
+                headlines.append({
+                    "headline": item.get('title', '').strip(),
+                    "source": item.get('url', '').split('/')[2] if item.get('url') else 'Unknown',
+                    "url": item.get('url', '')
+                })
+    elif isinstance(results, list):
+        # Fallback: if it's a list directly
+        for item in results:
+            if isinstance(item, dict):
+                headlines.append({
+                    "headline": item.get('title', item.get('content', '')[:100]),
+                    "source": item.get('source', 'Unknown'),
+                    "url": item.get('url', '')
+                })
+    elif isinstance(results, str):
+        # Parse string response
+        lines = results.split('\n')
+        for line in lines[:10]:
+            if line.strip():
+                headlines.append({
+                    "headline": line.strip(),
+                    "source": "News",
+                    "url": ""
+                })
+    
+    print(f"✅ Found {len(headlines)} headlines")
+    
+    # Cache the results
+    cache_search_results(topic, headlines)
+    
+    return headlines
+
+
 def load_daily_news() -> Optional[Dict[str, Any]]:
     """Load daily news from cache file"""
-    if not CACHE_FILE.exists():
-        return None
-    
-    try:
-        with open(CACHE_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"⚠️  Error loading cache: {e}")
-        return None
+    return daily_news_file.load()
 
 
 def save_daily_news(news_data: Dict[str, Any]):
-    """Save daily news to cache file"""
+    """Save daily news to cache file (atomically, so other processes never read a partial file)"""
     try:
-        with open(CACHE_FILE, 'w') as f:
-            json.dump(news_data, f, indent=2)
+        daily_news_file.save(news_data)
         print(f"✅ Daily news cache saved: {CACHE_FILE}")
     except Exception as e:
         print(f"⚠️  Error saving cache: {e}")
 
 
-def is_cache_valid() -> bool:
-    """Check if cache exists and is from today"""
-    cache = load_daily_news()
-    if not cache:
-        return False
-    
-    cache_date = cache.get('date')
-    today = datetime.now().strftime('%Y-%m-%d')
-    
-    return cache_date == today
-
-
-async def fetch_daily_news() -> Dict[str, Any]:
+async def fetch_daily_news(on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
     """Fetch top 10 global news headlines and analyze each through full unbiased pipeline"""
     if agent is None:
         return {"error": "Agent not initialized"}
     
     try:
-        # Use Tavily search directly to get top headlines
-        from langchain_tavily import TavilySearch
-        
-        tavily_key = os.getenv("TAVILY_API_KEY")
-        search = TavilySearch(api_key=tavily_key, max_results=10)
-        
+        # Use the shared Tavily client directly to get top headlines
         print("\n" + "="*80)
         print("🌍 FETCHING TOP 10 GLOBAL NEWS")
         print("="*80)
         print("📰 Step 1: Getting headlines...")
         
         # Tavily returns a list of dicts with 'content', 'title', 'url', etc.
-        results = await search.ainvoke("latest breaking global news today")
+        # Extra results so there are still 10 stories after near-duplicates are merged
+        results = await search_client.search("latest breaking global news today", max_results=DAILY_CANDIDATE_HEADLINES)
         
         print(f"\n🔍 DEBUG: Type of results: {type(results)}")
         if isinstance(results, dict):
@@ -168,7 +410,7 @@ async def fetch_daily_news() -> Dict[str, Any]:
             if 'results' in results:
                 print(f"🔍 DEBUG: Number of items in results: {len(results['results'])}")
         
-        # Parse results into headlines
+        # Parse results into headlines ({headline, url}), keeping the article URL to recognize stories tomorrow
         headlines = []
         
         # Tavily returns a dict with 'results' key containing list of articles
@@ -177,74 +419,86 @@ async def fetch_daily_news() -> Dict[str, Any]:
                 if isinstance(item, dict):
                     # Get title from each result
                     headline = item.get('title', '').strip()
-                    if headline and headline not in headlines:  # Avoid duplicates
-                        headlines.append(headline)
+                    if headline and headline not in [h["headline"] for h in headlines]:  # Avoid duplicates
+                        headlines.append({"headline": headline, "url": item.get('url', '')})
         elif isinstance(results, list):
             for item in results:
                 if isinstance(item, dict):
-                    headline = item.get('title') or item.get('content', '')[:200]
-                    if headline and headline not in headlines:
-                        headlines.append(headline.strip())
+                    headline = (item.get('title') or item.get('content', '')[:200]).strip()
+                    if headline and headline not in [h["headline"] for h in headlines]:
+                        headlines.append({"headline": headline, "url": item.get('url', '')})
         elif isinstance(results, str):
             # If it's a string, split by newlines
             lines = results.split('\n')
             for line in lines:
                 if line.strip() and len(line.strip()) > 20:
-                    headlines.append(line.strip())
-                    if len(headlines) >= 10:
-                        break
+                    headlines.append({"headline": line.strip(), "url": ""})
+        
+        # The same story from several outlets would cost one full analysis each: keep the top-ranked headline
+        clusters = cluster_texts([h["headline"] for h in headlines], HEADLINE_DUPLICATE_THRESHOLD)
+        if len(clusters) < len(headlines):
+            for cluster in clusters:
+                for i in cluster[1:]:
+                    print(f"≈ Skipping near-duplicate headline: {headlines[i]['headline'][:60]}")
+            print(f"✅ Merged {len(headlines)} headlines into {len(clusters)} stories")
+        headlines = [headlines[cluster[0]] for cluster in clusters]
         
         # Limit to 10
         headlines = headlines[:10]
         
         print(f"✅ Found {len(headlines)} headlines")
         
-        # Now analyze each headline through full pipeline
-        print(f"\n🔄 Step 2: Analyzing each headline (this will take ~5-10 minutes)...\n")
-        analyzed_news = []
+        # Stories already in the current snapshot reuse (or cheaply update) their analysis
+        previous = refresher.snapshot if refresher is not None and DAILY_INCREMENTAL else None
+        plan = plan_refresh(headlines, previous)
         
-        for i, headline in enumerate(headlines, 1):
-            try:
-                print(f"\n{'─'*80}")
-                print(f"📊 Analyzing {i}/{len(headlines)}: {headline[:60]}...")
-                print(f"{'─'*80}")
-                
-                # Run through full unbiased analysis pipeline
-                analysis = await agent.analyze_news(
-                    location="Global",
-                    topic=headline
-                )
-                
-                analyzed_news.append({
-                    "rank": i,
-                    "headline": headline,
-                    "analysis": analysis.dict()  # Full NewsAnalysis object
-                })
-                
-                print(f"✅ [{i}/{len(headlines)}] Complete!")
-                
-            except Exception as e:
-                print(f"⚠️  Error analyzing headline {i}: {e}")
-                # Still add it but with error
-                analyzed_news.append({
-                    "rank": i,
-                    "headline": headline,
-                    "error": str(e),
-                    "analysis": None
-                })
+        # Now analyze the headlines through the full pipeline, several at a time
+        engine = PrefetchEngine(agent, executor=analysis_executor)
+        
+        def delta_update(previous_analysis: Dict[str, Any], headline: str):
+            # Same executor slots and rate-limit retries as a full analysis
+            updater = PrefetchEngine(agent, executor=analysis_executor, analyze=lambda location, topic: agent.update_analysis(
+                previous_analysis, location, topic
+            ))
+            return updater.analyze("Global", headline)
+        
+        actions = [entry["action"] for entry in plan]
+        print(f"\n🔄 Step 2: {actions.count('new')} new, {actions.count('update')} to update, "
+              f"{actions.count('reuse')} unchanged ({engine.concurrency} at a time)...\n")
+        refreshed = await run_refresh_plan(
+            plan,
+            analyze=lambda headline: engine.analyze("Global", headline),
+            update=delta_update,
+            on_progress=on_progress,
+            baseline_llm_calls=((previous or {}).get("refresh") or {}).get("llm_calls_per_analysis"),
+        )
+        analyzed_news, report = refreshed["news"], refreshed["report"]
+        
+        if not any(item["analysis"] for item in analyzed_news):
+            raise RuntimeError("All headline analyses failed")
+        
+        # Clicking a trending headline in the frontend hits /analyze with the same topic
+        for item in analyzed_news:
+            if item["status"] in ("new", "updated"):
+                analysis_cache.put("Global", item["headline"], item["analysis"])
+            elif item["status"] == "reused":
+                created_at = datetime.fromisoformat(item["analyzed_at"]).timestamp() if item["analyzed_at"] else datetime.now().timestamp()
+                analysis_cache.put_if_missing("Global", item["headline"], item["analysis"], created_at)
         
         news_data = {
             "date": datetime.now().strftime('%Y-%m-%d'),
             "fetched_at": datetime.now().isoformat(),
             "count": len(analyzed_news),
-            "news": analyzed_news
+            "news": analyzed_news,
+            "refresh": report
         }
         
         save_daily_news(news_data)
         
         print(f"\n{'='*80}")
         print(f"✅ DAILY NEWS CACHE COMPLETE")
-        print(f"   Analyzed: {len(analyzed_news)} stories")
+        print(f"   Analyzed: {report['new']} new, {report['updated']} updated, {report['reused']} reused, {report['failed']} failed")
+        print(f"   LLM calls: {report['llm_calls']} (saved ~{report['llm_calls_saved'] if report['llm_calls_saved'] is not None else '?'})")
         print(f"   Saved to: {CACHE_FILE}")
         print(f"{'='*80}\n")
         
@@ -261,30 +515,131 @@ async def fetch_daily_news() -> Dict[str, Any]:
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize the agent on startup and fetch daily news if needed"""
-    global agent
+    """Open the caches, start loading the agent and (once it is loaded) the daily news refresh"""
+    global _agent_loader, refresher, analysis_cache, search_client, job_queue, outlet_registry, daily_news_file, refresh_lease
     
     gemini_key = os.getenv("GEMINI_API_KEY")
     tavily_key = os.getenv("TAVILY_API_KEY")
     
-    if not gemini_key or not tavily_key:
-        print("⚠️  WARNING: GEMINI_API_KEY and TAVILY_API_KEY must be set in environment")
-        print("   The API will not work without these keys.")
+    search_cache.load()
+    analysis_cache = AnalysisCache(ANALYSIS_CACHE_FILE)
+    analysis_cache.purge_expired()
+    job_queue = JobQueue(JOBS_FILE)
+    job_queue.purge_finished()
+    
+    # Serve whatever was saved last time until the background rebuild finishes. With several
+    # API processes only the lease holder rebuilds; the others pick up the file it saves
+    daily_news_file = SnapshotFile(CACHE_FILE, legacy_path=LEGACY_CACHE_FILE)
+    refresh_lease = LeaderLease(COORDINATION_FILE, "daily_refresh")
+    refresher = DailyNewsRefresher(
+        build=fetch_daily_news,
+        snapshot=load_daily_news(),
+        lease=refresh_lease,
+        reload=daily_news_file.load_if_changed,
+        poll_interval=SNAPSHOT_POLL_INTERVAL
+    )
+    if refresher.snapshot:
+        seed_analysis_cache(refresher.snapshot)
+    
+    # Learn outlets from every cached analysis not recorded yet (daily news ones included)
+    outlet_registry = OutletRegistry(OUTLETS_FILE)
+    added = outlet_registry.record_many(analysis_cache.iter_analyses())
+    if added:
+        print(f"🗞️  Outlet registry: learned from {added} cached analyses ({outlet_registry.stats()['outlets']} outlets)")
+    
+    missing_keys = [
+        key for key, required in required_api_keys().items()
+        if required and not os.getenv(key)
+    ]
+    
+    if missing_keys:
+        print(f"⚠️  WARNING: {' and '.join(missing_keys)} must be set in environment")
+        print("   The API will not work without these keys (or set SEARCH_PROVIDER/CHAT_PROVIDER=fake).")
     else:
-        agent = NewsAnalysisAgent(
-            gemini_api_key=gemini_key,
-            tavily_api_key=tavily_key
-        )
-        print("✅ News Analysis Agent initialized successfully")
-        
-        # Check if we need to fetch daily news
-        print("\n📰 Checking daily news cache...")
-        if is_cache_valid():
-            cache = load_daily_news()
-            print(f"✅ Using cached daily news from {cache.get('date')} ({cache.get('count', 0)} headlines)")
-        else:
-            print("🔄 Cache missing or outdated, fetching new daily news...")
-            await fetch_daily_news()
+        # One pooled, rate-limited search client for /search, daily news and the agent
+        search_client = make_search_provider(tavily_key)
+        # The LangChain/Gemini stack takes seconds to import: build the agent in the background
+        # so /, /health, /examples, /search and cached responses are served right away
+        _agent_loader = asyncio.create_task(load_agent(gemini_key, tavily_key))
+
+
+def build_agent(gemini_key: Optional[str], tavily_key: Optional[str]) -> "NewsAnalysisAgent":
+    """Import the agent stack and build the agent (blocking, run off the event loop)"""
+    from .agent import NewsAnalysisAgent
+    from .tools import SharedTavilySearch
+    return NewsAnalysisAgent(
+        gemini_api_key=gemini_key,
+        tavily_api_key=tavily_key,
+        llm=make_chat_model(gemini_key),
+        search_tool=SharedTavilySearch(client=search_client),
+        outlet_registry=outlet_registry
+    )
+
+
+async def load_agent(gemini_key: Optional[str], tavily_key: Optional[str]):
+    """Build the agent in a worker thread, then start the daily news refresh that needs it"""
+    global agent, _agent_load_error, _agent_load_seconds
+    started = time.perf_counter()
+    try:
+        agent = await asyncio.to_thread(build_agent, gemini_key, tavily_key)
+    except Exception as e:
+        _agent_load_error = str(e)
+        print(f"❌ News Analysis Agent failed to initialize: {e}")
+        return
+    _agent_load_seconds = time.perf_counter() - started
+    print(f"✅ News Analysis Agent initialized successfully ({_agent_load_seconds:.1f}s after startup)")
+    
+    # Rebuild daily news in the background so the server accepts traffic immediately
+    print("\n📰 Checking daily news cache...")
+    if not refresher.is_stale():
+        print(f"✅ Using cached daily news from {refresher.snapshot.get('date')} ({refresher.snapshot.get('count', 0)} headlines)")
+    await refresher.start()
+
+
+def agent_status() -> str:
+    """"ready", "loading", "failed" or "disabled" (API keys missing)"""
+    if agent is not None:
+        return "ready"
+    if _agent_load_error is not None:
+        return "failed"
+    if _agent_loader is not None and not _agent_loader.done():
+        return "loading"
+    return "disabled"
+
+
+async def require_agent() -> "NewsAnalysisAgent":
+    """The agent, waiting for it while it is still loading (503 if it is not available)"""
+    if agent is None and _agent_loader is not None:
+        await asyncio.shield(_agent_loader)
+    if agent is None:
+        detail = (f"Agent failed to initialize: {_agent_load_error}" if _agent_load_error else
+                  "Agent not initialized. Please set GEMINI_API_KEY and TAVILY_API_KEY environment variables.")
+        raise HTTPException(status_code=503, detail=detail)
+    return agent
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the background daily news refresh and flush pending cache writes"""
+    if _agent_loader is not None:
+        _agent_loader.cancel()
+    if refresher is not None:
+        await refresher.stop()
+    if refresh_lease is not None:
+        refresh_lease.close()
+    await search_cache.close()
+    await batches.close()
+    await speculator.close()
+    for task in list(_background_refreshes):
+        task.cancel()
+    if analysis_cache is not None:
+        analysis_cache.close()
+    if job_queue is not None:
+        job_queue.close()
+    if outlet_registry is not None:
+        outlet_registry.close()
+    if search_client is not None:
+        await search_client.aclose()
 
 
 @app.get("/")
@@ -295,8 +650,18 @@ def hello():
         "endpoints": {
             "POST /search": "Search for headlines about any topic (fast, 1-2s)",
             "POST /analyze": "Get full multi-perspective analysis (30-60s)",
+            "POST /analyze/stream": "Same analysis, streamed as Server-Sent Events with progress",
+            "POST /analyze/batch": "Analyze many stories in one background job, returns a job id",
+            "GET /analyze/batch/{job_id}": "Batch job progress and partial results",
+            "POST /jobs/analyze": "Queue an analysis for the worker processes (survives restarts)",
+            "GET /jobs/{job_id}": "Queued job status and result",
+            "GET /jobs/{job_id}/events": "Queued job status changes as Server-Sent Events",
             "GET /daily-news": "Get top 10 global news headlines (cached daily)",
-            "GET /health": "Health check"
+            "GET /daily-news/status": "Daily news refresh status",
+            "GET /cache/stats": "Cache counters, checkpoint store size and memory usage",
+            "GET /metrics": "Prometheus metrics (stage/LLM/tool latencies, tokens, cache counters)",
+            "GET /health": "Health check",
+            "GET /ready": "Readiness probe (503 until daily news is available)"
         }
     }
 
@@ -306,12 +671,41 @@ def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "agent_initialized": agent is not None
+        "agent_initialized": agent is not None,
+        "agent": agent_status(),
+        "agent_load_seconds": round(_agent_load_seconds, 2) if _agent_load_seconds is not None else None,
+        "circuits": circuit_stats(),
+        "daily_news": refresher.status() if refresher else None
     }
 
 
+@app.get("/ready")
+def readiness_check():
+    """Readiness probe: ready once a daily news snapshot (possibly stale) can be served"""
+    if refresher is None or refresher.snapshot is None:
+        raise HTTPException(status_code=503, detail="Daily news is not available yet")
+    
+    return {"status": "ready", "daily_news": refresher.status()}
+
+
+def encoded_daily_news() -> EncodedSnapshot:
+    """Pre-serialized /daily-news payload for the current snapshot"""
+    global _daily_news_encoded, _daily_news_encoded_source
+    
+    snapshot = refresher.snapshot
+    stale = refresher.is_stale()
+    source = _daily_news_encoded_source
+    if _daily_news_encoded is None or source[0] is not snapshot or source[1] != stale:
+        # Last-Modified moves with the ETag: both change when the snapshot or its staleness does
+        _daily_news_encoded = EncodedSnapshot({**snapshot, "stale": stale},
+                                              last_modified=snapshot_last_modified(snapshot, stale))
+        _daily_news_encoded_source = (snapshot, stale)
+    
+    return _daily_news_encoded
+
+
 @app.get("/daily-news")
-def get_daily_news():
+def get_daily_news(request: Request) -> Response:
     """
     Get top 10 global news with FULL unbiased multi-perspective analysis
     
@@ -321,27 +715,103 @@ def get_daily_news():
     - Sources with article URLs and supporting information
     - Common facts vs disagreements
     
-    Cache is updated once per day on server startup (takes ~5-10 minutes).
+    Cache is rebuilt in the background once per day (DAILY_REFRESH_TIME).
+    While a rebuild runs, the previous snapshot is served with "stale": true.
     This endpoint is INSTANT - serves fully analyzed cached data only.
     All NewsSource objects include article URLs for verification.
-    """
-    cache = load_daily_news()
     
-    if not cache:
+    The response is encoded once per snapshot (gzip/zstd when accepted) and carries
+    ETag / Last-Modified, so polling clients get 304 Not Modified until the data changes.
+    """
+    if refresher is None or refresher.snapshot is None:
         raise HTTPException(
             status_code=404,
-            detail="No daily news available. Server may still be initializing."
+            detail="No daily news available yet. It is being built in the background, see /daily-news/status."
         )
     
-    # Check if cache is from today
-    today = datetime.now().strftime('%Y-%m-%d')
-    if cache.get('date') != today:
-        raise HTTPException(
-            status_code=503,
-            detail=f"Daily news cache is outdated (from {cache.get('date')}). Please restart the server to fetch today's news."
-        )
+    return encoded_daily_news().response(request)
+
+
+@app.get("/daily-news/status")
+def get_daily_news_status():
+    """
+    Status of the background daily news refresh
+    
+    Returns whether a snapshot is available, whether it is stale, build progress
+    (completed/total headlines) and the times of the last start, success and error.
+    """
+    if refresher is None:
+        raise HTTPException(status_code=503, detail="Server is still starting")
     
-    return cache
+    return refresher.status()
+
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    """Cache counters, in-flight request coalescing counters and memory usage"""
+    return {
+        "checkpoints": agent.checkpoint_stats() if agent else None,
+        "structured_output": agent.output_stats() if agent else None,
+        "tool_output": agent.tool_output_stats() if agent else None,
+        "process": {"rss_bytes": current_rss_bytes()},
+        "search_client": search_client.stats() if search_client else None,
+        "search": search_cache.stats(),
+        "analysis": analysis_cache.stats() if analysis_cache else None,
+        "executor": analysis_executor.stats(),
+        "batches": batches.stats(),
+        "speculative": speculator.stats(),
+        "jobs": job_queue.stats() if job_queue else None,
+        "outlets": outlet_registry.stats() if outlet_registry else None,
+        "circuits": circuit_stats(),
+        "coordination": {
+            "daily_refresh": refresh_lease.stats() if refresh_lease else None,
+            "snapshot_reloads": daily_news_file.reloads if daily_news_file else 0,
+        },
+        "singleflight": {
+            "analyze": analysis_flights.stats(),
+            "search": search_flights.stats(),
+        }
+    }
+
+
+def _collect_cache_metrics() -> Dict[tuple, float]:
+    values = {("search", "hit"): search_cache.hits, ("search", "miss"): search_cache.misses}
+    result_cache = search_client.stats().get("result_cache") if search_client else None
+    if result_cache:
+        values.update({("search_results", "hit"): result_cache["hits"], ("search_results", "miss"): result_cache["misses"],
+                       ("search_results", "coalesced"): result_cache["coalesced"]})
+    if analysis_cache is not None:
+        values.update({("analysis", "hit"): analysis_cache.hits, ("analysis", "stale_hit"): analysis_cache.stale_hits,
+                       ("analysis", "miss"): analysis_cache.misses})
+    return values
+
+
+register_collected("news_cache_lookups_total", "Cache lookups by outcome", _collect_cache_metrics,
+                   ("cache", "outcome"), kind="counter")
+register_collected("news_search_requests_total", "Requests sent to the search API",
+                   lambda: {(): search_client.stats()["requests"]} if search_client else {}, kind="counter")
+register_collected("news_search_errors_total", "Failed search API requests",
+                   lambda: {(): search_client.stats()["errors"]} if search_client else {}, kind="counter")
+register_collected("news_executor_slots", "Analysis executor slots in use and requests waiting for one",
+                   lambda: {(state,): analysis_executor.stats()[state] for state in ("running", "queued")}, ("state",))
+register_collected("news_circuit_open", "1 while an upstream's circuit breaker rejects calls",
+                   lambda: {(name,): int(stats["state"] == "open" and stats["retry_after_seconds"] > 0)
+                            for name, stats in circuit_stats().items()}, ("upstream",))
+register_collected("news_jobs", "Queued analysis jobs by status",
+                   lambda: {(status,): count for status, count in job_queue.stats().items()} if job_queue else {},
+                   ("status",))
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus metrics: analysis, stage, LLM and tool call latencies, token usage and cache counters"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+def speculate(location: str, headlines: List[Dict[str, str]]):
+    """Start pre-analyzing the top headlines of a search (once the agent is loaded)"""
+    if agent is not None and analysis_cache is not None:
+        speculator.submit(location, [item["headline"] for item in headlines if item.get("headline")])
 
 
 @app.post("/search", response_model=SearchResponse)
@@ -350,6 +820,7 @@ async def search_topic(request: SearchRequest):
     Search for news headlines about any topic (FAST - just headlines)
     
     - **topic**: Any news topic to search (e.g., "climate change", "AI regulation")
+    - **location**: Optional location the headlines will be analyzed for (default "Global")
     
     Returns list of headlines. Click on a headline to get full unbiased analysis via /analyze.
     
@@ -357,7 +828,7 @@ async def search_topic(request: SearchRequest):
     For full multi-perspective analysis, use the returned headline with /analyze endpoint.
     """
     
-    if agent is None:
+    if search_client is None:
         raise HTTPException(
             status_code=503,
             detail="Agent not initialized. Please set GEMINI_API_KEY and TAVILY_API_KEY environment variables."
@@ -366,6 +837,7 @@ async def search_topic(request: SearchRequest):
     # Check cache first
     cached_headlines = get_cached_search(request.topic)
     if cached_headlines:
+        speculate(request.location, cached_headlines)
         return SearchResponse(
             topic=request.topic,
             searched_at=datetime.now().isoformat(),
@@ -374,51 +846,12 @@ async def search_topic(request: SearchRequest):
         )
     
     try:
-        # Use Tavily search to get headlines about the topic
-        from langchain_tavily import TavilySearch
-        
-        tavily_key = os.getenv("TAVILY_API_KEY")
-        search = TavilySearch(api_key=tavily_key, max_results=10)
-        
-        print(f"🔍 Searching for: {request.topic}...")
-        results = await search.ainvoke(f"latest news about {request.topic}")
-        
-        # Parse results into headlines
-        headlines = []
-        
-        # Tavily returns a dict with 'results' key containing list of articles
-        if isinstance(results, dict) and 'results' in results:
-            for item in results['results']:
-                if isinstance(item, dict):
-                    headlines.append({
-                        "headline": item.get('title', '').strip(),
-                        "source": item.get('url', '').split('/')[2] if item.get('url') else 'Unknown',
-                        "url": item.get('url', '')
-                    })
-        elif isinstance(results, list):
-            # Fallback: if it's a list directly
-            for item in results:
-                if isinstance(item, dict):
-                    headlines.append({
-                        "headline": item.get('title', item.get('content', '')[:100]),
-                        "source": item.get('source', 'Unknown'),
-                        "url": item.get('url', '')
-                    })
-        elif isinstance(results, str):
-            # Parse string response
-            lines = results.split('\n')
-            for line in lines[:10]:
-                if line.strip():
-                    headlines.append({
-                        "headline": line.strip(),
-                        "source": "News",
-                        "url": ""
-                    })
-        
-        print(f"✅ Found {len(headlines)} headlines")
-        
-        # Cache the results
-        cache_search_results(request.topic, headlines)
+        # Concurrent searches for the same topic share one Tavily call
+        headlines = await search_flights.do(
+            normalize_topic(request.topic),
+            lambda: search_headlines(request.topic)
+        )
+        speculate(request.location, headlines)
         
         return SearchResponse(
             topic=request.topic,
@@ -435,12 +868,13 @@ async def search_topic(request: SearchRequest):
 
 
 @app.post("/analyze", response_model=NewsAnalysis)
-async def analyze_news(request: AnalysisRequest):
+async def analyze_news(request: AnalyzeRequest, http_request: Request, response: Response):
     """
     Analyze news from multiple perspectives
     
     - **location**: Geographic location (country, state, city)
     - **topic**: Optional specific topic (if None, finds biggest current news)
+    - **deadline**: Optional seconds to wait for the analysis (default ANALYSIS_DEADLINE)
     
     Returns comprehensive analysis with:
     - Multiple perspectives (typically opposing viewpoints)
@@ -450,39 +884,265 @@ async def analyze_news(request: AnalysisRequest):
     - Social media and independent voices with links
     
     All NewsSource objects include the article URL for verification.
+    
+    With DEBUG_METRICS_HEADER (or an "X-Debug-Metrics: 1" request header) the response carries
+    X-Analysis-Metrics: time per stage, LLM/tool calls and tokens of the run that produced it.
+    
+    If the analysis fails or misses its deadline, the nearest cached analysis (same location,
+    similar topic) is returned with an X-Analysis-Degraded header; a run that missed the
+    deadline keeps going in the background and is cached when it finishes.
     """
     
-    if agent is None:
-        raise HTTPException(
-            status_code=503,
-            detail="Agent not initialized. Please set GEMINI_API_KEY and TAVILY_API_KEY environment variables."
-        )
+    await require_agent()
     
+    deadline = request.deadline or ANALYSIS_DEADLINE or None
+    task = asyncio.ensure_future(run_analysis(request.location, request.topic))
     try:
-        analysis = await agent.analyze_news(
-            location=request.location,
-            topic=request.topic
-        )
+        # shield: missing the deadline ends this request, not the (shared) run
+        analysis = await asyncio.wait_for(asyncio.shield(task), timeout=deadline)
+        
+        if DEBUG_METRICS_HEADER or http_request.headers.get("x-debug-metrics") == "1":
+            metrics = getattr(analysis, "_metrics", None)
+            response.headers["X-Analysis-Metrics"] = metrics_header(metrics, "agent" if metrics else "cache")
         
         # Convert Pydantic model to dict for JSON serialization
         return analysis
     
     except Exception as e:
-        # Fallback: Try USA if there's an error with the original request
+        if isinstance(e, asyncio.TimeoutError):
+            keep_in_background(task, f"Analysis of '{request.topic or request.location}' after its deadline")
+            e = TimeoutError(f"Analysis did not finish within the {deadline:g}s deadline")
+        ANALYSIS_ERRORS.inc(kind=classify_error(e))
         print(f"⚠️  Error analyzing {request.location}: {str(e)}")
-        print(f"🔄 Falling back to United States...")
         
-        try:
-            fallback_analysis = await agent.analyze_news(
-                location="United States",
-                topic=request.topic
-            )
-            return fallback_analysis
-        except Exception as fallback_error:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error analyzing news: {str(e)}. Fallback also failed: {str(fallback_error)}"
+        # Serve the closest cached analysis rather than rerunning the whole pipeline
+        degraded = degraded_analysis(request.location, request.topic, e)
+        if degraded is None:
+            raise analysis_error(e)
+        analysis, info = degraded
+        response.headers["X-Analysis-Degraded"] = "; ".join(f"{key}={value}" for key, value in info.items())
+        return analysis
+
+
+@app.post("/analyze/batch", status_code=202)
+async def analyze_batch(request: BatchAnalysisRequest):
+    """
+    Analyze many stories in one background job
+    
+    - **items**: List of {location, topic} (same as /analyze)
+    - **priority**: "high", "normal" or "low"; queued work runs in priority order
+    
+    Items already in the analysis cache complete immediately; duplicates share one run.
+    Poll GET /analyze/batch/{job_id} for per-item progress and results.
+    """
+    await require_agent()
+    
+    job = batches.submit([item.dict() for item in request.items], request.priority)
+    print(f"📦 Batch {job.id[:8]}: {len(job.items)} items ({request.priority} priority)")
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "progress": job.progress(),
+        "status_url": f"/analyze/batch/{job.id}"
+    }
+
+
+@app.get("/analyze/batch/{job_id}")
+def get_batch(job_id: str, include_results: bool = True):
+    """Batch job status, per-item progress and the analyses finished so far"""
+    job = batches.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found (unknown or expired)")
+    return job.to_dict(include_results=include_results)
+
+
+@app.post("/jobs/analyze", status_code=202)
+def enqueue_analysis_job(request: JobRequest):
+    """
+    Queue an analysis to run in a worker process (`python -m src.worker`)
+    
+    - **location**, **topic**: same as /analyze
+    - **priority**: "high", "normal" or "low"
+    
+    Jobs are stored in SQLite: they survive API and worker restarts and are retried on
+    transient failures. A fresh cached analysis completes the job immediately; an identical
+    unfinished job is reused. Poll GET /jobs/{job_id} or subscribe to GET /jobs/{job_id}/events.
+    """
+    if job_queue is None:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+    
+    cached = analysis_cache.get(request.location, request.topic) if analysis_cache else None
+    result = cached[0].model_dump_json() if cached and cached[1] else None
+    job = job_queue.enqueue(request.location, request.topic, request.priority, result=result)
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/jobs/{job['id']}",
+        "events_url": f"/jobs/{job['id']}/events"
+    }
+
+
+def job_summary(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a queued job (without lease bookkeeping)"""
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "location": job["location"],
+        "topic": job["topic"],
+        "priority": job["priority"],
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "progress": job["progress"],
+        "error": job["error"],
+        "result": job["result"]
+    }
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Queued job status; `result` holds the NewsAnalysis once status is done"""
+    job = job_queue.get(job_id) if job_queue else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_summary(job)
+
+
+async def job_event_stream(job_id: str) -> AsyncIterator[str]:
+    """SSE stream of a job's status changes, ending with its analysis or error"""
+    last = None
+    quiet = 0.0
+    while True:
+        job = job_queue.get(job_id)
+        if job is None:
+            yield sse_event("error", {"detail": "Job not found"})
+            return
+        
+        state = (job["status"], job["attempts"], job["progress"], job["error"])
+        if state != last:
+            last = state
+            quiet = 0.0
+            summary = job_summary(job)
+            summary.pop("result")
+            yield sse_event("status", summary)
+        
+        if job["status"] in FINISHED_STATUSES:
+            if job["status"] == "done":
+                yield sse_event("analysis", job["result"])
+            else:
+                yield sse_event("error", {"detail": job["error"]})
+            return
+        
+        await asyncio.sleep(JOBS_EVENTS_POLL_INTERVAL)
+        quiet += JOBS_EVENTS_POLL_INTERVAL
+        if quiet >= STREAM_KEEPALIVE:
+            quiet = 0.0
+            yield ": keep-alive\n\n"
+
+
+@app.get("/jobs/{job_id}/events")
+async def subscribe_job(job_id: str):
+    """
+    Follow a queued job as Server-Sent Events
+    
+    - **status**: sent on every status/attempt/progress change
+    - **analysis**: the NewsAnalysis, when the job is done
+    - **error**: {detail} when the job failed for good (or does not exist)
+    """
+    if job_queue is None:
+        raise HTTPException(status_code=503, detail="Job queue not initialized")
+    
+    return StreamingResponse(
+        job_event_stream(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+async def analysis_event_stream(location: str, topic: Optional[str]) -> AsyncIterator[str]:
+    """SSE stream of agent progress for one analysis, ending with the NewsAnalysis"""
+    key = analysis_key(location, topic)
+    queue: asyncio.Queue = asyncio.Queue()
+    _analysis_listeners.setdefault(key, []).append(queue)
+    
+    # Runs (or joins) the shared analysis; its progress lands in our queue
+    task = asyncio.create_task(run_analysis(location, topic))
+    try:
+        yield sse_event("started", {"location": location, "topic": topic})
+        
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {getter, task},
+                timeout=STREAM_KEEPALIVE,
+                return_when=asyncio.FIRST_COMPLETED
             )
+            if getter in done:
+                event = getter.result()
+                if event["event"] not in ("started", "analysis"):
+                    yield sse_event(event["event"], event["data"])
+                continue
+            
+            getter.cancel()
+            if task in done and queue.empty():
+                break
+            if not done:
+                yield ": keep-alive\n\n"
+        
+        try:
+            yield sse_event("analysis", task.result())
+        except Exception as e:
+            ANALYSIS_ERRORS.inc(kind=classify_error(e))
+            degraded = degraded_analysis(location, topic, e)
+            if degraded is None:
+                yield sse_event("error", {"detail": analysis_error(e).detail})
+            else:
+                yield sse_event("degraded", {**degraded[1], "detail": str(e)})
+                yield sse_event("analysis", degraded[0])
+    
+    finally:
+        listeners = _analysis_listeners.get(key, [])
+        if queue in listeners:
+            listeners.remove(queue)
+        if not listeners:
+            _analysis_listeners.pop(key, None)
+        # Client went away: stop waiting (the shared run continues if others need it)
+        if not task.done():
+            task.cancel()
+
+
+@app.post("/analyze/stream")
+async def analyze_news_stream(request: AnalysisRequest):
+    """
+    Same analysis as /analyze, streamed as Server-Sent Events
+    
+    The first event is sent immediately. Events, in order:
+    - **started**: {location, topic}
+    - **reasoning**: intermediate model output
+    - **tool_call**: each web search the agent issues ({tool, query})
+    - **sources**: results of each search ({tool, sources: [{title, url}]})
+    - **structuring**: research finished, building the structured result
+    - **analysis**: the final NewsAnalysis (same schema as /analyze)
+    - **degraded**: {reason, match, similarity, age_seconds, detail} if the analysis failed and
+      the following analysis event is the nearest cached one instead
+    - **error**: {detail} if the analysis failed and nothing close enough is cached
+    
+    Cached analyses are sent as a single analysis event right after started.
+    """
+    
+    await require_agent()
+    
+    return StreamingResponse(
+        analysis_event_stream(request.location, request.topic),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @app.get("/examples")
@@ -0,0 +1,58 @@
+"""
+Output structures of a news analysis
+Kept apart from agent.py so the API can load, validate and serve analyses without importing
+the LangChain / LangGraph stack
+"""
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+
+# ============= OUTPUT STRUCTURES =============
+
+class NewsSource(BaseModel):
+    """Information about a news source"""
+    name: str = Field(description="Name of the news organization or platform")
+    url: str = Field(description="URL to the article or source")
+    type: str = Field(description="Type: 'mainstream_media', 'independent_journalist', 'social_media', 'government'")
+    political_leaning: str = Field(description="Political leaning: 'left', 'center', 'right', 'unknown'")
+    
+
+class SupporterInfo(BaseModel):
+    """Who supports or funds this source"""
+    supporters: List[str] = Field(description="List of supporters (political parties, governments, corporations)")
+    funding_sources: List[str] = Field(description="Known funding sources")
+    ownership: str = Field(description="Who owns or controls this outlet")
+
+
+class Perspective(BaseModel):
+    """One side of the story"""
+    side_name: str = Field(description="Name of this perspective (e.g., 'Pro-Government', 'Opposition', 'Left-Wing', 'Right-Wing')")
+    summary: str = Field(description="Summary of this perspective's main arguments and framing")
+    key_claims: List[str] = Field(description="Key claims made by this side")
+    sources: List[NewsSource] = Field(description="News sources presenting this perspective")
+    supporter_info: SupporterInfo = Field(description="Who supports these sources")
+    bias_indicators: List[str] = Field(description="Detected bias indicators (loaded language, omissions, framing)")
+    bias_score: float = Field(description="Bias score from 0 (neutral) to 10 (highly biased)")
+
+
+class NewsAnalysis(BaseModel):
+    """Complete analysis of a news story from multiple perspectives"""
+    location: str = Field(description="Geographic location (country, state, city)")
+    topic: str = Field(description="Main news topic being analyzed")
+    headline: str = Field(description="Neutral headline summarizing the story")
+    date_analyzed: str = Field(description="When this analysis was performed")
+    
+    perspectives: List[Perspective] = Field(description="Different perspectives on this story (minimum 2)")
+    
+    common_facts: List[str] = Field(description="Facts agreed upon by all sides")
+    key_disagreements: List[str] = Field(description="Main points of disagreement between sides")
+    
+    social_media_voices: List[NewsSource] = Field(description="Independent journalists and social media perspectives")
+    
+    summary: str = Field(description="Neutral summary explaining the situation and different viewpoints")
+    information_quality: str = Field(description="Assessment of information quality and reliability")
+    
+    # Spans, call counts and tokens of the run that produced this analysis (not serialized)
+    _metrics: Optional[Dict[str, Any]] = PrivateAttr(default=None)
@@ -0,0 +1,255 @@
+"""
+Outlet metadata registry
+What past analyses found about each news outlet (leaning, type, ownership, funding, supporters),
+keyed by domain in a local SQLite file; the agent reads it through the lookup_outlets tool (tools.py)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+from urllib.parse import urlparse
+
+from pydantic import BaseModel
+
+try:
+    from .cache import normalize_topic
+except ImportError:  # imported by agent.py run as a script
+    from cache import normalize_topic
+
+
+# ============= CONFIGURATION =============
+
+# Analyses an outlet must have appeared in before lookup_outlets reports it as known (one
+# analysis is not enough: a single wrong answer would stop the agent from ever checking again)
+OUTLETS_MIN_OBSERVATIONS = int(os.getenv("OUTLETS_MIN_OBSERVATIONS", "2"))
+# Most outlets answered by one lookup_outlets call
+OUTLETS_MAX_LOOKUP = int(os.getenv("OUTLETS_MAX_LOOKUP", "20"))
+
+# Hosts whose URLs point at individual accounts rather than one outlet
+PLATFORM_DOMAINS = {
+    "x.com", "twitter.com", "youtube.com", "youtu.be", "tiktok.com", "instagram.com",
+    "facebook.com", "threads.net", "reddit.com", "linkedin.com", "t.me", "telegram.me",
+}
+UNKNOWN_VALUES = {"", "unknown", "n/a", "none", "not specified", "unclear"}
+
+
+def outlet_domain(url_or_domain: str) -> Optional[str]:
+    """Registry key for a URL or bare domain: lowercase host without www./m./amp. (None if unusable)"""
+    value = (url_or_domain or "").strip().lower()
+    if not value:
+        return None
+    host = urlparse(value if "://" in value else f"//{value}").hostname or ""
+    for prefix in ("www.", "m.", "amp.", "mobile."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host if "." in host else None
+
+
+def _known(value: Any) -> bool:
+    return isinstance(value, str) and value.strip().lower() not in UNKNOWN_VALUES
+
+
+def _top(votes: Dict[str, int]) -> Optional[str]:
+    return max(votes.items(), key=lambda item: (item[1], item[0]))[0] if votes else None
+
+
+def _majority(votes: Dict[str, int], observations: int) -> List[str]:
+    """Values reported in at least half of the `observations` analyses that described the outlet"""
+    return sorted(value for value, count in votes.items() if count * 2 >= observations)
+
+
+class OutletRegistry:
+    """
+    Per-domain outlet metadata built up from NewsAnalysis results
+
+    Every analysis adds a vote for each field value it reported for an outlet; lookups return
+    the most common value (leaning, type, ownership) or the values most analyses agree on
+    (supporters, funding sources). Each analysis is only counted once.
+
+    Leaning and type are reported per source. Ownership, supporters and funding are reported per
+    perspective, so they are only attributed to an outlet when the perspective cites no other one.
+    """
+
+    def __init__(self, path: Path, min_observations: int = OUTLETS_MIN_OBSERVATIONS):
+        self.path = Path(path)
+        self.min_observations = max(1, min_observations)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS outlets (
+                domain TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                name_key TEXT NOT NULL,
+                observations INTEGER NOT NULL,
+                votes TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS outlets_name ON outlets (name_key)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS recorded_analyses (fingerprint TEXT PRIMARY KEY)")
+        self._conn.commit()
+
+        self.lookups = 0
+        self.known = 0
+        self.unknown = 0
+        self.recorded = 0
+
+    @staticmethod
+    def _fingerprint(analysis: Dict[str, Any]) -> str:
+        raw = "\x1f".join(str(analysis.get(field, "")) for field in ("location", "topic", "headline", "date_analyzed"))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def record_analysis(self, analysis: Union[BaseModel, Dict[str, Any]]) -> bool:
+        """
+        Add what an analysis says about its outlets
+
+        Returns:
+            False if this analysis was already recorded
+        """
+        if isinstance(analysis, BaseModel):
+            analysis = analysis.model_dump()
+
+        # domain -> {"name": as reported, "fields": {field: values reported}, "attributed": bool}
+        observed: Dict[str, Dict[str, Any]] = {}
+        for perspective in analysis.get("perspectives") or []:
+            domains = set()
+            for source in perspective.get("sources") or []:
+                domain = outlet_domain(source.get("url", ""))
+                if domain is None or domain in PLATFORM_DOMAINS:
+                    continue
+                domains.add(domain)
+                outlet = observed.setdefault(domain, {"name": source.get("name") or domain, "fields": {}, "attributed": False})
+                for field in ("political_leaning", "type"):
+                    if _known(source.get(field)):
+                        outlet["fields"].setdefault(field, set()).add(source[field].strip().lower())
+            # The perspective's supporter info describes the side, not each outlet citing it
+            if len(domains) != 1:
+                continue
+            outlet = observed[domains.pop()]
+            outlet["attributed"] = True
+            info = perspective.get("supporter_info") or {}
+            fields = outlet["fields"]
+            if _known(info.get("ownership")):
+                fields.setdefault("ownership", set()).add(info["ownership"].strip())
+            for field in ("supporters", "funding_sources"):
+                fields.setdefault(field, set()).update(v.strip() for v in info.get(field) or [] if _known(v))
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO recorded_analyses (fingerprint) VALUES (?)", (self._fingerprint(analysis),)
+            )
+            if cursor.rowcount == 0:
+                self._conn.commit()
+                return False
+            now = time.time()
+            for domain, outlet in observed.items():
+                row = self._conn.execute("SELECT observations, votes FROM outlets WHERE domain = ?", (domain,)).fetchone()
+                observations, votes = (row[0], json.loads(row[1])) if row else (0, {})
+                for field, values in outlet["fields"].items():
+                    field_votes = votes.setdefault(field, {})
+                    for value in values:
+                        field_votes[value] = field_votes.get(value, 0) + 1
+                # Analyses that attributed supporter info to this outlet (the base for its majorities)
+                votes["attributed"] = votes.get("attributed", observations) + outlet["attributed"]
+                self._conn.execute(
+                    """INSERT OR REPLACE INTO outlets (domain, name, name_key, observations, votes, updated_at)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    (domain, outlet["name"], normalize_topic(outlet["name"]), observations + 1, json.dumps(votes), now)
+                )
+            self._conn.commit()
+        self.recorded += 1
+        return True
+
+    def record_many(self, analyses: Iterable[Union[BaseModel, Dict[str, Any]]]) -> int:
+        """Record analyses not seen before (e.g. everything in the analysis cache), returns how many were new"""
+        added = 0
+        for analysis in analyses:
+            try:
+                added += self.record_analysis(analysis)
+            except Exception as e:
+                print(f"⚠️  Skipping analysis in outlet registry: {e}")
+        return added
+
+    def _describe(self, row: sqlite3.Row) -> Dict[str, Any]:
+        domain, name, observations, votes = row[0], row[1], row[2], json.loads(row[3])
+        # Rows written before per-outlet attribution counted every observation
+        attributed = votes.get("attributed", observations)
+        return {
+            "domain": domain,
+            "name": name,
+            "political_leaning": _top(votes.get("political_leaning", {})) or "unknown",
+            "type": _top(votes.get("type", {})) or "unknown",
+            "ownership": _top(votes.get("ownership", {})) or "unknown",
+            "supporters": _majority(votes.get("supporters", {}), attributed),
+            "funding_sources": _majority(votes.get("funding_sources", {}), attributed),
+            "analyses": observations,
+        }
+
+    def get(self, outlet: str) -> Optional[Dict[str, Any]]:
+        """Metadata for a URL, domain or outlet name, or None if not (yet) known"""
+        domain = outlet_domain(outlet)
+        with self._lock:
+            row = None
+            if domain is not None:
+                row = self._conn.execute(
+                    "SELECT domain, name, observations, votes FROM outlets WHERE domain = ?", (domain,)
+                ).fetchone()
+            if row is None:
+                row = self._conn.execute(
+                    "SELECT domain, name, observations, votes FROM outlets WHERE name_key = ? ORDER BY observations DESC LIMIT 1",
+                    (normalize_topic(outlet),)
+                ).fetchone()
+        if row is None or row[2] < self.min_observations:
+            return None
+        return self._describe(row)
+
+    def lookup(self, outlets: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Metadata for each outlet (None for unknown ones), counted in the hit/miss stats"""
+        results = {outlet: self.get(outlet) for outlet in outlets}
+        self.lookups += 1
+        self.known += sum(1 for info in results.values() if info is not None)
+        self.unknown += sum(1 for info in results.values() if info is None)
+        return results
+
+    def fill(self, analysis: BaseModel) -> int:
+        """Replace 'unknown' source leanings/types with the registry's consensus, returns fields filled"""
+        filled = 0
+        sources = [source for perspective in analysis.perspectives for source in perspective.sources]
+        for source in sources + list(analysis.social_media_voices):
+            if _known(source.political_leaning) and _known(source.type):
+                continue
+            domain = outlet_domain(source.url)
+            info = self.get(domain) if domain and domain not in PLATFORM_DOMAINS else None
+            if info is None:
+                continue
+            for field in ("political_leaning", "type"):
+                if not _known(getattr(source, field)) and info[field] != "unknown":
+                    setattr(source, field, info[field])
+                    filled += 1
+        return filled
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM outlets").fetchone()[0]
+            analyses = self._conn.execute("SELECT COUNT(*) FROM recorded_analyses").fetchone()[0]
+        looked_up = self.known + self.unknown
+        return {
+            "outlets": size,
+            "analyses_recorded": analyses,
+            "lookups": self.lookups,
+            "known": self.known,
+            "unknown": self.unknown,
+            "known_rate": round(self.known / looked_up, 4) if looked_up else None,
+        }
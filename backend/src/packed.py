@@ -0,0 +1,200 @@
+"""
+Packed cache files
+Versioned binary format for the search and daily news caches: a small JSON header with an index,
+then msgpack records grouped into zstd-compressed blocks, so a single key can be read by
+decompressing one block and decoding one record
+
+Layout:
+    b"NCPK" | version (1 byte) | header length (4 bytes, big-endian) | header JSON | blocks
+    header = {"encoding": "msgpack", "compression": "zstd", "meta": {...},
+              "blocks": [[offset, length], ...],          (offsets relative to the first block)
+              "index": {key: [block, offset, length], ...}}  (offsets within the uncompressed block)
+"""
+
+import json
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # the header is parsed with the standard library
+    orjson = None
+
+try:
+    import ormsgpack
+except ImportError:  # records fall back to JSON
+    ormsgpack = None
+
+try:
+    import zstandard
+except ImportError:  # records are stored uncompressed
+    zstandard = None
+
+
+MAGIC = b"NCPK"
+FORMAT_VERSION = 1
+_PREFIX = struct.Struct(">4sBI")
+
+# Fast enough to write on every flush; higher levels gain little on these small files
+ZSTD_LEVEL = 3
+# Uncompressed bytes of records per block: one zstd frame per record costs more in frame
+# setup than it saves, one frame per file makes every single-key read decompress everything
+BLOCK_SIZE = 32 * 1024
+
+
+class PackedFormatError(ValueError):
+    """Not a packed cache file, or one written by a newer version"""
+
+
+def _encode(value: Any, encoding: str) -> bytes:
+    if encoding == "msgpack":
+        return ormsgpack.packb(value)
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode()
+
+
+def _decode(data: bytes, encoding: str) -> Any:
+    if encoding == "msgpack":
+        if ormsgpack is None:
+            raise PackedFormatError("Packed cache uses msgpack but ormsgpack is not installed")
+        return ormsgpack.unpackb(data)
+    return json.loads(bytes(data))
+
+
+def pack(meta: Dict[str, Any], records: Dict[str, Any]) -> bytes:
+    """
+    Encode a packed cache file
+
+    Args:
+        meta: Small JSON-serializable values kept in the header (read with every open)
+        records: Values by key, each encoded on its own and stored in file order
+    """
+    encoding = "msgpack" if ormsgpack is not None else "json"
+    compression = "zstd" if zstandard is not None else "none"
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if zstandard is not None else None
+
+    index: Dict[str, List[int]] = {}
+    blocks: List[List[int]] = []
+    chunks: List[bytes] = []
+    pending: List[bytes] = []
+    pending_size = 0
+    offset = 0
+
+    def close_block():
+        nonlocal pending, pending_size, offset
+        chunk = b"".join(pending)
+        if compressor is not None:
+            chunk = compressor.compress(chunk)
+        blocks.append([offset, len(chunk)])
+        chunks.append(chunk)
+        offset += len(chunk)
+        pending, pending_size = [], 0
+
+    for key, value in records.items():
+        record = _encode(value, encoding)
+        index[str(key)] = [len(blocks), pending_size, len(record)]
+        pending.append(record)
+        pending_size += len(record)
+        if pending_size >= BLOCK_SIZE:
+            close_block()
+    if pending:
+        close_block()
+
+    header = json.dumps(
+        {"encoding": encoding, "compression": compression, "meta": meta, "blocks": blocks, "index": index},
+        separators=(',', ':'), ensure_ascii=False
+    ).encode()
+    return b"".join([_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)), header, *chunks])
+
+
+def is_packed(path: Path) -> bool:
+    """True if the file starts with the packed cache magic bytes"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class PackedReader:
+    """
+    Reads a packed cache file: the header on open, then records on demand
+
+    Each get() reads and decompresses the record's block (kept for later gets on the same
+    reader) and decodes that record only.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            prefix = f.read(_PREFIX.size)
+            if len(prefix) < _PREFIX.size:
+                raise PackedFormatError(f"{self.path.name}: truncated packed cache")
+            magic, version, header_length = _PREFIX.unpack(prefix)
+            if magic != MAGIC:
+                raise PackedFormatError(f"{self.path.name}: not a packed cache file")
+            if version > FORMAT_VERSION:
+                raise PackedFormatError(f"{self.path.name}: packed cache version {version} is newer than {FORMAT_VERSION}")
+            try:
+                header = (orjson or json).loads(f.read(header_length))
+                self.encoding: str = header["encoding"]
+                self.compression: str = header["compression"]
+                self.meta: Dict[str, Any] = header.get("meta", {})
+                self.blocks: List[List[int]] = header["blocks"]
+                self.index: Dict[str, List[int]] = header["index"]
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                raise PackedFormatError(f"{self.path.name}: corrupt packed cache header ({e})") from e
+        self._body_start = _PREFIX.size + header_length
+        self._decompressor = None
+        if self.compression == "zstd":
+            if zstandard is None:
+                raise PackedFormatError(f"{self.path.name}: packed cache uses zstd but zstandard is not installed")
+            self._decompressor = zstandard.ZstdDecompressor()
+        self._loaded: Dict[int, memoryview] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def keys(self) -> List[str]:
+        return list(self.index)
+
+    def _block(self, number: int, body: Optional[bytes] = None) -> memoryview:
+        """Uncompressed block, from `body` (the whole block area) or read from the file"""
+        block = self._loaded.get(number)
+        if block is not None:
+            return block
+        offset, length = self.blocks[number]
+        if body is not None:
+            block = body[offset:offset + length]
+        else:
+            with open(self.path, 'rb') as f:
+                f.seek(self._body_start + offset)
+                block = f.read(length)
+        if self._decompressor is not None:
+            block = self._decompressor.decompress(block)
+        # Records are decoded from views of the block, not copies
+        block = memoryview(block)
+        self._loaded[number] = block
+        return block
+
+    def get(self, key: str) -> Optional[Any]:
+        """One record, or None if the key is not in the file"""
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        number, offset, length = entry
+        return _decode(self._block(number)[offset:offset + length], self.encoding)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Every record in file order (reads the file once)"""
+        with open(self.path, 'rb') as f:
+            f.seek(self._body_start)
+            body = f.read()
+        for key, (number, offset, length) in self.index.items():
+            yield key, _decode(self._block(number, body)[offset:offset + length], self.encoding)
+
+
+def unpack_file(path: Path) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """(meta, records) of a whole packed cache file"""
+    reader = PackedReader(path)
+    return reader.meta, dict(reader.items())
@@ -0,0 +1,188 @@
+"""
+Concurrent prefetch engine for daily news and batch analyses
+Analyzes many headlines through a shared, prioritized worker pool with timeouts and retries
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import os
+import random
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+
+# ============= CONFIGURATION =============
+
+# Analyses running at once across daily news and batch jobs (DAILY_NEWS_CONCURRENCY is the older name)
+DEFAULT_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", os.getenv("DAILY_NEWS_CONCURRENCY", "3")))
+DEFAULT_TIMEOUT = float(os.getenv("DAILY_NEWS_TIMEOUT", "180"))
+DEFAULT_MAX_RETRIES = int(os.getenv("DAILY_NEWS_MAX_RETRIES", "3"))
+DEFAULT_BACKOFF_BASE = float(os.getenv("DAILY_NEWS_BACKOFF_BASE", "2.0"))
+DEFAULT_BACKOFF_MAX = float(os.getenv("DAILY_NEWS_BACKOFF_MAX", "60.0"))
+
+# Substrings that Gemini (google-genai) and Tavily put in rate-limit / quota errors
+RATE_LIMIT_MARKERS = (
+    "429",
+    "rate limit",
+    "rate_limit",
+    "ratelimit",
+    "too many requests",
+    "resource_exhausted",
+    "resource exhausted",
+    "quota",
+)
+
+
+# Lower runs first; waiting work of the same priority runs in submission order
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Check whether an exception looks like an upstream rate-limit or quota error"""
+    if getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429:
+        return True
+
+    message = f"{type(error).__name__}: {error}".lower()
+    return any(marker in message for marker in RATE_LIMIT_MARKERS)
+
+
+class AnalysisExecutor:
+    """
+    Bounded pool of analysis slots shared by every bulk analysis path
+
+    Daily news and batch jobs take a slot per agent run, so together they never exceed
+    `concurrency` runs; queued work is admitted by priority, then in submission order.
+    Counts attempts and rate-limit retries per priority as a record of quota usage.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY):
+        self.concurrency = max(1, concurrency)
+        self.running = 0
+        # (priority, sequence, future) for callers waiting on a slot
+        self._waiters: List[Any] = []
+        self._sequence = itertools.count()
+        self._counters = {
+            name: {"attempts": 0, "completed": 0, "failed": 0, "rate_limit_retries": 0}
+            for name in PRIORITIES
+        }
+
+    def _acquire_nowait(self) -> bool:
+        if self.running < self.concurrency and not self._queued():
+            self.running += 1
+            return True
+        return False
+
+    def _queued(self) -> int:
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    def _release(self):
+        # Hand the slot straight to the next waiter, skipping ones that gave up
+        while self._waiters:
+            *_, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.running -= 1
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: str = "normal") -> AsyncIterator[None]:
+        """Hold one of the pool's slots for the duration of the block"""
+        if not self._acquire_nowait():
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (PRIORITIES[priority], next(self._sequence), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                # The slot may have been handed over just as we were cancelled
+                if future.done() and not future.cancelled():
+                    self._release()
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def record(self, priority: str, outcome: str):
+        """Count an attempt, completion, failure or rate-limit retry for a priority"""
+        self._counters[priority][outcome] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "queued": self._queued(),
+            "by_priority": {name: dict(counters) for name, counters in self._counters.items()},
+        }
+
+
+class PrefetchEngine:
+    """Runs analyze_news for headlines in the shared executor, backing off on rate limits"""
+
+    def __init__(
+        self,
+        agent: Any,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        executor: Optional[AnalysisExecutor] = None,
+        priority: str = "normal",
+        analyze: Optional[Callable[[str, Optional[str]], Awaitable[Any]]] = None,
+    ):
+        """
+        Args:
+            agent: Anything with an async analyze_news(location, topic) method
+            concurrency: Maximum number of analyses running at once (when no executor is given)
+            timeout: Per-attempt timeout in seconds (None disables it)
+            max_retries: Retries per headline after a rate-limit error
+            backoff_base: First backoff delay in seconds, doubled on every retry
+            backoff_max: Upper bound for a single backoff delay
+            executor: Shared pool to run in; a private one of `concurrency` slots by default
+            priority: Priority of this engine's work in the executor ("high", "normal", "low")
+            analyze: Coroutine function (location, topic) to run instead of agent.analyze_news
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {', '.join(PRIORITIES)}")
+        self.agent = agent
+        self.executor = executor or AnalysisExecutor(concurrency)
+        self.concurrency = self.executor.concurrency
+        self.priority = priority
+        self._analyze = analyze or (lambda location, topic: agent.analyze_news(location=location, topic=topic))
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter for the given retry attempt (0-based)"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def analyze(self, location: str, headline: Optional[str]):
+        """
+        Analyze one headline in an executor slot, retrying with backoff on rate-limit errors
+
+        The slot is given back while backing off, so other work can use it.
+        """
+        attempt = 0
+        while True:
+            try:
+                async with self.executor.slot(self.priority):
+                    self.executor.record(self.priority, "attempts")
+                    result = await asyncio.wait_for(self._analyze(location, headline), timeout=self.timeout)
+                self.executor.record(self.priority, "completed")
+                return result
+            except asyncio.TimeoutError:
+                self.executor.record(self.priority, "failed")
+                raise TimeoutError(f"Analysis timed out after {self.timeout:.0f}s")
+            except Exception as e:
+                if attempt >= self.max_retries or not is_rate_limit_error(e):
+                    self.executor.record(self.priority, "failed")
+                    raise
+                delay = self._backoff_delay(attempt)
+                attempt += 1
+                self.executor.record(self.priority, "rate_limit_retries")
+                print(f"⏳ Rate limited on '{(headline or location)[:40]}...', retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
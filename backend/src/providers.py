@@ -0,0 +1,74 @@
+"""
+Search and chat model providers
+Selects the real services (Tavily, Gemini) or the local fakes from configuration
+"""
+
+import os
+from typing import TYPE_CHECKING, Any, Dict, Optional, Protocol
+
+if TYPE_CHECKING:  # LangChain is only imported once a chat model is built (with the agent, in the background)
+    from langchain_core.language_models import BaseChatModel
+
+
+# ============= CONFIGURATION =============
+
+SEARCH_PROVIDER = os.getenv("SEARCH_PROVIDER", "tavily")  # tavily | fake
+CHAT_PROVIDER = os.getenv("CHAT_PROVIDER", "gemini")  # gemini | fake
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-flash-lite-latest")
+
+
+class SearchProvider(Protocol):
+    """What the app needs from a web search backend (SearchClient, FakeSearchProvider)"""
+
+    async def search(self, query: str, max_results: Optional[int] = None, **params: Any) -> Dict[str, Any]:
+        ...
+
+    async def aclose(self) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+
+def required_api_keys(search_provider: str = SEARCH_PROVIDER, chat_provider: str = CHAT_PROVIDER) -> Dict[str, bool]:
+    """Which API keys the configured providers need"""
+    return {
+        "TAVILY_API_KEY": search_provider == "tavily",
+        "GEMINI_API_KEY": chat_provider == "gemini",
+    }
+
+
+def make_search_provider(api_key: Optional[str], name: str = SEARCH_PROVIDER, cached: bool = True) -> SearchProvider:
+    """
+    Search backend by name, behind the "search" circuit breaker and (unless `cached` is False)
+    the shared result cache, so cached results are still served while the circuit is open
+    """
+    from .resilience import CircuitBreakerSearch
+    from .search_client import SEARCH_RESULT_CACHE_MAX_ENTRIES, CachedSearchClient
+    if name == "tavily":
+        from .search_client import SearchClient
+        provider = SearchClient(api_key=api_key)
+    elif name == "fake":
+        from .fakes import FakeSearchProvider
+        provider = FakeSearchProvider()
+    else:
+        raise ValueError(f"Unknown SEARCH_PROVIDER '{name}', expected 'tavily' or 'fake'")
+    provider = CircuitBreakerSearch(provider)
+    if cached and SEARCH_RESULT_CACHE_MAX_ENTRIES > 0:
+        return CachedSearchClient(provider)
+    return provider
+
+
+def make_chat_model(api_key: Optional[str], name: str = CHAT_PROVIDER) -> "BaseChatModel":
+    """Chat model by name"""
+    if name == "gemini":
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(
+            model=GEMINI_MODEL,
+            google_api_key=api_key,
+            temperature=0.3,
+        )
+    if name == "fake":
+        from .fakes import FakeChatModel
+        return FakeChatModel()
+    raise ValueError(f"Unknown CHAT_PROVIDER '{name}', expected 'gemini' or 'fake'")
@@ -0,0 +1,242 @@
+"""
+Failure handling for analyses
+Classifies upstream errors, trips a circuit breaker per upstream (search, LLM) and retries
+single pipeline stages instead of whole analyses
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, TypeVar
+
+import httpx
+from pydantic import ValidationError
+
+try:
+    from .prefetch import is_rate_limit_error
+    from .telemetry import Counter, METRICS
+except ImportError:  # imported by agent.py run as a script
+    from prefetch import is_rate_limit_error
+    from telemetry import Counter, METRICS
+
+
+# ============= CONFIGURATION =============
+
+# Consecutive rate-limit/timeout/upstream failures that open an upstream's circuit
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+# Seconds an open circuit rejects calls before letting one probe call through
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+# Attempts per pipeline stage (1 = no retries); only the failed stage is run again
+STAGE_MAX_ATTEMPTS = int(os.getenv("STAGE_MAX_ATTEMPTS", "2"))
+STAGE_RETRY_BACKOFF = float(os.getenv("STAGE_RETRY_BACKOFF", "2.0"))
+# Default and largest end-to-end deadline of an /analyze request, in seconds (0 = no default deadline)
+ANALYSIS_DEADLINE = float(os.getenv("ANALYSIS_DEADLINE", "120"))
+ANALYSIS_DEADLINE_MAX = float(os.getenv("ANALYSIS_DEADLINE_MAX", "600"))
+# How similar a cached topic must be to stand in for a failed analysis (same location only; it
+# must also contain every significant word of the requested topic)
+DEGRADED_MATCH_THRESHOLD = float(os.getenv("DEGRADED_MATCH_THRESHOLD", "0.6"))
+
+ERROR_KINDS = ("rate_limit", "timeout", "parse", "upstream", "circuit_open", "other")
+# Failures that say something about the upstream's health
+TRIPPING_KINDS = {"rate_limit", "timeout", "upstream"}
+# Failures a stage is run again for. Not rate limits: those are retried in one place only, with
+# the backoff of the daily news and batch work (PrefetchEngine), and feed the circuit breakers
+RETRYABLE_KINDS = {"timeout", "upstream", "parse"}
+
+ANALYSIS_ERRORS = Counter("news_analysis_errors_total", "Failed /analyze and /analyze/stream requests by error class", ("kind",))
+STAGE_RETRIES = Counter("news_stage_retries_total", "Pipeline stages run again after a failure", ("stage", "kind"))
+DEGRADED_RESPONSES = Counter("news_degraded_responses_total",
+                             "Requests answered with the nearest cached analysis after a failure", ("reason",))
+METRICS.extend([ANALYSIS_ERRORS, STAGE_RETRIES, DEGRADED_RESPONSES])
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """An upstream's circuit is open; the call was not attempted"""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"{upstream} unavailable after repeated failures, retry in {retry_after:.0f}s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Error class of a failed call or analysis
+
+    Returns:
+        "rate_limit", "timeout", "parse" (model output that didn't fit the schema), "upstream"
+        (network or 5xx), "circuit_open" or "other"
+    """
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if is_rate_limit_error(error):
+        return "rate_limit"
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, httpx.TimeoutException)):
+        return "timeout"
+    if isinstance(error, (ValidationError, json.JSONDecodeError)) or type(error).__name__ in (
+        "OutputParserException", "StructuredOutputValidationError", "MultipleStructuredOutputsError"
+    ):
+        return "parse"
+    if isinstance(error, (ConnectionError, httpx.TransportError)):
+        return "upstream"
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    if isinstance(status, int) and status >= 500:
+        return "upstream"
+    message = str(error).lower()
+    if any(marker in message for marker in ("503", "unavailable", "internal error", "deadline exceeded")):
+        return "upstream"
+    return "other"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one upstream
+
+    closed: calls go through. After `failure_threshold` consecutive tripping failures it opens
+    and rejects calls with CircuitOpenError for `reset_timeout` seconds, then half-opens: one
+    probe call goes through, and closes the circuit on success or reopens it on failure.
+    Parse errors and other non-tripping failures don't count either way.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        # When the half-open probe call was let through (0 if none is out)
+        self._probe_started = 0.0
+
+        self.trips = 0
+        self.rejected = 0
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go to the upstream now"""
+        with self._lock:
+            if self.state == "closed":
+                return
+            remaining = self.opened_at + self.reset_timeout - time.time()
+            if self.state == "open" and remaining <= 0:
+                self.state = "half_open"
+            # A probe whose outcome never came back (cancelled call) doesn't block the circuit forever
+            if self.state == "half_open" and time.time() - self._probe_started > self.reset_timeout:
+                self._probe_started = time.time()
+                return
+            self.rejected += 1
+        raise CircuitOpenError(self.name, max(remaining, 1.0))
+
+    def check_open(self):
+        """Raise CircuitOpenError while the circuit is open, without using up the half-open probe"""
+        remaining = self.retry_after()
+        if self.state == "open" and remaining > 0:
+            with self._lock:
+                self.rejected += 1
+            raise CircuitOpenError(self.name, remaining)
+
+    def record_success(self):
+        with self._lock:
+            if self.state != "closed":
+                print(f"✅ {self.name} circuit closed")
+            self.state = "closed"
+            self.failures = 0
+            self._probe_started = 0.0
+
+    def record_failure(self, error: BaseException):
+        kind = classify_error(error)
+        if kind == "circuit_open":
+            return
+        if kind not in TRIPPING_KINDS:
+            with self._lock:
+                self._probe_started = 0.0
+            return
+        with self._lock:
+            self.failures += 1
+            self._probe_started = 0.0
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.failure_threshold):
+                self.state = "open"
+                self.opened_at = time.time()
+                self.trips += 1
+                print(f"🔌 {self.name} circuit open for {self.reset_timeout:.0f}s after {self.failures} failures: {error}")
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a probe through (0 if closed)"""
+        if self.state == "closed":
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_after_seconds": round(self.retry_after(), 1),
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+# One breaker per upstream for the whole process: the search API and the chat model
+BREAKERS: Dict[str, CircuitBreaker] = {"search": CircuitBreaker("search"), "llm": CircuitBreaker("llm")}
+
+
+def check_circuits(upstreams: Iterable[str] = ("llm", "search")):
+    """Fail fast with CircuitOpenError if any of these upstreams is known to be down"""
+    for upstream in upstreams:
+        BREAKERS[upstream].check_open()
+
+
+def circuit_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: breaker.stats() for name, breaker in BREAKERS.items()}
+
+
+async def run_stage(stage: str, call: Callable[[], Awaitable[T]], attempts: int = STAGE_MAX_ATTEMPTS) -> T:
+    """
+    Run one pipeline stage, running just this stage again on retryable failures
+
+    Timeouts, upstream and parse errors are retried with exponential backoff; anything else
+    (rate limits, an open circuit) fails at once.
+    """
+    attempt = 1
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            kind = classify_error(e)
+            if attempt >= attempts or kind not in RETRYABLE_KINDS:
+                raise
+            delay = STAGE_RETRY_BACKOFF * (2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            STAGE_RETRIES.inc(stage=stage, kind=kind)
+            print(f"🔁 {stage} failed ({kind}), retrying that stage in {delay:.1f}s: {e}")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+class CircuitBreakerSearch:
+    """SearchProvider wrapper putting every search request behind the "search" circuit breaker"""
+
+    def __init__(self, client: Any, breaker: Optional[CircuitBreaker] = None):
+        self.client = client
+        self.breaker = breaker or BREAKERS["search"]
+
+    async def search(self, query: str, max_results: Optional[int] = None, **params: Any) -> Dict[str, Any]:
+        self.breaker.check()
+        try:
+            results = await self.client.search(query, max_results=max_results, **params)
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+        self.breaker.record_success()
+        return results
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.client.stats(), "circuit": self.breaker.stats()}
@@ -0,0 +1,217 @@
+"""
+Shared Tavily search client
+One pooled HTTP client for the whole app, with a concurrency cap and a token-bucket rate limiter,
+and a result cache in front of it so repeated queries don't use quota
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .cache import TTLCache, normalize_topic
+from .singleflight import SingleFlight
+
+
+# ============= CONFIGURATION =============
+
+TAVILY_API_URL = os.getenv("TAVILY_API_URL", "https://api.tavily.com")
+TAVILY_CONCURRENCY = int(os.getenv("TAVILY_CONCURRENCY", "5"))
+# Provider quota: Tavily allows 100 requests/minute on development keys
+TAVILY_REQUESTS_PER_MINUTE = float(os.getenv("TAVILY_REQUESTS_PER_MINUTE", "100"))
+TAVILY_BURST = int(os.getenv("TAVILY_BURST", "10"))
+TAVILY_TIMEOUT = float(os.getenv("TAVILY_TIMEOUT", "30"))
+# Raw search responses shared by /search, daily news and the agent's tool calls (0 entries disables)
+SEARCH_RESULT_CACHE_TTL = float(os.getenv("SEARCH_RESULT_CACHE_TTL", "3600"))
+SEARCH_RESULT_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_RESULT_CACHE_MAX_ENTRIES", "2000"))
+
+
+class SearchError(Exception):
+    """Tavily returned an error response"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(f"Tavily error {status_code}: {detail}")
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, at most `capacity` saved up"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+
+
+class SearchClient:
+    """Long-lived Tavily client shared by /search, daily news and the agent's search tool"""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = TAVILY_API_URL,
+        max_results: int = 10,
+        concurrency: int = TAVILY_CONCURRENCY,
+        requests_per_minute: float = TAVILY_REQUESTS_PER_MINUTE,
+        burst: int = TAVILY_BURST,
+        timeout: float = TAVILY_TIMEOUT,
+    ):
+        self.max_results = max_results
+        self.concurrency = max(1, concurrency)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._bucket = TokenBucket(requests_per_minute / 60, burst)
+
+        # Keep-alive connection pool, so only the first request pays for the TLS handshake
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency,
+                keepalive_expiry=120,
+            ),
+        )
+
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+
+    async def search(self, query: str, max_results: Optional[int] = None, **params: Any) -> Dict[str, Any]:
+        """
+        Run a Tavily search
+
+        Args:
+            query: Search query
+            max_results: Results to return (defaults to the client's max_results)
+            **params: Extra Tavily search parameters (topic, time_range, include_domains, ...)
+
+        Returns:
+            Tavily's JSON response: {"query", "results": [{title, url, content, ...}], ...}
+        """
+        body = {"query": query, "max_results": max_results or self.max_results}
+        body.update({key: value for key, value in params.items() if value is not None})
+
+        async with self._semaphore:
+            await self._bucket.acquire()
+            self.requests += 1
+            self.in_flight += 1
+            try:
+                response = await self._client.post("/search", json=body)
+            except httpx.HTTPError:
+                self.errors += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+        if response.status_code != 200:
+            self.errors += 1
+            try:
+                detail = response.json().get("detail", {})
+                detail = detail.get("error", detail) if isinstance(detail, dict) else detail
+            except ValueError:
+                detail = response.text[:200]
+            raise SearchError(response.status_code, str(detail) or response.reason_phrase)
+
+        return response.json()
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "concurrency": self.concurrency,
+            "requests_per_minute": self._bucket.rate * 60,
+            "rate_limit_wait_seconds": round(self._bucket.waited, 3),
+        }
+
+
+# ============= CACHED SEARCH =============
+
+def normalize_query(query: str) -> str:
+    """Cache key part for a query: lowercase, collapsed whitespace, no surrounding quotes or trailing punctuation"""
+    return normalize_topic(query).strip("\"'").rstrip("?.!").strip()
+
+
+class CachedSearchClient:
+    """
+    Search provider wrapper that answers repeated queries from an in-memory LRU + TTL cache
+
+    Keyed on the normalized query plus the search parameters. Concurrent identical queries
+    share one upstream request. Errors are never cached.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        max_entries: int = SEARCH_RESULT_CACHE_MAX_ENTRIES,
+        ttl: float = SEARCH_RESULT_CACHE_TTL,
+    ):
+        self.client = client
+        self.cache = TTLCache(max_entries, ttl)
+        self._flights = SingleFlight("search_results")
+
+    def cache_key(self, query: str, max_results: Optional[int] = None, **params: Any) -> str:
+        params = {key: value for key, value in params.items() if value is not None}
+        return json.dumps([normalize_query(query), max_results, params], sort_keys=True, default=str)
+
+    async def search(self, query: str, max_results: Optional[int] = None, **params: Any) -> Dict[str, Any]:
+        """Same as the wrapped client's search, from the cache when the query was seen recently"""
+        key = self.cache_key(query, max_results, **params)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        async def fetch() -> Dict[str, Any]:
+            results = await self.client.search(query, max_results=max_results, **params)
+            self.cache.set(key, results)
+            return results
+
+        return await self._flights.do(key, fetch)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """The wrapped client's counters, plus the result cache's"""
+        cache = self.cache.stats()
+        lookups = cache["hits"] + cache["misses"]
+        # Lookups answered without an upstream request (cached, or joined an identical one in flight)
+        saved = cache["hits"] + self._flights.coalesced
+        return {
+            **self.client.stats(),
+            "result_cache": {
+                **cache,
+                "coalesced": self._flights.coalesced,
+                "requests_saved": saved,
+                "saved_rate": round(saved / lookups, 4) if lookups else None,
+            },
+        }
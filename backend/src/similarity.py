@@ -0,0 +1,197 @@
+"""
+Near-duplicate detection for headlines, search topics and article URLs
+Headlines are compared by the significant words they share; search topics and cached analysis
+topics by MinHash signatures over word and character shingles, compared with NumPy (CPU only, no model)
+"""
+
+import os
+import re
+import zlib
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import numpy as np
+
+
+# ============= CONFIGURATION =============
+
+# Headlines sharing at least this much of their significant words (Jaccard, 0-1) are one story in
+# the daily list; "Trump signs executive order on AI" / "... on tariffs" share 0.67 and stay apart
+HEADLINE_DUPLICATE_THRESHOLD = float(os.getenv("HEADLINE_DUPLICATE_THRESHOLD", "0.8"))
+# A search topic at least this similar to a cached one is answered from that entry
+TOPIC_MATCH_THRESHOLD = float(os.getenv("TOPIC_MATCH_THRESHOLD", "0.8"))
+SIMILARITY_NUM_PERM = int(os.getenv("SIMILARITY_NUM_PERM", "128"))
+
+# Words that don't tell stories apart ("lagos, nigeria news" is the same topic as "Lagos Nigeria";
+# not "new", which is part of places like New York)
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "in", "on", "at", "to", "for", "from", "by", "with", "as",
+    "is", "are", "was", "were", "be", "its", "after", "over", "amid", "says",
+    "news", "latest", "breaking", "today", "update", "updates",
+}
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _singular(word: str) -> str:
+    """Crude plural folding ("elections" -> "election"), enough for topics and headlines"""
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def headline_words(text: str) -> Set[str]:
+    """Significant words of a headline: lowercase, singular, no punctuation or stopwords"""
+    return {_singular(word) for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS}
+
+
+def headline_similarity(a: str, b: str) -> float:
+    """
+    Share of significant words two headlines have in common (Jaccard, 0-1)
+
+    Whole words, not character shingles: headlines about different stories often differ in a
+    single word ("US election" / "UK election"), which character trigrams barely register.
+    """
+    words_a, words_b = headline_words(a), headline_words(b)
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Article identity: lowercase host without www. plus path and query
+
+    Scheme, fragment, utm_* tracking parameters and a trailing slash don't make a different article.
+    """
+    url = (url or "").strip()
+    if not url:
+        return ""
+    parts = urlsplit(url if "://" in url or url.startswith("//") else f"//{url}")
+    query = urlencode([(key, value) for key, value in parse_qsl(parts.query) if not key.lower().startswith("utm_")])
+    host = parts.netloc.lower().removeprefix("www.")
+    return f"{host}{parts.path.rstrip('/')}" + (f"?{query}" if query else "")
+
+
+def shingles(text: str) -> Set[str]:
+    """
+    Word shingles plus character trigrams of each word
+
+    Word order, punctuation and plurals don't matter; the trigrams make small spelling
+    differences count as mostly the same.
+    """
+    words = [_singular(word) for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOPWORDS]
+    result = set(words)
+    for word in words:
+        padded = f"<{word}>"
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+class MinHasher:
+    """Fixed random permutations turning shingle sets into comparable signatures"""
+
+    def __init__(self, num_perm: int = SIMILARITY_NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = max(16, num_perm)
+        self._a = rng.integers(1, _PRIME, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=self.num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a text (all-max for texts without shingles, matching nothing)"""
+        tokens = shingles(text)
+        if not tokens:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        hashes = np.array([zlib.crc32(token.encode()) for token in tokens], dtype=np.uint64)
+        # (a * h + b) mod p for every permutation and shingle, truncated to 32 bits; uint64 wraps on overflow
+        permuted = ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME) & _MAX_HASH
+        return permuted.min(axis=1)
+
+    @staticmethod
+    def similarity(a: np.ndarray, b: np.ndarray) -> float:
+        """Estimated Jaccard similarity of the two texts' shingle sets"""
+        return float(np.mean(a == b))
+
+
+# One hasher for the whole process, so signatures are comparable everywhere
+HASHER = MinHasher()
+
+
+def text_similarity(a: str, b: str) -> float:
+    return MinHasher.similarity(HASHER.signature(a), HASHER.signature(b))
+
+
+class SimilarityIndex:
+    """
+    Signatures of a set of keys for nearest-match lookups
+
+    Small enough to compare a query against every entry at once (a few thousand entries).
+    """
+
+    def __init__(self, hasher: MinHasher = HASHER):
+        self.hasher = hasher
+        self._keys: List[Hashable] = []
+        self._positions: Dict[Hashable, int] = {}
+        self._signatures = np.empty((0, hasher.num_perm), dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._positions
+
+    def add(self, key: Hashable, text: str):
+        if key in self._positions:
+            return
+        self._positions[key] = len(self._keys)
+        self._keys.append(key)
+        self._signatures = np.vstack([self._signatures, self.hasher.signature(text)])
+
+    def remove(self, key: Hashable):
+        position = self._positions.pop(key, None)
+        if position is None:
+            return
+        self._keys.pop(position)
+        self._signatures = np.delete(self._signatures, position, axis=0)
+        self._positions = {key: i for i, key in enumerate(self._keys)}
+
+    def sync(self, texts: Dict[Hashable, str]):
+        """Make the index hold exactly these keys (only new keys are hashed)"""
+        for key in [key for key in self._keys if key not in texts]:
+            self.remove(key)
+        for key, text in texts.items():
+            self.add(key, text)
+
+    def nearest(self, text: str, threshold: float, exclude: Optional[Hashable] = None) -> Optional[Tuple[Hashable, float]]:
+        """Most similar key and its similarity, if at least `threshold` similar"""
+        if not self._keys:
+            return None
+        scores = np.mean(self._signatures == self.hasher.signature(text)[None, :], axis=1)
+        for position in np.argsort(-scores):
+            if scores[position] < threshold:
+                return None
+            if self._keys[position] != exclude:
+                return self._keys[position], float(scores[position])
+        return None
+
+
+def cluster_texts(texts: List[str], threshold: float = HEADLINE_DUPLICATE_THRESHOLD) -> List[List[int]]:
+    """
+    Group near-duplicate texts, keeping input order
+
+    Each text joins the first cluster whose leading text it is at least `threshold` similar to
+    (headline_similarity; a daily list is a few dozen headlines, so every pair is compared exactly).
+
+    Returns:
+        Clusters as lists of indexes into `texts`; the first index of each is its representative
+    """
+    clusters: List[List[int]] = []
+    for i in range(len(texts)):
+        for cluster in clusters:
+            if headline_similarity(texts[i], texts[cluster[0]]) >= threshold:
+                cluster.append(i)
+                break
+        else:
+            clusters.append([i])
+    return clusters
@@ -0,0 +1,73 @@
+"""
+Single-flight request coalescing
+Concurrent callers asking for the same key share one in-flight task and its result
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Runs at most one task per key; concurrent callers await the same task
+
+    The shared task is shielded from caller cancellation: a caller that goes away
+    (e.g. client disconnect) only stops waiting. The task itself is cancelled once
+    the last caller waiting for it has been cancelled.
+    """
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+
+        self.started = 0
+        self.coalesced = 0
+
+    def in_flight(self) -> int:
+        return len(self._tasks)
+
+    def is_running(self, key: Hashable) -> bool:
+        return key in self._tasks
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+            self._waiters.pop(key, None)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return fn()'s result, sharing it with every concurrent caller using the same key
+
+        Args:
+            key: Identifies equivalent work (e.g. normalized location + topic)
+            fn: Coroutine function that performs the work; only called if nothing is in flight
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._tasks[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Only this caller was cancelled; cancel the work if nobody else is waiting
+            if not task.done() and self._tasks.get(key) is task and self._waiters[key] <= 1:
+                task.cancel()
+            raise
+        finally:
+            if self._tasks.get(key) is task:
+                self._waiters[key] -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight(),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,84 @@
+"""
+Pre-encoded JSON snapshots
+Serializes and compresses a payload once, then serves it with ETag / Last-Modified validation
+"""
+
+import gzip
+import hashlib
+import json
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request, Response
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+
+class EncodedSnapshot:
+    """A JSON payload encoded once, with gzip/zstd variants and HTTP validators"""
+
+    def __init__(self, payload: Dict[str, Any], last_modified: Optional[datetime] = None):
+        self.body = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode()
+        self.variants: Dict[str, bytes] = {"gzip": gzip.compress(self.body, compresslevel=6, mtime=0)}
+        if zstandard is not None:
+            self.variants["zstd"] = zstandard.ZstdCompressor(level=10).compress(self.body)
+
+        # Weak ETag: the same tag validates every content-coding of the body
+        self.etag = f'W/"{hashlib.blake2b(self.body, digest_size=12).hexdigest()}"'
+        # HTTP dates have one-second resolution
+        self.last_modified = (last_modified or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(microsecond=0)
+        self.last_modified_http = format_datetime(self.last_modified, usegmt=True)
+
+    def _not_modified(self, request: Request) -> bool:
+        """Evaluate If-None-Match (preferred) or If-Modified-Since"""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return self.etag.removeprefix("W/") in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return self.last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _choose_encoding(self, request: Request) -> Optional[str]:
+        """Best available content-coding the client accepts (None = identity)"""
+        accepted = set()
+        for part in request.headers.get("accept-encoding", "").split(","):
+            coding, _, params = part.strip().partition(";")
+            if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                continue
+            accepted.add(coding.strip().lower())
+
+        for coding in ("zstd", "gzip"):
+            if coding in self.variants and (coding in accepted or "*" in accepted):
+                return coding
+        return None
+
+    def response(self, request: Request, headers: Optional[Dict[str, str]] = None) -> Response:
+        """Response for this snapshot: 304 if the client copy is current, else the best encoding"""
+        validators = {
+            "ETag": self.etag,
+            "Last-Modified": self.last_modified_http,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+            **(headers or {}),
+        }
+
+        if self._not_modified(request):
+            return Response(status_code=304, headers=validators)
+
+        encoding = self._choose_encoding(request)
+        if encoding:
+            validators["Content-Encoding"] = encoding
+            return Response(self.variants[encoding], media_type="application/json", headers=validators)
+        return Response(self.body, media_type="application/json", headers=validators)
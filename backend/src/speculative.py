@@ -0,0 +1,273 @@
+"""
+Speculative pre-analysis of /search results
+After /search answers, its top headlines are analyzed in the background at low priority, so the
+/analyze that follows a click finds the analysis cached (or joins the run already in flight).
+Speculation only uses spare capacity: a global budget of speculative analyses, nothing new starts
+while real analyses are waiting, and speculation nobody has asked for yet is cancelled under load
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from .analysis_cache import ANALYSIS_CACHE_TTL
+from .prefetch import AnalysisExecutor
+from .telemetry import Counter, METRICS
+
+
+# ============= CONFIGURATION =============
+
+# Off by default: every speculative analysis spends Gemini and Tavily quota whether or not it's clicked
+SPECULATIVE_ANALYSIS = os.getenv("SPECULATIVE_ANALYSIS", "false").lower() in ("1", "true", "yes")
+# Headlines of each /search response to pre-analyze (the first ones, in result order)
+SPECULATIVE_TOP_K = int(os.getenv("SPECULATIVE_TOP_K", "3"))
+# Speculative analyses running or waiting for an executor slot at once, across all searches
+SPECULATIVE_MAX_JOBS = int(os.getenv("SPECULATIVE_MAX_JOBS", "2"))
+# Real analyses (user requests in flight plus work queued in the executor) at which speculation
+# stops starting and unclaimed speculative runs are cancelled
+SPECULATIVE_MAX_LOAD = int(os.getenv("SPECULATIVE_MAX_LOAD", "2"))
+# Seconds between load checks while speculative analyses are running
+SPECULATIVE_LOAD_CHECK_INTERVAL = float(os.getenv("SPECULATIVE_LOAD_CHECK_INTERVAL", "0.5"))
+# Seconds a finished speculative analysis waits for its click before it counts as wasted
+SPECULATIVE_HIT_WINDOW = float(os.getenv("SPECULATIVE_HIT_WINDOW", str(ANALYSIS_CACHE_TTL)))
+# Finished speculative analyses remembered for hit accounting (oldest count as wasted past this)
+SPECULATIVE_MAX_TRACKED = 1000
+
+SPECULATIVE_ANALYSES = Counter("news_speculative_analyses_total", "Speculative analyses by outcome", ("outcome",))
+SPECULATIVE_HITS = Counter("news_speculative_hits_total",
+                           "Analysis requests answered by a speculative analysis", ("kind",))
+SPECULATIVE_WORK = Counter("news_speculative_work_seconds_total",
+                           "Agent seconds spent on speculative analyses, by whether a request used them", ("use",))
+METRICS.extend([SPECULATIVE_ANALYSES, SPECULATIVE_HITS, SPECULATIVE_WORK])
+
+
+class SpeculativeAnalyzer:
+    """
+    Pre-analyzes headlines in the shared executor at "low" priority
+
+    A speculative run is claimed when a request asks for the same analysis: a hit, "cached" if
+    the run had finished, "in_flight" if the request joined it. Runs that fail, are cancelled
+    under load or finish without a claim within `hit_window` are wasted work.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[str, str], Awaitable[Any]],
+        key: Callable[[str, Optional[str]], Hashable],
+        is_available: Callable[[str, str], bool],
+        load: Callable[[], int],
+        executor: AnalysisExecutor,
+        enabled: bool = SPECULATIVE_ANALYSIS,
+        top_k: int = SPECULATIVE_TOP_K,
+        max_jobs: int = SPECULATIVE_MAX_JOBS,
+        max_load: int = SPECULATIVE_MAX_LOAD,
+        hit_window: float = SPECULATIVE_HIT_WINDOW,
+        check_interval: float = SPECULATIVE_LOAD_CHECK_INTERVAL,
+    ):
+        """
+        Args:
+            run: Coroutine function (location, topic) that runs or joins the analysis and caches it
+            key: Identifies equivalent analyses (the key `run` coalesces on)
+            is_available: True if an analysis is already cached or in flight (no need to speculate)
+            load: Real analyses in flight or waiting, not counting speculative ones
+            executor: Shared analysis pool; speculation takes its slots at "low" priority
+        """
+        self._run = run
+        self._key = key
+        self._is_available = is_available
+        self._load = load
+        self.executor = executor
+        self.enabled = enabled
+        self.top_k = max(0, top_k)
+        self.max_jobs = max(0, max_jobs)
+        self.max_load = max(1, max_load)
+        self.hit_window = hit_window
+        self.check_interval = check_interval
+
+        # Speculative analyses queued or running, by key
+        self._jobs: Dict[Hashable, asyncio.Task] = {}
+        # Runs that started: {started, finished, seconds, claimed}; finished ones wait for a claim
+        self._runs: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._watcher: Optional[asyncio.Task] = None
+        self._counts = {outcome: 0 for outcome in (
+            "started", "completed", "cancelled", "failed", "expired",
+            "skipped_available", "skipped_budget", "skipped_load",
+        )}
+        self._hits = {"cached": 0, "in_flight": 0}
+        self._seconds = {"used": 0.0, "wasted": 0.0}
+
+    def _count(self, outcome: str):
+        self._counts[outcome] += 1
+        SPECULATIVE_ANALYSES.inc(outcome=outcome)
+
+    def _spend(self, use: str, seconds: float):
+        self._seconds[use] += seconds
+        SPECULATIVE_WORK.inc(seconds, use=use)
+
+    def running_unclaimed(self) -> int:
+        """Speculative runs in flight that no request has joined (excluded from the real load)"""
+        return sum(1 for run in self._runs.values() if run["finished"] is None and not run["claimed"])
+
+    def queued(self) -> int:
+        """Speculative analyses waiting for an executor slot"""
+        return len(self._jobs) - sum(1 for run in self._runs.values() if run["finished"] is None)
+
+    def submit(self, location: str, headlines: List[str]) -> int:
+        """
+        Speculatively analyze the first `top_k` headlines (a /search response, in rank order)
+
+        Returns:
+            How many speculative analyses were scheduled
+        """
+        if not self.enabled:
+            return 0
+        self._expire()
+        scheduled = 0
+        for topic in headlines[:self.top_k]:
+            key = self._key(location, topic)
+            if key in self._jobs or key in self._runs:
+                continue
+            if self._is_available(location, topic):
+                self._count("skipped_available")
+            elif len(self._jobs) >= self.max_jobs:
+                self._count("skipped_budget")
+            elif self._load() >= self.max_load:
+                self._count("skipped_load")
+            else:
+                self._jobs[key] = asyncio.create_task(self._speculate(key, location, topic))
+                scheduled += 1
+        if self._jobs and (self._watcher is None or self._watcher.done()):
+            self._watcher = asyncio.create_task(self._watch_load())
+        return scheduled
+
+    async def _speculate(self, key: Hashable, location: str, topic: str):
+        run = None
+        try:
+            async with self.executor.slot("low"):
+                # A request (or other speculation) may have got there while this waited for a slot
+                if self._is_available(location, topic):
+                    self._count("skipped_available")
+                    return
+                if self._load() >= self.max_load:
+                    self._count("skipped_load")
+                    return
+                self.executor.record("low", "attempts")
+                self._count("started")
+                run = self._runs[key] = {"started": time.perf_counter(), "finished": None, "seconds": 0.0, "claimed": False}
+                print(f"🔮 Speculatively analyzing '{topic[:60]}'")
+                await self._run(location, topic)
+            self.executor.record("low", "completed")
+            self._count("completed")
+            run["finished"] = time.time()
+            run["seconds"] = time.perf_counter() - run["started"]
+            if run["claimed"]:
+                # A request joined the run and got its result
+                self._spend("used", run["seconds"])
+                self._runs.pop(key, None)
+        except asyncio.CancelledError:
+            if run is not None:
+                self._count("cancelled")
+                self._spend("wasted", time.perf_counter() - run["started"])
+                self._runs.pop(key, None)
+            raise
+        except Exception as e:
+            self.executor.record("low", "failed")
+            self._count("failed")
+            if run is not None:
+                self._spend("wasted", time.perf_counter() - run["started"])
+                self._runs.pop(key, None)
+            print(f"⚠️  Speculative analysis of '{topic[:60]}' failed: {e}")
+        finally:
+            self._jobs.pop(key, None)
+            self._trim()
+
+    def claim(self, location: str, topic: Optional[str]) -> Optional[str]:
+        """
+        Record that a request asked for this analysis (call before looking it up)
+
+        Returns:
+            "cached" or "in_flight" if a speculative run answers it, otherwise None
+        """
+        key = self._key(location, topic)
+        run = self._runs.get(key)
+        if run is None or run["claimed"]:
+            return None
+        if run["finished"] is not None and time.time() - run["finished"] > self.hit_window:
+            self._waste(key)
+            return None
+        run["claimed"] = True
+        kind = "in_flight" if run["finished"] is None else "cached"
+        if run["finished"] is not None:
+            self._spend("used", run["seconds"])
+            self._runs.pop(key)
+        self._hits[kind] += 1
+        SPECULATIVE_HITS.inc(kind=kind)
+        print(f"🔮 Speculative analysis hit ({kind}) for '{(topic or location)[:60]}'")
+        return kind
+
+    def _expire(self):
+        """Count finished runs nobody claimed within the hit window as wasted"""
+        now = time.time()
+        for key, run in list(self._runs.items()):
+            if run["finished"] is not None and now - run["finished"] > self.hit_window:
+                self._waste(key)
+
+    def _trim(self):
+        finished = [key for key, run in self._runs.items() if run["finished"] is not None]
+        for key in finished[:max(0, len(finished) - SPECULATIVE_MAX_TRACKED)]:
+            self._waste(key)
+
+    def _waste(self, key: Hashable):
+        run = self._runs.pop(key)
+        self._count("expired")
+        self._spend("wasted", run["seconds"])
+
+    def cancel_unclaimed(self) -> int:
+        """Cancel queued and running speculation that no request has joined"""
+        cancelled = 0
+        for key, task in list(self._jobs.items()):
+            run = self._runs.get(key)
+            if run is None or not run["claimed"]:
+                task.cancel()
+                cancelled += 1
+        return cancelled
+
+    async def _watch_load(self):
+        while self._jobs:
+            await asyncio.sleep(self.check_interval)
+            if self._load() >= self.max_load:
+                cancelled = self.cancel_unclaimed()
+                if cancelled:
+                    print(f"🔮 Under load: cancelled {cancelled} speculative analyses")
+
+    async def close(self):
+        tasks = list(self._jobs.values())
+        if self._watcher is not None:
+            tasks.append(self._watcher)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts, hit rate (share of finished speculative work a request used) and wasted work"""
+        self._expire()
+        hits = sum(self._hits.values())
+        wasted = self._counts["cancelled"] + self._counts["failed"] + self._counts["expired"]
+        spent = self._seconds["used"] + self._seconds["wasted"]
+        return {
+            "enabled": self.enabled,
+            "top_k": self.top_k,
+            "max_jobs": self.max_jobs,
+            "max_load": self.max_load,
+            "running": len(self._jobs) - self.queued(),
+            "queued": self.queued(),
+            "awaiting_claim": sum(1 for run in self._runs.values() if run["finished"] is not None),
+            **self._counts,
+            "hits": dict(self._hits),
+            "wasted": wasted,
+            "hit_rate": round(hits / (hits + wasted), 4) if hits + wasted else None,
+            "work_seconds": {use: round(seconds, 2) for use, seconds in self._seconds.items()},
+            "wasted_work_rate": round(self._seconds["wasted"] / spent, 4) if spent else None,
+        }
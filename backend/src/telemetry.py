@@ -0,0 +1,149 @@
+"""
+Analysis instrumentation
+Prometheus-style metrics for /metrics; per-analysis spans, LLM/tool call counts and token usage are
+recorded by callbacks.APICallCounter
+"""
+
+import bisect
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# ============= PROMETHEUS METRICS =============
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.labels, key)} {value:g}" for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        # labels -> ([count per bucket, +Inf last], sum)
+        self._values: Dict[LabelValues, Tuple[List[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    bucket = 'le="' + le + '"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, bucket)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total:g}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+ANALYSES = Counter("news_analyses_total", "Agent analyses run", ("pipeline", "outcome"))
+ANALYSIS_SECONDS = Histogram("news_analysis_duration_seconds", "Wall-clock time of one agent analysis", ("pipeline",))
+STAGE_SECONDS = Histogram("news_analysis_stage_duration_seconds", "Time spent in each analysis stage (parallel branches observed separately)", ("stage",))
+LLM_CALLS = Counter("news_llm_calls_total", "Chat model calls", ("stage", "outcome"))
+LLM_SECONDS = Histogram("news_llm_call_duration_seconds", "Chat model call latency", ("stage",))
+LLM_TOKENS = Counter("news_llm_tokens_total", "Chat model tokens", ("stage", "type"))
+TOOL_CALLS = Counter("news_tool_calls_total", "Agent tool calls", ("tool", "outcome"))
+TOOL_SECONDS = Histogram("news_tool_call_duration_seconds", "Agent tool call latency", ("tool",))
+
+METRICS = [ANALYSES, ANALYSIS_SECONDS, STAGE_SECONDS, LLM_CALLS, LLM_SECONDS, LLM_TOKENS, TOOL_CALLS, TOOL_SECONDS]
+
+# Values read at scrape time: name -> (kind, help, callback returning {label values: value}, label names)
+_collected: Dict[str, Tuple[str, str, Callable[[], Dict[LabelValues, float]], Tuple[str, ...]]] = {}
+
+
+def register_collected(name: str, help: str, read: Callable[[], Dict[LabelValues, float]],
+                       labels: Tuple[str, ...] = (), kind: str = "gauge"):
+    """Expose values computed on every scrape from existing stats (cache hits, queue depth, ...)"""
+    _collected[name] = (kind, help, read, labels)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    for name, (kind, help, read, labels) in _collected.items():
+        try:
+            values = read()
+        except Exception:
+            continue
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(f"{name}{_format_labels(labels, key)} {value:g}" for key, value in sorted(values.items()) if value is not None)
+    return "\n".join(lines) + "\n"
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process (Linux /proc, None elsewhere)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def metrics_header(summary: Optional[Dict[str, Any]], source: str = "agent") -> str:
+    """Compact one-line form of an analysis summary for the X-Analysis-Metrics debug header"""
+    if not summary:
+        return f"source={source}"
+    stages = ",".join(f"{name}:{stage['seconds']:.2f}" for name, stage in summary["stages"].items())
+    header = (
+        f"source={source}; seconds={summary['seconds']:.2f}; llm_calls={summary['llm_calls']}; "
+        f"tool_calls={summary['tool_calls']}; input_tokens={summary['input_tokens']}; "
+        f"output_tokens={summary['output_tokens']}; errors={summary['errors']}; stages={stages}"
+    )
+    if summary.get("tool_output"):
+        header += f"; tool_output_tokens={summary['tool_output']['tokens']}/{summary['tool_output']['raw_tokens']}"
+    return header
@@ -0,0 +1,194 @@
+"""
+LangChain tools the agent is given
+Thin adapters over the app's shared search client, outlet registry and search output compaction;
+only the agent imports this module, so the API starts without loading LangChain
+"""
+
+import asyncio
+from typing import Any, Coroutine, Dict, List, Literal, Optional, Type
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+try:
+    from .compaction import (
+        ANALYSIS_CONTEXT_BUDGET, TOOL_RESULT_MAX_CHARS, ToolOutputBudget, compact_results, load_tokenizer,
+    )
+    from .outlets import OUTLETS_MAX_LOOKUP
+except ImportError:  # imported by agent.py run as a script
+    from compaction import (
+        ANALYSIS_CONTEXT_BUDGET, TOOL_RESULT_MAX_CHARS, ToolOutputBudget, compact_results, load_tokenizer,
+    )
+    from outlets import OUTLETS_MAX_LOOKUP
+
+
+def run_sync(coroutine: Coroutine, loop: Optional[asyncio.AbstractEventLoop] = None) -> Any:
+    """
+    Run an async tool implementation for a synchronous caller (tool.invoke)
+
+    Runs on `loop` if it is running in another thread: the shared clients' connections and locks
+    belong to the loop that first used them. Otherwise runs in a new event loop in this thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        coroutine.close()
+        raise RuntimeError("Synchronous tool call from inside a running event loop, use ainvoke")
+    if loop is not None and loop.is_running():
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+    return asyncio.run(coroutine)
+
+
+# ============= SEARCH =============
+
+class SearchToolInput(BaseModel):
+    """Input for the tavily_search tool"""
+
+    model_config = ConfigDict(extra="ignore")
+
+    query: str = Field(description="Search query to look up")
+    include_domains: Optional[List[str]] = Field(
+        default=None, description="A list of domains to restrict search results to"
+    )
+    exclude_domains: Optional[List[str]] = Field(
+        default=None, description="A list of domains to exclude from search results"
+    )
+    time_range: Optional[Literal["day", "week", "month", "year"]] = Field(
+        default=None, description="Limit results to this recent time range"
+    )
+    topic: Optional[Literal["general", "news", "finance"]] = Field(
+        default=None, description="Search category; use 'news' for current events"
+    )
+
+
+class SharedTavilySearch(BaseTool):
+    """tavily_search tool for the agent, backed by the app's shared SearchClient"""
+
+    name: str = "tavily_search"
+    description: str = (
+        "A search engine optimized for comprehensive, accurate, and trusted results. "
+        "Useful for when you need to answer questions about current events. "
+        "It not only retrieves URLs and snippets, but offers advanced search depths, "
+        "domain management, time range filters, and image search, this tool delivers "
+        "real-time, accurate, and citation-backed results."
+        "Input should be a search query."
+    )
+    args_schema: Type[BaseModel] = SearchToolInput
+    handle_tool_error: bool = True
+
+    client: Any = Field(exclude=True)
+
+    # Event loop the async path last ran on (where the shared client lives)
+    _loop: Optional[asyncio.AbstractEventLoop] = PrivateAttr(default=None)
+
+    def _run(self, query: str, **kwargs: Any) -> Dict[str, Any]:
+        kwargs.pop("run_manager", None)
+        return run_sync(self._arun(query, **kwargs), self._loop)
+
+    async def _arun(self, query: str, **kwargs: Any) -> Dict[str, Any]:
+        kwargs.pop("run_manager", None)
+        self._loop = asyncio.get_running_loop()
+        try:
+            return await self.client.search(query, **kwargs)
+        except Exception as e:
+            # Let the agent see the failure and try another query instead of aborting the run
+            return {"error": str(e)}
+
+
+# ============= OUTLET LOOKUP =============
+
+class OutletLookupInput(BaseModel):
+    """Input for the lookup_outlets tool"""
+
+    model_config = ConfigDict(extra="ignore")
+
+    outlets: List[str] = Field(description="Outlet domains, article URLs or outlet names, e.g. ['bbc.co.uk', 'Fox News']")
+
+
+class OutletLookupTool(BaseTool):
+    """lookup_outlets tool for the agent, backed by the OutletRegistry"""
+
+    name: str = "lookup_outlets"
+    description: str = (
+        "Look up what is already known about news outlets: political leaning, type, ownership, "
+        "funding sources and supporters, from earlier analyses. Input is a list of domains, "
+        "article URLs or outlet names. Outlets reported as null are unknown - search for those."
+    )
+    args_schema: Type[BaseModel] = OutletLookupInput
+
+    registry: Any = Field(exclude=True)
+
+    def _run(self, outlets: List[str], **kwargs: Any) -> Dict[str, Any]:
+        return self.registry.lookup(outlets[:OUTLETS_MAX_LOOKUP])
+
+    async def _arun(self, outlets: List[str], **kwargs: Any) -> Dict[str, Any]:
+        # Indexed SQLite reads; cheap enough to run on the event loop
+        return self._run(outlets)
+
+
+# ============= SEARCH OUTPUT COMPACTION =============
+
+class CompactSearchTool(BaseTool):
+    """
+    Wraps the agent's search tool (same name, description and arguments) and compacts its output
+
+    Per-analysis state is keyed by the run's thread_id: the agent calls begin() before an analysis
+    and end() after it. Calls outside a begun analysis are compacted without dedupe or budget.
+    """
+
+    name: str = "tavily_search"
+    description: str = ""
+    args_schema: Optional[Type[BaseModel]] = None
+    handle_tool_error: bool = True
+
+    tool: Any = Field(exclude=True)
+    budget_tokens: int = ANALYSIS_CONTEXT_BUDGET
+    max_chars: int = TOOL_RESULT_MAX_CHARS
+
+    _budgets: Dict[str, ToolOutputBudget] = PrivateAttr(default_factory=dict)
+    _totals: ToolOutputBudget = PrivateAttr(default_factory=lambda: ToolOutputBudget(0))
+    # Event loop the async path last ran on (where the wrapped tool's client lives)
+    _loop: Optional[asyncio.AbstractEventLoop] = PrivateAttr(default=None)
+
+    def __init__(self, tool: BaseTool, **kwargs: Any):
+        super().__init__(tool=tool, name=tool.name, description=tool.description,
+                         args_schema=tool.args_schema, **kwargs)
+
+    def begin(self, thread_id: str):
+        self._budgets[thread_id] = ToolOutputBudget(self.budget_tokens)
+
+    def end(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Forget an analysis' state, returning its accounting"""
+        budget = self._budgets.pop(thread_id, None)
+        if budget is None:
+            return None
+        for field in ("calls", "results", "duplicates", "trimmed", "over_budget", "raw_tokens", "tokens"):
+            setattr(self._totals, field, getattr(self._totals, field) + getattr(budget, field))
+        return budget.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        """Totals over finished analyses"""
+        return {"budget": self.budget_tokens or None, "max_chars": self.max_chars, "tokenizer": load_tokenizer(),
+                **{key: value for key, value in self._totals.stats().items() if key != "budget"}}
+
+    def _run(self, query: str, config: RunnableConfig, **kwargs: Any) -> Any:
+        kwargs.pop("run_manager", None)
+        return run_sync(self._arun(query, config, **kwargs), self._loop)
+
+    async def _arun(self, query: str, config: RunnableConfig, **kwargs: Any) -> Any:
+        kwargs.pop("run_manager", None)
+        self._loop = asyncio.get_running_loop()
+        # Not passing the config: the wrapped call would show up as a second tool call in the callbacks
+        output = await self.tool.ainvoke({"query": query, **kwargs})
+        configurable = config.get("configurable", {})
+        budget = self._budgets.get(configurable.get("thread_id"))
+        if budget is None:
+            budget = ToolOutputBudget(0)
+        # A research branch's agent runs in a subgraph ("research_perspective:<id>|tools:<id>"):
+        # its message history is its own. A top-level agent shares one history for the whole thread
+        namespace = configurable.get("checkpoint_ns") or ""
+        conversation = namespace.split("|")[0] if "|" in namespace else ""
+        return compact_results(output, query, budget, conversation, self.max_chars)
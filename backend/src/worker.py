@@ -0,0 +1,204 @@
+"""
+Analysis job worker
+Runs jobs from the durable queue outside the API process
+
+Usage (from backend/):
+    python -m src.worker --processes 2 --concurrency 2
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from .agent import NewsAnalysisAgent
+from .analysis_cache import AnalysisCache
+from .jobs import JOBS_LEASE_SECONDS, JobQueue
+from .outlets import OutletRegistry
+from .providers import make_chat_model, make_search_provider, required_api_keys
+from .resilience import classify_error
+from .tools import SharedTavilySearch
+
+
+# ============= CONFIGURATION =============
+
+JOBS_WORKER_PROCESSES = int(os.getenv("JOBS_WORKER_PROCESSES", "1"))
+# Jobs run at the same time inside each worker process
+JOBS_WORKER_CONCURRENCY = int(os.getenv("JOBS_WORKER_CONCURRENCY", "2"))
+JOBS_POLL_INTERVAL = float(os.getenv("JOBS_POLL_INTERVAL", "1.0"))
+JOBS_TIMEOUT = float(os.getenv("JOBS_TIMEOUT", "300"))
+# On SIGTERM, running jobs get this long to finish before they are handed back to the queue
+JOBS_SHUTDOWN_GRACE = float(os.getenv("JOBS_SHUTDOWN_GRACE", "30"))
+
+# Same files as the API (src/main.py)
+JOBS_FILE = Path(__file__).parent.parent / "jobs.db"
+ANALYSIS_CACHE_FILE = Path(__file__).parent.parent / "analysis_cache.db"
+OUTLETS_FILE = Path(__file__).parent.parent / "outlets.db"
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Failures worth retrying later: rate limits, timeouts, network and upstream 5xx errors, open circuits"""
+    return classify_error(error) in ("rate_limit", "timeout", "upstream", "circuit_open")
+
+
+class Worker:
+    """Claims jobs from the queue and runs them, up to `concurrency` at a time"""
+
+    def __init__(self, queue: JobQueue, agent: NewsAnalysisAgent, analysis_cache: AnalysisCache,
+                 concurrency: int = JOBS_WORKER_CONCURRENCY, worker_id: Optional[str] = None):
+        self.queue = queue
+        self.agent = agent
+        self.analysis_cache = analysis_cache
+        self.concurrency = max(1, concurrency)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._running: Dict[str, asyncio.Task] = {}
+        self._stopping = asyncio.Event()
+
+    async def _heartbeat(self, job_id: str):
+        """Renew the lease while the job runs; stop the job if another worker took it over"""
+        while True:
+            await asyncio.sleep(JOBS_LEASE_SECONDS / 3)
+            if not self.queue.heartbeat(job_id, self.worker_id):
+                print(f"⚠️  Lost the lease on job {job_id[:8]}, abandoning it")
+                self._running[job_id].cancel()
+                return
+
+    async def _run_job(self, job: Dict):
+        job_id = job["id"]
+        started = time.time()
+        events = 0
+        last_progress = 0.0
+
+        def on_event(event: Dict):
+            # Progress for GET /jobs/{id} subscribers, written at most once a second
+            nonlocal events, last_progress
+            events += 1
+            if time.time() - last_progress >= 1:
+                last_progress = time.time()
+                self.queue.set_progress(job_id, self.worker_id, {"last_event": event["event"], "events": events})
+
+        print(f"🛠️  [{self.worker_id}] Job {job_id[:8]} attempt {job['attempts']}: {job['topic'] or job['location']}")
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            analysis = await asyncio.wait_for(
+                self.agent.analyze_news(location=job["location"], topic=job["topic"], on_event=on_event),
+                timeout=JOBS_TIMEOUT
+            )
+            self.analysis_cache.put(job["location"], job["topic"], analysis)
+            self.queue.complete(job_id, self.worker_id, analysis.model_dump_json())
+            print(f"✅ [{self.worker_id}] Job {job_id[:8]} done in {time.time() - started:.1f}s")
+        except asyncio.CancelledError:
+            # Shutting down (or the lease was lost): another worker picks the job up
+            self.queue.release(job_id, self.worker_id)
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                e = TimeoutError(f"Analysis timed out after {JOBS_TIMEOUT:.0f}s")
+            status = self.queue.fail(job_id, self.worker_id, str(e), transient=is_transient_error(e))
+            print(f"⚠️  [{self.worker_id}] Job {job_id[:8]} failed ({'will retry' if status == 'queued' else 'giving up'}): {e}")
+        finally:
+            heartbeat.cancel()
+            self._running.pop(job_id, None)
+
+    async def run(self):
+        """Claim and run jobs until stop() is called"""
+        print(f"👷 Worker {self.worker_id} started ({self.concurrency} at a time)")
+        while not self._stopping.is_set():
+            job = self.queue.claim(self.worker_id) if len(self._running) < self.concurrency else None
+            if job is None:
+                # Nothing to do (or no free slot): wait for a job to finish, a stop, or the next poll
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=JOBS_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._running[job["id"]] = asyncio.create_task(self._run_job(job))
+
+        tasks = list(self._running.values())
+        if tasks:
+            print(f"⏳ Waiting up to {JOBS_SHUTDOWN_GRACE:.0f}s for {len(tasks)} running job(s)...")
+            _, pending = await asyncio.wait(tasks, timeout=JOBS_SHUTDOWN_GRACE)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        print(f"👋 Worker {self.worker_id} stopped")
+
+    def stop(self):
+        self._stopping.set()
+
+
+async def run_worker(concurrency: int = JOBS_WORKER_CONCURRENCY):
+    """Set up the agent and queue for this process and work until SIGINT/SIGTERM"""
+    load_dotenv()
+    missing_keys = [key for key, required in required_api_keys().items() if required and not os.getenv(key)]
+    if missing_keys:
+        raise SystemExit(f"⚠️  {' and '.join(missing_keys)} must be set in environment")
+
+    gemini_key = os.getenv("GEMINI_API_KEY")
+    tavily_key = os.getenv("TAVILY_API_KEY")
+    search_client = make_search_provider(tavily_key)
+    # Shared with the API through SQLite; the agent records what each job learns about outlets
+    outlet_registry = OutletRegistry(OUTLETS_FILE)
+    agent = NewsAnalysisAgent(
+        gemini_api_key=gemini_key,
+        tavily_api_key=tavily_key,
+        llm=make_chat_model(gemini_key),
+        search_tool=SharedTavilySearch(client=search_client),
+        outlet_registry=outlet_registry
+    )
+    queue = JobQueue(JOBS_FILE)
+    analysis_cache = AnalysisCache(ANALYSIS_CACHE_FILE)
+    worker = Worker(queue, agent, analysis_cache, concurrency)
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    try:
+        await worker.run()
+    finally:
+        await search_client.aclose()
+        analysis_cache.close()
+        outlet_registry.close()
+        queue.close()
+
+
+def _process_main(concurrency: int):
+    asyncio.run(run_worker(concurrency))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued analysis jobs")
+    parser.add_argument("--processes", type=int, default=JOBS_WORKER_PROCESSES, help="worker processes")
+    parser.add_argument("--concurrency", type=int, default=JOBS_WORKER_CONCURRENCY, help="jobs at a time per process")
+    args = parser.parse_args()
+
+    if args.processes <= 1:
+        _process_main(args.concurrency)
+        return
+
+    # Each process has its own agent, event loop and connection pool; the queue is shared through SQLite
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_process_main, args=(args.concurrency,)) for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    def forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
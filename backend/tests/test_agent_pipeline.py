@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from src.agent import NewsAnalysisAgent, _progress_events
+from src.fakes import FakeChatModel, FakeSearchProvider
+from src.models import NewsAnalysis
+from src.tools import SharedTavilySearch
+
+
+def make_agent(invalid_rate=0.0, **kwargs):
+    llm = FakeChatModel(latency_ms=0, invalid_rate=invalid_rate)
+    search = SharedTavilySearch(client=FakeSearchProvider(latency_ms=0, error_rate=0))
+    return NewsAnalysisAgent(gemini_api_key="", tavily_api_key="", llm=llm, search_tool=search, **kwargs)
+
+
+def run(agent, topic="Lagos floods"):
+    """Every progress event of one analysis"""
+    async def main():
+        return [event async for event in agent.analyze_news_stream("Global", topic)]
+
+    return asyncio.run(main())
+
+
+def test_search_calls_and_results_become_progress_events():
+    call = AIMessage(content="Looking for coverage", tool_calls=[
+        {"name": "tavily_search", "id": "1", "args": {"query": "lagos floods"}},
+        {"name": "NewsAnalysis", "id": "2", "args": {}},
+    ])
+    result = ToolMessage(name="tavily_search", tool_call_id="1", content=json.dumps(
+        {"results": [{"title": "Floods", "url": "https://example.com/a", "content": "..."}]}))
+    answer = ToolMessage(name="NewsAnalysis", tool_call_id="2", content="Returning structured response")
+
+    assert _progress_events(call) == [
+        {"event": "reasoning", "data": {"content": "Looking for coverage"}},
+        {"event": "tool_call", "data": {"tool": "tavily_search", "query": "lagos floods"}},
+    ]
+    assert _progress_events(result) == [{"event": "sources", "data": {
+        "tool": "tavily_search", "sources": [{"title": "Floods", "url": "https://example.com/a"}]}}]
+    assert _progress_events(answer) == []
+    # Final answers without tool calls are the agent's output, not progress
+    assert _progress_events(AIMessage(content="Done")) == []
+
+
+def test_fake_search_is_deterministic_for_a_seed():
+    async def search(seed):
+        return await FakeSearchProvider(latency_ms=0, seed=seed).search("lagos floods")
+
+    first, again = asyncio.run(search(1)), asyncio.run(search(1))
+    assert first == again
+    assert first["results"] and all(result["url"].startswith("http") for result in first["results"])
+
+
+def test_offline_analysis_with_fake_providers():
+    events = run(make_agent(pipeline="single_agent", output_mode="two_pass"))
+    names = [event["event"] for event in events]
+    assert names[0] == "started" and names[-1] == "analysis"
+    assert "tool_call" in names and "sources" in names
+    analysis = events[-1]["data"]
+    assert isinstance(analysis, NewsAnalysis)
+    assert analysis.perspectives and analysis.date_analyzed
+
+
+def test_agent_answers_with_news_analysis_directly():
+    agent = make_agent(pipeline="single_agent", output_mode="single_pass")
+    events = run(agent)
+    assert "structuring" not in [event["event"] for event in events]
+    assert isinstance(events[-1]["data"], NewsAnalysis)
+    assert agent.output_stats()["single_pass"] == 1 and agent.output_stats()["fallback_rate"] == 0.0
+
+
+def test_invalid_agent_answers_are_structured_separately():
+    agent = make_agent(pipeline="single_agent", output_mode="single_pass", invalid_rate=1.0)
+    events = run(agent)
+    assert {"event": "structuring", "data": {"reason": "fallback_invalid"}} in events
+    assert isinstance(events[-1]["data"], NewsAnalysis)
+    stats = agent.output_stats()
+    assert stats["fallback_invalid"] == 1 and stats["fallback_rate"] == 1.0
+
+
+def test_parallel_pipeline_researches_each_side():
+    agent = make_agent(pipeline="parallel")
+    events = run(agent)
+    names = [event["event"] for event in events]
+    plan = next(event["data"] for event in events if event["event"] == "plan")
+    # One research branch per side, merged by the synthesis step
+    assert names.count("perspective") == len(plan["sides"]) >= 2
+    assert "social_media" in names and "structuring" not in names
+    assert len(events[-1]["data"].perspectives) == len(plan["sides"])
+    assert agent.output_stats()["parallel"] == 1 and agent.output_stats()["mode"] is None
+
+
+def test_each_analysis_reports_its_calls_and_tokens():
+    events = run(make_agent(pipeline="parallel"))
+    metrics = next(event["data"] for event in events if event["event"] == "metrics")
+    assert metrics["llm_calls"] > 0 and metrics["tool_calls"] > 0
+    assert metrics["input_tokens"] > 0 and metrics["errors"] == 0
+    assert {"identify_sides", "synthesize"} <= set(metrics["stages"])
+    assert events[-1]["data"]._metrics is metrics
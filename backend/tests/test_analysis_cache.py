@@ -0,0 +1,66 @@
+import time
+
+from src.analysis_cache import AnalysisCache
+from src.resilience import DEGRADED_MATCH_THRESHOLD
+
+
+def analysis(topic):
+    return {"location": "Global", "topic": topic, "headline": topic.title(), "date_analyzed": "2026-01-01",
+            "perspectives": [], "common_facts": [], "key_disagreements": [], "social_media_voices": [],
+            "summary": "", "information_quality": ""}
+
+
+def test_analyses_are_fresh_until_the_ttl_then_stale(tmp_path):
+    cache = AnalysisCache(tmp_path / "analysis_cache.db", ttl=60, max_stale=3600)
+    cache.put("Global", "Floods", analysis("floods"))
+    cache.put_if_missing("Global", "Drought", analysis("drought"), created_at=time.time() - 600)
+    cache.put_if_missing("Global", "Heatwave", analysis("heatwave"), created_at=time.time() - 7200)
+
+    fresh, is_fresh = cache.get("global", "floods")
+    assert fresh.topic == "floods" and is_fresh
+    stale, is_fresh = cache.get("Global", "Drought")
+    assert stale.topic == "drought" and not is_fresh
+    assert cache.get("Global", "Heatwave") is None
+    assert cache.has("Global", "Drought") and not cache.has("Global", "Heatwave")
+    assert cache.stats()["hits"] == 1 and cache.stats()["stale_hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_seeding_does_not_replace_a_newer_analysis(tmp_path):
+    cache = AnalysisCache(tmp_path / "analysis_cache.db")
+    cache.put("Global", "Floods", analysis("from the agent"))
+    cache.put_if_missing("Global", "Floods", analysis("from daily news"), created_at=time.time() - 60)
+    assert cache.get("Global", "Floods")[0].topic == "from the agent"
+
+
+def test_analyses_survive_a_restart_until_purged(tmp_path):
+    path = tmp_path / "analysis_cache.db"
+    cache = AnalysisCache(path, ttl=60, max_stale=3600)
+    cache.put("Global", "Floods", analysis("floods"))
+    cache.put_if_missing("Global", "Heatwave", analysis("heatwave"), created_at=time.time() - 7200)
+    cache.close()
+
+    reopened = AnalysisCache(path, ttl=60, max_stale=3600)
+    assert reopened.get("Global", "Floods")[1]
+    assert reopened.purge_expired() == 1
+    assert [item["topic"] for item in reopened.iter_analyses()] == ["floods"]
+
+
+def test_similar_topic_about_another_place_is_not_a_stand_in(tmp_path):
+    cache = AnalysisCache(tmp_path / "analysis_cache.db")
+    cache.put("Global", "earthquake hits turkey", analysis("earthquake hits turkey"))
+    assert cache.nearest("Global", "earthquake hits japan", DEGRADED_MATCH_THRESHOLD) is None
+
+
+def test_reworded_topic_with_the_same_key_terms_stands_in(tmp_path):
+    cache = AnalysisCache(tmp_path / "analysis_cache.db")
+    cache.put("Lagos", "lagos flooding latest updates", analysis("lagos flooding latest updates"))
+    match = cache.nearest("Lagos", "flooding in lagos", DEGRADED_MATCH_THRESHOLD)
+    assert match is not None
+    assert match[0].topic == "lagos flooding latest updates"
+
+
+def test_exact_topic_matches_and_other_locations_do_not(tmp_path):
+    cache = AnalysisCache(tmp_path / "analysis_cache.db")
+    cache.put("Global", "earthquake hits turkey", analysis("earthquake hits turkey"))
+    assert cache.nearest("Global", "Earthquake hits Turkey", DEGRADED_MATCH_THRESHOLD)[1] == 1.0
+    assert cache.nearest("Lagos", "earthquake hits turkey", DEGRADED_MATCH_THRESHOLD) is None
@@ -0,0 +1,124 @@
+import asyncio
+
+from src.batch import BatchManager
+from src.singleflight import SingleFlight
+
+
+def items(*topics):
+    return [{"location": "Global", "topic": topic} for topic in topics]
+
+
+async def finish(job):
+    await asyncio.gather(job.task, return_exceptions=True)
+    return job
+
+
+def test_items_report_their_own_status_and_results():
+    async def run_item(location, topic, priority):
+        await asyncio.sleep(0.01)
+        if topic == "broken":
+            raise ValueError("bad model output")
+        return {"topic": topic}, "cached" if topic == "known" else "analyzed"
+
+    async def main():
+        job = BatchManager(run_item).submit(items("new", "known", "broken"), priority="low")
+        assert job.status == "queued"
+        await asyncio.sleep(0.001)
+        assert job.status == "running"
+        assert job.progress()["running"] == 3
+        return await finish(job)
+
+    job = asyncio.run(main())
+    assert [item["status"] for item in job.items] == ["done", "cached", "error"]
+    assert job.items[0]["analysis"] == {"topic": "new"}
+    assert job.items[2]["error"] == "bad model output"
+    assert job.progress() == {"total": 3, "completed": 3, "cached": 1, "failed": 1, "running": 0}
+    assert job.status == "done"
+    assert "analysis" not in job.to_dict(include_results=False)["items"][0]
+
+
+def test_finished_items_are_visible_before_the_job_ends():
+    async def run_item(location, topic, priority):
+        await asyncio.sleep(0.01 if topic == "fast" else 0.2)
+        return {"topic": topic}, "analyzed"
+
+    async def main():
+        job = BatchManager(run_item).submit(items("fast", "slow"))
+        await asyncio.sleep(0.05)
+        partial = job.to_dict()
+        partial["items"] = [dict(item) for item in partial["items"]]
+        await finish(job)
+        return partial
+
+    partial = asyncio.run(main())
+    assert partial["status"] == "running"
+    assert [item["status"] for item in partial["items"]] == ["done", "running"]
+    assert partial["items"][0]["analysis"] == {"topic": "fast"}
+
+
+def test_job_fails_only_when_every_item_does():
+    async def run_item(location, topic, priority):
+        raise RuntimeError("upstream down")
+
+    async def main():
+        return await finish(BatchManager(run_item).submit(items("a", "b")))
+
+    assert asyncio.run(main()).status == "failed"
+
+
+def test_closing_cancels_running_jobs():
+    async def run_item(location, topic, priority):
+        await asyncio.sleep(10)
+
+    async def main():
+        manager = BatchManager(run_item)
+        job = manager.submit(items("a"))
+        await asyncio.sleep(0.01)
+        await manager.close()
+        return job
+
+    assert asyncio.run(main()).status == "cancelled"
+
+
+def test_identical_items_share_one_run():
+    flights = SingleFlight()
+    runs = []
+
+    async def analyze(topic):
+        runs.append(topic)
+        await asyncio.sleep(0.01)
+        return {"topic": topic}
+
+    async def run_item(location, topic, priority):
+        return await flights.do((location, topic), lambda: analyze(topic)), "analyzed"
+
+    async def main():
+        manager = BatchManager(run_item)
+        first = manager.submit(items("a", "a", "b"))
+        second = manager.submit(items("a"))
+        return await finish(first), await finish(second)
+
+    first, second = asyncio.run(main())
+    assert sorted(runs) == ["a", "b"]
+    assert all(item["status"] == "done" for item in first.items + second.items)
+
+
+def test_old_and_surplus_finished_jobs_are_pruned():
+    async def run_item(location, topic, priority):
+        return {}, "analyzed"
+
+    async def main():
+        manager = BatchManager(run_item, max_jobs=2)
+        jobs = [await finish(manager.submit(items("a"))) for _ in range(3)]
+        kept = [job.id for job in jobs if manager.get(job.id)]
+
+        manager.ttl = -1
+        last = manager.submit(items("a"))
+        expired_kept = [job.id for job in jobs if manager.get(job.id)]
+        await finish(last)
+        return jobs, kept, expired_kept, manager.stats()
+
+    jobs, kept, expired_kept, stats = asyncio.run(main())
+    assert kept == [jobs[1].id, jobs[2].id]
+    assert expired_kept == []
+    assert stats == {"jobs": 1, "running": 0, "submitted": 4, "items_submitted": 4}
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from src.cache import SearchCache, TTLCache
+from src.packed import is_packed
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_entries=2, ttl=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(max_entries=10, ttl=60)
+    cache.set("old", 1, stored_at=time.time() - 61)
+    cache.set("new", 2)
+    assert "old" not in cache
+    assert cache.get("old") is None
+    assert cache.get("new") == 2
+    assert (cache.hits, cache.misses, cache.expirations) == (1, 1, 1)
+    assert [key for key, _, _ in cache.items()] == ["new"]
+
+
+def test_membership_checks_do_not_touch_lru_order_or_counters():
+    cache = TTLCache(max_entries=2, ttl=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert "a" in cache
+    cache.set("c", 3)
+    assert "a" not in cache
+    assert cache.hits == 0 and cache.misses == 0
+
+
+def test_delete():
+    cache = TTLCache(max_entries=2, ttl=None)
+    cache.set("a", 1)
+    assert cache.delete("a") and not cache.delete("a")
+    assert len(cache) == 0
+
+
+def headlines(title):
+    return [{"headline": title, "url": f"https://example.com/{title}"}]
+
+
+def test_two_processes_flushing_to_one_file_keep_each_others_entries(tmp_path):
+    path = tmp_path / "search_cache.pack"
+    first = SearchCache(path, match_threshold=1.0)
+    second = SearchCache(path, match_threshold=1.0)
+    first.put_headlines("Lagos floods", headlines("floods"))
+    second.put_headlines("Kenya drought", headlines("drought"))
+
+    # The second write merged the first one's entry, in the file and in memory
+    assert second.get_headlines("lagos floods") == headlines("floods")
+    reopened = SearchCache(path, match_threshold=1.0)
+    reopened.load()
+    assert reopened.get_headlines("Lagos floods") == headlines("floods")
+    assert reopened.get_headlines("Kenya drought") == headlines("drought")
+
+
+def test_the_newest_entry_for_a_topic_wins(tmp_path):
+    path = tmp_path / "search_cache.pack"
+    stale = SearchCache(path, match_threshold=1.0)
+    stale.set("floods", headlines("old"), stored_at=time.time() - 60)
+    fresh = SearchCache(path, match_threshold=1.0)
+    fresh.put_headlines("floods", headlines("new"))
+
+    # Flushing the older entry afterwards neither overwrites the file nor keeps it in memory
+    stale.put_headlines("drought", headlines("drought"))
+    assert stale.get_headlines("floods") == headlines("new")
+    assert stale.read_entry("floods")["headlines"] == headlines("new")
+
+
+def test_writes_within_the_flush_delay_are_one_file_write(tmp_path):
+    path = tmp_path / "search_cache.pack"
+
+    async def main():
+        cache = SearchCache(path, flush_delay=0.02, match_threshold=1.0)
+        for topic in ("a", "b", "c"):
+            cache.put_headlines(topic, headlines(topic))
+        assert not path.exists() and cache.stats()["pending_write"]
+        await asyncio.sleep(0.1)
+        return cache
+
+    cache = asyncio.run(main())
+    assert cache.writes == 1 and not cache.stats()["pending_write"]
+    assert cache.read_entry("b")["headlines"] == headlines("b")
+
+
+def test_baseline_json_cache_is_migrated(tmp_path):
+    legacy = tmp_path / "search_cache.json"
+    today = datetime.now().strftime("%Y-%m-%d")
+    legacy.write_text(json.dumps({"lagos floods": {"date": today, "headlines": headlines("floods")}}))
+
+    cache = SearchCache(tmp_path / "search_cache.pack", ttl=2 * 86400, legacy_path=legacy)
+    cache.load()
+    assert cache.get_headlines("Lagos  Floods") == headlines("floods")
+    assert is_packed(cache.path) and cache.writes == 1
+    assert cache.read_entry("lagos floods")["headlines"] == headlines("floods")
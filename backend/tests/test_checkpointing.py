@@ -0,0 +1,49 @@
+import time
+
+from langgraph.checkpoint.base import empty_checkpoint
+
+from src.checkpointing import BoundedInMemorySaver, checkpoint_stats
+
+
+def write(saver, thread_id):
+    config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    saver.put(config, empty_checkpoint(), {}, {})
+
+
+def threads(saver):
+    return {thread for thread, namespaces in saver.storage.items() if any(namespaces.values())}
+
+
+def test_least_recently_used_finished_threads_are_evicted():
+    saver = BoundedInMemorySaver(max_threads=2, ttl=None)
+    for thread in ("a", "b", "c"):
+        write(saver, thread)
+    assert threads(saver) == {"b", "c"}
+    assert checkpoint_stats(saver)["evicted_threads"] == 1
+
+
+def test_threads_with_a_running_analysis_are_never_evicted():
+    saver = BoundedInMemorySaver(max_threads=2, ttl=None)
+    for thread in ("a", "b", "c", "d"):
+        saver.begin(thread)
+        write(saver, thread)
+    # More concurrent runs than max_threads: all of them keep their history
+    assert threads(saver) == {"a", "b", "c", "d"}
+
+    saver.end("a")
+    saver.end("b")
+    # Finished threads make room; the two still running count towards the limit
+    assert threads(saver) == {"c", "d"}
+    write(saver, "c")
+    assert threads(saver) == {"c", "d"}
+
+
+def test_expired_finished_threads_are_evicted(monkeypatch):
+    saver = BoundedInMemorySaver(max_threads=10, ttl=60)
+    saver.begin("running")
+    write(saver, "running")
+    write(saver, "finished")
+    now = time.time()
+    monkeypatch.setattr("src.checkpointing.time.time", lambda: now + 120)
+    write(saver, "new")
+    assert threads(saver) == {"running", "new"}
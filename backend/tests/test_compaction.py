@@ -0,0 +1,68 @@
+import pytest
+
+import src.compaction as compaction
+from src.compaction import DUPLICATE_NOTE, ToolOutputBudget, compact_results, load_tokenizer, relevant_passages
+
+
+def output(*urls):
+    return {"query": "lagos floods", "results": [
+        {"title": f"Story {i}", "url": url, "content": "Floods hit Lagos. Markets were calm. " * 20, "score": 0.9}
+        for i, url in enumerate(urls)
+    ]}
+
+
+def test_results_already_shown_in_a_conversation_keep_only_title_and_url():
+    budget = ToolOutputBudget(0)
+    compact_results(output("https://www.example.com/a/?utm_source=x"), "lagos floods", budget, "branch-1")
+    again = compact_results(output("https://example.com/a"), "lagos floods", budget, "branch-1")
+    assert again["results"][0]["content"] == DUPLICATE_NOTE
+    assert budget.seen("branch-1") == {"example.com/a"}
+
+    # Another research branch has its own message history
+    other = compact_results(output("https://example.com/a"), "lagos floods", budget, "branch-2")
+    assert other["results"][0]["content"] != DUPLICATE_NOTE
+    assert budget.duplicates == 1
+
+
+def test_input_is_not_modified_and_unused_fields_are_dropped():
+    raw = output("https://example.com/a")
+    compacted = compact_results(raw, "lagos floods", ToolOutputBudget(0))
+    assert "score" in raw["results"][0]
+    assert "score" not in compacted["results"][0]
+    assert len(compacted["results"][0]["content"]) < len(raw["results"][0]["content"])
+
+
+def test_results_past_the_budget_keep_only_title_and_url():
+    budget = ToolOutputBudget(60)
+    compacted = compact_results(output("https://example.com/a", "https://example.com/b"), "lagos floods", budget)
+    assert compacted["note"]
+    assert compacted["results"][-1] == {"title": "Story 1", "url": "https://example.com/b"}
+
+
+def test_errors_pass_through():
+    assert compact_results({"error": "rate limited"}, "q", ToolOutputBudget(0)) == {"error": "rate limited"}
+
+
+def test_passages_fit_max_chars_including_gap_marks():
+    sentences = [f"Sentence {i} is about {'lagos floods' if i % 3 == 0 else 'something else entirely'}." for i in range(40)]
+    content = " ".join(sentences)
+    for max_chars in (20, 50, 120, 300, 700):
+        text = relevant_passages(content, "lagos floods", max_chars)
+        assert len(text) <= max_chars
+    text = relevant_passages(content, "lagos floods", 120)
+    assert "… " in text and "lagos floods" in text
+
+
+def test_tokenizer_is_not_downloaded_unless_allowed(tmp_path, monkeypatch):
+    tiktoken = pytest.importorskip("tiktoken")
+    from tiktoken import load
+    # An empty cache: loading the encoding would need a download
+    monkeypatch.setenv("TIKTOKEN_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(compaction, "_encoder", None)
+    monkeypatch.setattr(compaction, "_encoder_loaded", False)
+    monkeypatch.setattr(tiktoken.registry, "ENCODINGS", {})
+    read_file = load.read_file
+
+    assert load_tokenizer(download=False) == "estimate"
+    assert load.read_file is read_file
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,74 @@
+import json
+import time
+
+from src.coordination import LeaderLease, SnapshotFile
+from src.packed import is_packed
+
+
+def test_one_process_holds_the_lease_until_it_expires(tmp_path):
+    path = tmp_path / "coordination.db"
+    leader = LeaderLease(path, "daily_refresh", owner="a", ttl=0.05)
+    other = LeaderLease(path, "daily_refresh", owner="b", ttl=0.05)
+    assert leader.acquire() and leader.acquire()
+    assert not other.acquire() and other.holder() == "a"
+
+    # A leader that stops renewing is replaced
+    time.sleep(0.1)
+    assert other.acquire() and not leader.acquire()
+    assert leader.stats()["holder"] == "b" and other.acquisitions == 1
+
+
+def test_released_lease_is_free_right_away(tmp_path):
+    path = tmp_path / "coordination.db"
+    leader = LeaderLease(path, "daily_refresh", owner="a")
+    other = LeaderLease(path, "daily_refresh", owner="b")
+    leader.acquire()
+    leader.release()
+    assert not leader.held and leader.holder() is None
+    assert other.acquire()
+
+
+def snapshot(*ranks):
+    return {"fetched_at": "2026-01-01T06:00:00", "news": [
+        {"rank": rank, "headline": f"Story {rank}", "analysis": None} for rank in ranks
+    ]}
+
+
+def test_stories_are_keyed_by_their_rank(tmp_path):
+    snapshots = SnapshotFile(tmp_path / "daily_news_cache.pack")
+    # A refresh that dropped story 2 keeps the others' ranks
+    snapshots.save(snapshot(3, 1, 4))
+    assert snapshots.load_story(3)["headline"] == "Story 3"
+    assert snapshots.load_story(2) is None
+    assert [story["rank"] for story in snapshots.load()["news"]] == [1, 3, 4]
+    assert snapshots.load()["fetched_at"] == "2026-01-01T06:00:00"
+
+
+def test_json_snapshot_is_migrated(tmp_path):
+    legacy = tmp_path / "daily_news_cache.json"
+    legacy.write_text(json.dumps(snapshot(1, 2)))
+    snapshots = SnapshotFile(tmp_path / "daily_news_cache.pack", legacy_path=legacy)
+    assert snapshots.load() == snapshot(1, 2)
+    assert is_packed(tmp_path / "daily_news_cache.pack")
+    assert snapshots.load_story(2)["headline"] == "Story 2"
+
+
+def test_other_processes_see_new_snapshots(tmp_path):
+    path = tmp_path / "daily_news_cache.pack"
+    leader, follower = SnapshotFile(path), SnapshotFile(path)
+    leader.save(snapshot(1))
+    assert follower.load() is not None
+    assert follower.load_if_changed() is None
+    leader.save(snapshot(1, 2))
+    assert len(follower.load_if_changed()["news"]) == 2
+    assert follower.reloads == 1
+    # Its own writes don't count as changes
+    assert leader.load_if_changed() is None
+
+
+def test_unreadable_snapshot_loads_as_none(tmp_path):
+    path = tmp_path / "daily_news_cache.pack"
+    path.write_bytes(b"NCPK\x01garbage")
+    snapshots = SnapshotFile(path)
+    assert snapshots.load() is None
+    assert snapshots.load_story(1) is None
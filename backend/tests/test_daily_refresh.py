@@ -0,0 +1,145 @@
+import asyncio
+from datetime import datetime
+
+from src.coordination import LeaderLease
+from src.daily_refresh import DailyNewsRefresher, today
+
+
+def snapshot(label, date=None):
+    return {"date": date or today(), "fetched_at": datetime.now().isoformat(), "label": label,
+            "news": [{"headline": label}]}
+
+
+class Builds:
+    """Build function recording its calls, failing the first `failures` of them"""
+
+    def __init__(self, failures=0, seconds=0.0):
+        self.calls = 0
+        self.failures = failures
+        self.seconds = seconds
+
+    async def __call__(self, progress):
+        self.calls += 1
+        progress(0, 1)
+        await asyncio.sleep(self.seconds)
+        if self.calls <= self.failures:
+            raise RuntimeError("search provider down")
+        progress(1, 1)
+        return snapshot(f"build {self.calls}")
+
+
+async def until(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+def test_stale_snapshot_is_rebuilt_while_the_old_one_is_served():
+    async def main():
+        build = Builds(seconds=0.05)
+        refresher = DailyNewsRefresher(build, snapshot=snapshot("yesterday", date="2000-01-01"), poll_interval=0.01)
+        await refresher.start()
+        await until(lambda: refresher.running)
+        served = refresher.snapshot["label"]
+        await until(lambda: not refresher.is_stale())
+        status = refresher.status()
+        await refresher.stop()
+        return build, served, refresher, status
+
+    build, served, refresher, status = asyncio.run(main())
+    assert served == "yesterday"
+    assert build.calls == 1 and refresher.snapshot["label"] == "build 1"
+    assert status["progress"] == {"completed": 1, "total": 1}
+    assert status["role"] == "leader" and status["next_run"] is not None
+
+
+def test_failed_build_keeps_the_snapshot_and_retries_later():
+    async def main():
+        build = Builds(failures=1)
+        refresher = DailyNewsRefresher(build, snapshot=snapshot("yesterday", date="2000-01-01"),
+                                       retry_delay=0.05, poll_interval=0.01)
+        await refresher.start()
+        await until(lambda: build.calls == 1 and not refresher.running)
+        failed = refresher.status()
+        await until(lambda: not refresher.is_stale())
+        await refresher.stop()
+        return build, failed, refresher
+
+    build, failed, refresher = asyncio.run(main())
+    assert failed["last_error"] == "search provider down"
+    assert failed["snapshot_date"] == "2000-01-01"
+    assert build.calls == 2 and refresher.last_error is None
+
+
+def test_interval_mode_rebuilds_on_every_tick():
+    async def main():
+        build = Builds()
+        refresher = DailyNewsRefresher(build, snapshot=snapshot("today"), interval=0.02, poll_interval=0.01)
+        await refresher.start()
+        await until(lambda: build.calls >= 3)
+        await refresher.stop()
+        return refresher
+
+    assert asyncio.run(main()).snapshot["label"].startswith("build")
+
+
+def test_concurrent_refreshes_share_one_build():
+    async def main():
+        build = Builds(seconds=0.02)
+        refresher = DailyNewsRefresher(build)
+        return build, await asyncio.gather(refresher.refresh(), refresher.refresh())
+
+    build, results = asyncio.run(main())
+    assert build.calls == 1 and results == [True, True]
+
+
+def test_only_complete_snapshots_are_picked_up():
+    saved = {"data": {"error": "No headlines analyzed"}}
+    refresher = DailyNewsRefresher(Builds(), snapshot=snapshot("ours"), reload=lambda: saved["data"])
+    assert not refresher.pick_up_snapshot()
+    saved["data"] = {"news": []}
+    assert not refresher.pick_up_snapshot()
+    saved["data"] = snapshot("theirs")
+    assert refresher.pick_up_snapshot()
+    assert refresher.snapshot["label"] == "theirs"
+
+
+def test_two_processes_sharing_a_lease_build_once(tmp_path):
+    async def main(path):
+        saved = {}
+        builds = {}
+
+        def process(name):
+            async def build(progress):
+                builds[name] = builds.get(name, 0) + 1
+                saved["data"] = snapshot(f"built by {name}")
+                return saved["data"]
+
+            def reload():
+                data = saved.get("data")
+                return data if data is not None and data is not refreshers[name].snapshot else None
+
+            lease = LeaderLease(path, "daily_refresh", owner=name, ttl=0.3)
+            return DailyNewsRefresher(build, lease=lease, reload=reload, poll_interval=0.02)
+
+        refreshers = {}
+        for name in ("a", "b"):
+            refreshers[name] = process(name)
+            await refreshers[name].start()
+        await until(lambda: all(refresher.snapshot is not None for refresher in refreshers.values()))
+        roles = {name: refresher.status()["role"] for name, refresher in refreshers.items()}
+        labels = {name: refresher.snapshot["label"] for name, refresher in refreshers.items()}
+
+        # The leader shuts down and hands the lease over
+        await refreshers["a"].stop()
+        await until(lambda: refreshers["b"].is_leader())
+        await refreshers["b"].stop()
+        for refresher in refreshers.values():
+            refresher.lease.close()
+        return builds, roles, labels
+
+    builds, roles, labels = asyncio.run(main(tmp_path / "coordination.db"))
+    assert builds == {"a": 1}
+    assert roles == {"a": "leader", "b": "follower"}
+    assert labels == {"a": "built by a", "b": "built by a"}
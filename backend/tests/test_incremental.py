@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.incremental import plan_refresh
+
+
+def snapshot(*items, age=timedelta(hours=1)):
+    analyzed_at = (datetime.now() - age).isoformat()
+    return {"fetched_at": analyzed_at, "news": [
+        {"rank": rank, "headline": headline, "url": url, "analysis": {"headline": headline}, "analyzed_at": analyzed_at}
+        for rank, (headline, url) in enumerate(items, 1)
+    ]}
+
+
+def candidate(headline, url=""):
+    return {"headline": headline, "url": url}
+
+
+def test_first_build_analyzes_everything():
+    plan = plan_refresh([candidate("Floods hit Lagos"), candidate("Markets rally")], None)
+    assert [(entry["rank"], entry["action"]) for entry in plan] == [(1, "new"), (2, "new")]
+
+
+def test_same_article_url_is_reused_even_with_a_new_headline():
+    previous = snapshot(("Floods hit Lagos", "https://www.example.com/lagos-floods/?utm_source=rss"))
+    plan = plan_refresh([candidate("Lagos flood toll rises", "http://example.com/lagos-floods")], previous)
+    assert plan[0]["action"] == "reuse"
+    assert plan[0]["previous"]["headline"] == "Floods hit Lagos"
+
+
+def test_continuing_story_gets_the_configured_action():
+    previous = snapshot(("Lagos floods displace thousands of residents", ""))
+    today = [candidate("Lagos floods displace thousands more residents")]
+    assert plan_refresh(today, previous)[0]["action"] == "update"
+    assert plan_refresh(today, previous, continuing="reuse")[0]["action"] == "reuse"
+    assert plan_refresh(today, previous, continuing="full")[0]["action"] == "new"
+
+
+def test_different_stories_are_not_matched():
+    previous = snapshot(("Earthquake hits Turkey", ""))
+    assert plan_refresh([candidate("Election results in Kenya")], previous)[0]["action"] == "new"
+
+
+def test_stale_exact_match_is_updated_not_reused():
+    previous = snapshot(("Floods hit Lagos", ""), age=timedelta(days=3))
+    assert plan_refresh([candidate("Floods hit Lagos")], previous)[0]["action"] == "update"
+
+
+def test_each_previous_item_matches_once_best_first():
+    previous = snapshot(("Floods hit Lagos", ""))
+    plan = plan_refresh([candidate("Lagos floods hit thousands"), candidate("Floods hit Lagos")], previous)
+    assert [entry["action"] for entry in plan] == ["new", "reuse"]
+
+
+def test_unknown_continuing_action_is_rejected():
+    with pytest.raises(ValueError):
+        plan_refresh([], None, continuing="skip")
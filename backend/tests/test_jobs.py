@@ -0,0 +1,93 @@
+import time
+
+from src.jobs import JOBS_RETRY_BASE, JobQueue
+
+
+def queue(tmp_path):
+    return JobQueue(tmp_path / "jobs.db")
+
+
+def test_claims_take_the_highest_priority_oldest_job(tmp_path):
+    jobs = queue(tmp_path)
+    low = jobs.enqueue("Global", "low", priority="low")
+    first = jobs.enqueue("Global", "first")
+    second = jobs.enqueue("Global", "second")
+    assert [jobs.claim("w")["id"] for _ in range(3)] == [first["id"], second["id"], low["id"]]
+    assert jobs.claim("w") is None
+
+
+def test_duplicate_requests_share_a_job_and_raise_its_priority(tmp_path):
+    jobs = queue(tmp_path)
+    job = jobs.enqueue("Lagos", "Floods", priority="low")
+    again = jobs.enqueue("lagos", "floods", priority="high")
+    assert again["id"] == job["id"]
+    assert again["priority"] == "high"
+
+
+def test_a_lease_that_runs_out_is_claimed_by_another_worker(tmp_path):
+    jobs = queue(tmp_path)
+    job = jobs.enqueue("Global", "topic")
+    assert jobs.claim("dead", lease=-1)["id"] == job["id"]
+
+    taken = jobs.claim("alive")
+    assert taken["id"] == job["id"] and taken["attempts"] == 2
+    # The first worker lost its lease: its result is not accepted
+    assert not jobs.complete(job["id"], "dead", '{"headline": "late"}')
+    assert jobs.complete(job["id"], "alive", '{"headline": "done"}')
+    assert jobs.get(job["id"])["status"] == "done"
+
+
+def test_expired_lease_with_no_attempts_left_fails_the_job(tmp_path):
+    jobs = queue(tmp_path)
+    job = jobs.enqueue("Global", "topic", max_attempts=1)
+    jobs.claim("dead", lease=-1)
+    assert jobs.claim("alive") is None
+    assert jobs.get(job["id"])["status"] == "failed"
+
+
+def test_transient_failures_are_retried_with_backoff(tmp_path):
+    jobs = queue(tmp_path)
+    job = jobs.enqueue("Global", "topic", max_attempts=2)
+    jobs.claim("w")
+    before = time.time()
+    assert jobs.fail(job["id"], "w", "429 rate limited", transient=True) == "queued"
+    retry = jobs.get(job["id"])
+    assert before + JOBS_RETRY_BASE * 0.5 <= retry["available_at"] <= time.time() + JOBS_RETRY_BASE
+    # Not runnable until the backoff is over
+    assert jobs.claim("w") is None
+
+
+def test_failures_are_final_when_permanent_or_out_of_attempts(tmp_path):
+    jobs = queue(tmp_path)
+    permanent = jobs.enqueue("Global", "bad request")
+    jobs.claim("w")
+    assert jobs.fail(permanent["id"], "w", "invalid topic", transient=False) == "failed"
+
+    last = jobs.enqueue("Global", "topic", max_attempts=1)
+    jobs.claim("w")
+    assert jobs.fail(last["id"], "w", "timeout", transient=True) == "failed"
+    assert jobs.get(last["id"])["error"] == "timeout"
+
+
+def test_released_jobs_do_not_use_up_an_attempt(tmp_path):
+    jobs = queue(tmp_path)
+    job = jobs.enqueue("Global", "topic")
+    jobs.claim("w")
+    assert jobs.release(job["id"], "w")
+    assert jobs.claim("w2")["attempts"] == 1
+
+
+def test_purge_removes_only_old_finished_jobs(tmp_path):
+    jobs = queue(tmp_path)
+    done = jobs.enqueue("Global", "done")
+    failed = jobs.enqueue("Global", "failed")
+    waiting = jobs.enqueue("Global", "waiting")
+    jobs.claim("w")
+    jobs.complete(done["id"], "w", "{}")
+    jobs.claim("w")
+    jobs.fail(failed["id"], "w", "invalid topic", transient=False)
+
+    assert jobs.purge_finished(older_than=60) == 0
+    assert jobs.purge_finished(older_than=-1) == 2
+    assert jobs.get(done["id"]) is None and jobs.get(failed["id"]) is None
+    assert jobs.get(waiting["id"])["status"] == "queued"
@@ -0,0 +1,80 @@
+from src.outlets import OutletRegistry, outlet_domain
+
+
+def source(url, leaning="left", kind="mainstream"):
+    return {"name": outlet_domain(url), "url": url, "political_leaning": leaning, "type": kind}
+
+
+def analysis(n, perspectives):
+    return {"location": "Global", "topic": f"story {n}", "headline": f"Story {n}",
+            "date_analyzed": f"2026-01-0{n}", "perspectives": perspectives}
+
+
+def perspective(sources, ownership="Acme Media Group", supporters=("Party A",)):
+    return {"sources": sources, "supporter_info": {"ownership": ownership, "supporters": list(supporters),
+                                                   "funding_sources": ["Advertising"]}}
+
+
+def test_multi_outlet_perspective_records_only_per_source_fields(tmp_path):
+    registry = OutletRegistry(tmp_path / "outlets.db", min_observations=1)
+    registry.record_analysis(analysis(1, [perspective([
+        source("https://www.bbc.co.uk/news/1", "center", "public"),
+        source("https://foxnews.com/politics/2", "right"),
+    ])]))
+
+    bbc = registry.get("bbc.co.uk")
+    assert bbc["political_leaning"] == "center"
+    assert bbc["type"] == "public"
+    # The perspective's owner is not every cited outlet's owner
+    assert bbc["ownership"] == "unknown"
+    assert bbc["supporters"] == [] and bbc["funding_sources"] == []
+    assert registry.get("foxnews.com")["ownership"] == "unknown"
+
+
+def test_single_outlet_perspective_attributes_supporter_info(tmp_path):
+    registry = OutletRegistry(tmp_path / "outlets.db", min_observations=1)
+    registry.record_analysis(analysis(1, [
+        perspective([source("https://foxnews.com/a", "right"), source("https://foxnews.com/b", "right")],
+                    ownership="Fox Corporation", supporters=("Conservatives",)),
+        perspective([source("https://bbc.co.uk/a"), source("https://cnn.com/b")], ownership="Someone else"),
+    ]))
+
+    fox = registry.get("foxnews.com")
+    assert fox["ownership"] == "Fox Corporation"
+    assert fox["supporters"] == ["Conservatives"]
+    assert registry.get("cnn.com")["ownership"] == "unknown"
+
+
+def test_supporter_majority_counts_only_attributing_analyses(tmp_path):
+    registry = OutletRegistry(tmp_path / "outlets.db", min_observations=1)
+    registry.record_analysis(analysis(1, [perspective([source("https://foxnews.com/a")], supporters=("Conservatives",))]))
+    # Two analyses cite the outlet alongside others: they say nothing about its supporters
+    for n in (2, 3):
+        registry.record_analysis(analysis(n, [perspective([source("https://foxnews.com/a"), source("https://cnn.com/b")],
+                                                          supporters=("Someone else",))]))
+
+    fox = registry.get("foxnews.com")
+    assert fox["analyses"] == 3
+    assert fox["supporters"] == ["Conservatives"]
+
+
+def test_unknown_until_min_observations(tmp_path):
+    registry = OutletRegistry(tmp_path / "outlets.db", min_observations=2)
+    registry.record_analysis(analysis(1, [perspective([source("https://foxnews.com/a", "right")])]))
+    assert registry.get("foxnews.com") is None
+
+    # Recording the same analysis again does not count as a second observation
+    assert registry.record_analysis(analysis(1, [perspective([source("https://foxnews.com/a", "right")])])) is False
+    assert registry.get("foxnews.com") is None
+
+    registry.record_analysis(analysis(2, [perspective([source("https://foxnews.com/b", "right")])]))
+    assert registry.get("foxnews.com")["political_leaning"] == "right"
+
+
+def test_platform_domains_are_not_outlets(tmp_path):
+    registry = OutletRegistry(tmp_path / "outlets.db", min_observations=1)
+    registry.record_analysis(analysis(1, [perspective([source("https://www.youtube.com/watch?v=1"),
+                                                       source("https://foxnews.com/a")])]))
+    assert registry.get("youtube.com") is None
+    # The platform link doesn't count as a second outlet either
+    assert registry.get("foxnews.com")["ownership"] == "Acme Media Group"
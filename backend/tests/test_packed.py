@@ -0,0 +1,45 @@
+import pytest
+
+from src.packed import MAGIC, PackedFormatError, PackedReader, is_packed, pack, unpack_file
+
+
+def write(path, meta, records):
+    path.write_bytes(pack(meta, records))
+    return path
+
+
+def test_round_trip(tmp_path):
+    records = {str(i): {"headline": f"Story {i}", "analysis": {"perspectives": ["a" * 1000]}} for i in range(200)}
+    path = write(tmp_path / "cache.pack", {"fetched_at": "2026-01-01"}, records)
+    assert is_packed(path)
+    assert unpack_file(path) == ({"fetched_at": "2026-01-01"}, records)
+
+
+def test_single_record_reads(tmp_path):
+    path = write(tmp_path / "cache.pack", {}, {"a": [1, 2], "b": {"nested": None}})
+    reader = PackedReader(path)
+    assert reader.get("b") == {"nested": None}
+    assert reader.get("missing") is None
+    assert "a" in reader and reader.keys() == ["a", "b"]
+
+
+def test_json_file_is_not_packed(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text('{"news": []}')
+    assert not is_packed(path)
+    with pytest.raises(PackedFormatError):
+        PackedReader(path)
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: data[:6],                                    # truncated prefix
+    lambda data: data[:9] + b"{not json" + data[18:],         # garbled header
+    lambda data: MAGIC + bytes([1, 0, 0, 0, 2]) + b"{}",      # header missing its fields
+    lambda data: MAGIC + bytes([99]) + data[5:],              # newer format version
+])
+def test_corrupt_files_raise_packed_format_error(tmp_path, corrupt):
+    data = pack({"fetched_at": "x"}, {"1": {"headline": "h"}})
+    path = tmp_path / "cache.pack"
+    path.write_bytes(corrupt(data))
+    with pytest.raises(PackedFormatError):
+        PackedReader(path)
@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+import src.prefetch as prefetch
+from src.prefetch import AnalysisExecutor, PrefetchEngine, is_rate_limit_error
+
+
+async def hold(executor, priority, order, name, seconds=0.01):
+    async with executor.slot(priority):
+        order.append(name)
+        await asyncio.sleep(seconds)
+
+
+def test_waiters_get_slots_by_priority_then_in_order():
+    async def main():
+        executor = AnalysisExecutor(concurrency=1)
+        order = []
+        first = asyncio.create_task(hold(executor, "normal", order, "first"))
+        await asyncio.sleep(0)
+        waiting = []
+        for name, priority in [("low", "low"), ("normal 1", "normal"), ("high", "high"), ("normal 2", "normal")]:
+            waiting.append(asyncio.create_task(hold(executor, priority, order, name)))
+            await asyncio.sleep(0)
+        assert executor.stats()["queued"] == 4
+        await asyncio.gather(first, *waiting)
+        return order, executor.stats()
+
+    order, stats = asyncio.run(main())
+    assert order == ["first", "high", "normal 1", "normal 2", "low"]
+    assert stats["running"] == 0 and stats["queued"] == 0
+
+
+def test_released_slot_goes_to_a_waiter_not_a_newcomer():
+    async def main():
+        executor = AnalysisExecutor(concurrency=1)
+        order = []
+        first = asyncio.create_task(hold(executor, "normal", order, "first"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold(executor, "low", order, "waiter"))
+        await asyncio.sleep(0.015)
+        # The slot was handed to the waiter as the first holder left, so a newcomer queues
+        assert executor.running == 1
+        newcomer = asyncio.create_task(hold(executor, "high", order, "newcomer"))
+        await asyncio.gather(first, waiter, newcomer)
+        return order
+
+    assert asyncio.run(main()) == ["first", "waiter", "newcomer"]
+
+
+def test_cancelled_waiters_give_up_their_place():
+    async def main():
+        executor = AnalysisExecutor(concurrency=1)
+        order = []
+        first = asyncio.create_task(hold(executor, "normal", order, "first", seconds=0.02))
+        await asyncio.sleep(0)
+        leaving = asyncio.create_task(hold(executor, "high", order, "leaving"))
+        staying = asyncio.create_task(hold(executor, "low", order, "staying"))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        assert executor.stats()["queued"] == 1
+        await asyncio.gather(first, staying)
+        return order, executor.running
+
+    order, running = asyncio.run(main())
+    assert order == ["first", "staying"]
+    assert running == 0
+
+
+def test_waiter_cancelled_as_the_slot_arrives_passes_it_on():
+    async def main():
+        executor = AnalysisExecutor(concurrency=1)
+        order = []
+        blocker = executor.slot()
+        await blocker.__aenter__()
+        unlucky = asyncio.create_task(hold(executor, "high", order, "unlucky"))
+        other = asyncio.create_task(hold(executor, "low", order, "other"))
+        await asyncio.sleep(0)
+        # Hand the slot to `unlucky` and cancel it before it gets to run
+        await blocker.__aexit__(None, None, None)
+        unlucky.cancel()
+        await asyncio.gather(unlucky, other, return_exceptions=True)
+        return order, executor.running
+
+    order, running = asyncio.run(main())
+    assert order == ["other"]
+    assert running == 0
+
+
+def test_rate_limited_analyses_back_off_without_holding_a_slot(monkeypatch):
+    monkeypatch.setattr(prefetch.random, "uniform", lambda low, high: high)
+    attempts = []
+
+    async def analyze(location, topic):
+        attempts.append(topic)
+        if topic == "limited" and attempts.count("limited") == 1:
+            raise RuntimeError("429 Too Many Requests")
+        await asyncio.sleep(0.01)
+        return topic
+
+    async def main():
+        executor = AnalysisExecutor(concurrency=1)
+        engine = PrefetchEngine(None, executor=executor, analyze=analyze, backoff_base=0.05, max_retries=1)
+        limited = asyncio.create_task(engine.analyze("Global", "limited"))
+        await asyncio.sleep(0)
+        other = asyncio.create_task(engine.analyze("Global", "other"))
+        results = await asyncio.gather(limited, other)
+        return results, executor.stats()["by_priority"]["normal"]
+
+    results, counters = asyncio.run(main())
+    # "other" ran while "limited" was backing off
+    assert attempts == ["limited", "other", "limited"]
+    assert results == ["limited", "other"]
+    assert counters == {"attempts": 3, "completed": 2, "failed": 0, "rate_limit_retries": 1}
+
+
+def test_gives_up_after_max_retries_and_on_other_errors():
+    async def limited(location, topic):
+        raise RuntimeError("RESOURCE_EXHAUSTED: quota")
+
+    async def broken(location, topic):
+        raise ValueError("bad output")
+
+    async def main():
+        executor = AnalysisExecutor(concurrency=1)
+        for analyze in (limited, broken):
+            engine = PrefetchEngine(None, executor=executor, analyze=analyze, backoff_base=0.001, max_retries=2)
+            with pytest.raises(RuntimeError if analyze is limited else ValueError):
+                await engine.analyze("Global", "topic")
+        return executor.stats()["by_priority"]["normal"]
+
+    counters = asyncio.run(main())
+    assert counters == {"attempts": 4, "completed": 0, "failed": 2, "rate_limit_retries": 2}
+
+
+def test_timeouts_are_reported_as_timeout_errors():
+    async def slow(location, topic):
+        await asyncio.sleep(1)
+
+    engine = PrefetchEngine(None, analyze=slow, timeout=0.01)
+    with pytest.raises(TimeoutError):
+        asyncio.run(engine.analyze("Global", "topic"))
+    assert engine.executor.running == 0
+
+
+def test_rate_limit_detection():
+    class QuotaError(Exception):
+        status_code = 429
+
+    assert is_rate_limit_error(QuotaError("slow down"))
+    assert is_rate_limit_error(RuntimeError("Rate limit exceeded"))
+    assert not is_rate_limit_error(ValueError("invalid JSON"))
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        PrefetchEngine(None, priority="urgent")
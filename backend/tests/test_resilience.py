@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from src import resilience
+from src.resilience import CircuitBreaker, CircuitOpenError, run_stage
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class Unavailable(Exception):
+    status_code = 503
+
+
+def flaky(*errors):
+    """Stage call failing with `errors` in turn, then returning "ok"; counts its calls"""
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+    return call, calls
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(resilience, "STAGE_RETRY_BACKOFF", 0)
+
+
+def test_stage_is_run_again_after_an_upstream_error():
+    call, calls = flaky(Unavailable("service unavailable"))
+    assert asyncio.run(run_stage("synthesize", call, attempts=2)) == "ok"
+    assert len(calls) == 2
+
+
+def test_rate_limits_are_not_retried_per_stage():
+    call, calls = flaky(RateLimited("quota exceeded"))
+    with pytest.raises(RateLimited):
+        asyncio.run(run_stage("synthesize", call, attempts=3))
+    assert len(calls) == 1
+
+
+def test_stage_gives_up_after_its_attempts():
+    call, calls = flaky(Unavailable("1"), Unavailable("2"))
+    with pytest.raises(Unavailable):
+        asyncio.run(run_stage("synthesize", call, attempts=2))
+    assert len(calls) == 2
+
+
+def test_circuit_opens_after_consecutive_failures_and_rejects_calls():
+    breaker = CircuitBreaker("llm", failure_threshold=2, reset_timeout=30)
+    breaker.record_failure(Unavailable("1"))
+    breaker.check()
+    breaker.record_failure(Unavailable("2"))
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    assert breaker.rejected == 1 and breaker.trips == 1
+
+
+def test_success_resets_the_failure_count_and_other_errors_do_not_count():
+    breaker = CircuitBreaker("llm", failure_threshold=2, reset_timeout=30)
+    breaker.record_failure(Unavailable("1"))
+    breaker.record_success()
+    breaker.record_failure(Unavailable("2"))
+    breaker.record_failure(ValueError("not about the upstream"))
+    assert breaker.state == "closed"
+
+
+def test_half_open_probe_closes_or_reopens_the_circuit():
+    breaker = CircuitBreaker("search", failure_threshold=1, reset_timeout=0)
+    breaker.record_failure(RateLimited("429"))
+    assert breaker.state == "open"
+    # Reset timeout over: one probe goes through
+    breaker.check()
+    assert breaker.state == "half_open"
+    breaker.record_failure(Unavailable("still down"))
+    assert breaker.state == "open" and breaker.trips == 2
+    breaker.check()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.search_client import CachedSearchClient, SearchClient, SearchError, TokenBucket
+
+
+class CountingSearch:
+    """Search provider counting upstream requests; queries containing fail raise SearchError"""
+
+    def __init__(self, seconds=0.01):
+        self.calls = []
+        self.seconds = seconds
+
+    async def search(self, query, max_results=None, **params):
+        self.calls.append(query)
+        await asyncio.sleep(self.seconds)
+        if "fail" in query:
+            raise SearchError(502, "upstream down")
+        return {"query": query, "results": [{"title": query}]}
+
+    async def aclose(self):
+        pass
+
+    def stats(self):
+        return {"requests": len(self.calls)}
+
+
+def test_token_bucket_allows_a_burst_then_paces_requests():
+    async def main():
+        bucket = TokenBucket(rate=50, capacity=2)
+        started = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - started, bucket.waited
+
+    elapsed, waited = asyncio.run(main())
+    # Two tokens saved up, then one every 20 ms
+    assert 0.03 <= elapsed < 0.2
+    assert waited >= 0.03
+
+
+def test_token_bucket_without_a_rate_never_waits():
+    async def main():
+        bucket = TokenBucket(rate=0, capacity=1)
+        for _ in range(100):
+            await bucket.acquire()
+        return bucket.waited
+
+    assert asyncio.run(main()) == 0
+
+
+def test_search_client_is_rate_limited_and_reports_errors():
+    requests = []
+
+    def respond(request):
+        requests.append(time.monotonic())
+        if b"broken" in request.content:
+            return httpx.Response(401, json={"detail": {"error": "Unauthorized: missing or invalid API key."}})
+        return httpx.Response(200, json={"query": "ok", "results": []})
+
+    async def main():
+        client = SearchClient("key", requests_per_minute=3000, burst=1)
+        client._client = httpx.AsyncClient(base_url="https://tavily.test", transport=httpx.MockTransport(respond))
+        await asyncio.gather(*(client.search(f"query {i}") for i in range(3)))
+        with pytest.raises(SearchError) as error:
+            await client.search("broken")
+        await client.aclose()
+        return client.stats(), error.value
+
+    stats, error = asyncio.run(main())
+    assert error.status_code == 401 and "invalid API key" in str(error)
+    assert stats["requests"] == 4 and stats["errors"] == 1 and stats["in_flight"] == 0
+    # 50 requests a second after the first: at least 20 ms between requests
+    assert requests[2] - requests[0] >= 0.035
+    assert stats["rate_limit_wait_seconds"] > 0
+
+
+def test_identical_queries_share_one_request_and_are_cached():
+    upstream = CountingSearch()
+
+    async def main():
+        client = CachedSearchClient(upstream, ttl=60)
+        results = await asyncio.gather(client.search("Lagos floods"), client.search(" lagos  FLOODS? "))
+        again = await client.search('"lagos floods"')
+        other = await client.search("lagos floods", topic="news")
+        return client, results, again, other
+
+    client, results, again, other = asyncio.run(main())
+    assert results[0] is results[1] is again
+    assert other is not again
+    assert len(upstream.calls) == 2
+    stats = client.stats()["result_cache"]
+    assert stats["coalesced"] == 1 and stats["hits"] == 1
+    assert stats["requests_saved"] == 2 and stats["saved_rate"] == 0.5
+
+
+def test_expired_results_are_fetched_again_and_errors_are_not_cached():
+    upstream = CountingSearch(seconds=0)
+
+    async def main():
+        client = CachedSearchClient(upstream, ttl=0.02)
+        await client.search("floods")
+        await asyncio.sleep(0.05)
+        await client.search("floods")
+        for _ in range(2):
+            with pytest.raises(SearchError):
+                await client.search("fail")
+
+    asyncio.run(main())
+    assert upstream.calls == ["floods", "floods", "fail", "fail"]
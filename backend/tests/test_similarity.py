@@ -0,0 +1,52 @@
+import pytest
+
+from src.similarity import HEADLINE_DUPLICATE_THRESHOLD, cluster_texts, headline_similarity, normalize_url, text_similarity
+
+# Different stories whose headlines differ in one word
+DISTINCT_STORIES = [
+    ("Trump signs executive order on AI", "Trump signs executive order on tariffs"),
+    ("US election", "UK election"),
+    ("Earthquake hits Japan", "Earthquake hits Turkey"),
+]
+
+# The same story as reported by different outlets
+SAME_STORY = [
+    ("Trump signs executive order on AI", "Trump signs AI executive order"),
+    ("Protests in Lagos, Nigeria", "Lagos Nigeria protests - latest news"),
+    ("Fed raises interest rates", "Fed raises interest rate"),
+]
+
+
+@pytest.mark.parametrize("a, b", DISTINCT_STORIES)
+def test_distinct_stories_are_below_the_duplicate_threshold(a, b):
+    assert headline_similarity(a, b) < HEADLINE_DUPLICATE_THRESHOLD
+    assert len(cluster_texts([a, b])) == 2
+
+
+@pytest.mark.parametrize("a, b", SAME_STORY)
+def test_same_story_is_merged(a, b):
+    assert headline_similarity(a, b) >= HEADLINE_DUPLICATE_THRESHOLD
+    assert cluster_texts([a, b]) == [[0, 1]]
+
+
+def test_cluster_keeps_input_order_and_first_as_representative():
+    texts = ["Fed raises interest rates", "US election", "Fed raises interest rate", "UK election"]
+    assert cluster_texts(texts) == [[0, 2], [1], [3]]
+    assert cluster_texts([]) == []
+
+
+def test_headline_without_significant_words_matches_nothing():
+    assert headline_similarity("The latest news", "The latest news") == 0.0
+
+
+def test_topic_signature_similarity_tolerates_spelling():
+    # Search topics still use the character-shingle MinHash
+    assert text_similarity("lagos, nigeria news", "Lagos Nigeria") == 1.0
+    assert text_similarity("climate change", "climate chnage") > 0.5
+
+
+def test_normalize_url_ignores_presentation_but_keeps_article_ids():
+    assert normalize_url("https://www.Example.com/world/story/?utm_source=x#top") == "example.com/world/story"
+    assert normalize_url("example.com/world/story") == "example.com/world/story"
+    assert normalize_url("https://example.com/article?id=1") != normalize_url("https://example.com/article?id=2")
+    assert normalize_url("") == ""
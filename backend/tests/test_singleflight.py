@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from src.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_run():
+    flights = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["result"] * 5
+    assert len(runs) == 1
+    assert flights.stats() == {"in_flight": 0, "started": 1, "coalesced": 4}
+
+
+def test_finished_keys_run_again_and_errors_reach_every_caller():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def main():
+        results = await asyncio.gather(flights.do("key", fail), flights.do("key", fail), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert not flights.is_running("key")
+        assert await flights.do("key", lambda: asyncio.sleep(0, "again")) == "again"
+
+    asyncio.run(main())
+    assert flights.started == 2
+
+
+def test_one_cancelled_caller_does_not_cancel_the_shared_run():
+    flights = SingleFlight()
+
+    async def main():
+        done = asyncio.Event()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            done.set()
+            return "result"
+
+        leaving = asyncio.create_task(flights.do("key", work))
+        staying = asyncio.create_task(flights.do("key", work))
+        await asyncio.sleep(0.01)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        assert await staying == "result"
+        assert done.is_set()
+
+    asyncio.run(main())
+
+
+def test_run_is_cancelled_when_its_last_caller_is():
+    flights = SingleFlight()
+    started, cancelled = [], []
+
+    async def work():
+        started.append(1)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def main():
+        callers = [asyncio.create_task(flights.do("key", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        assert not flights.is_running("key")
+
+    asyncio.run(main())
+    assert started == [1] and cancelled == [1]
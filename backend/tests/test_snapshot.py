@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from starlette.requests import Request
+
+from src.daily_refresh import snapshot_last_modified
+from src.snapshot import EncodedSnapshot
+
+SNAPSHOT = {"date": "2026-01-01", "fetched_at": "2026-01-01T06:00:00", "news": [{"rank": 1, "headline": "Story"}]}
+
+
+def request(**headers):
+    return Request({"type": "http", "method": "GET", "path": "/daily-news",
+                    "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]})
+
+
+def encoded(stale):
+    return EncodedSnapshot({**SNAPSHOT, "stale": stale}, last_modified=snapshot_last_modified(SNAPSHOT, stale))
+
+
+def test_last_modified_advances_when_the_snapshot_goes_stale():
+    fresh, stale = encoded(False), encoded(True)
+    assert fresh.etag != stale.etag
+    assert stale.last_modified > fresh.last_modified
+    assert snapshot_last_modified(SNAPSHOT, True) == datetime(2026, 1, 2).astimezone()
+
+
+def test_clients_with_the_fresh_copy_get_the_stale_one():
+    fresh, stale = encoded(False), encoded(True)
+    by_date = request(if_modified_since=fresh.last_modified_http)
+    assert fresh.response(by_date).status_code == 304
+    assert stale.response(by_date).status_code == 200
+    assert stale.response(request(if_none_match=fresh.etag)).status_code == 200
+    assert stale.response(request(if_none_match=stale.etag)).status_code == 304
+
+
+def test_snapshot_fetched_after_its_date_keeps_its_fetch_time():
+    late = {**SNAPSHOT, "fetched_at": datetime(2026, 1, 2, 9, 30).isoformat()}
+    assert snapshot_last_modified(late, True) == datetime(2026, 1, 2, 9, 30).astimezone()
+    assert snapshot_last_modified({"news": []}, True) is None
+
+
+def test_gzip_variant_is_served_when_accepted():
+    response = encoded(False).response(request(accept_encoding="gzip"))
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == encoded(False).etag
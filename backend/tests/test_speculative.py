@@ -0,0 +1,130 @@
+import asyncio
+
+from src.prefetch import AnalysisExecutor
+from src.speculative import SpeculativeAnalyzer
+
+
+class Harness:
+    """Fake analysis run and load around a SpeculativeAnalyzer"""
+
+    def __init__(self, seconds=0.05, **kwargs):
+        self.seconds = seconds
+        self.load = 0
+        self.cached = set()
+        self.runs = []
+        self.executor = AnalysisExecutor(concurrency=4)
+        kwargs.setdefault("max_jobs", 4)
+        kwargs.setdefault("check_interval", 0.01)
+        self.speculator = SpeculativeAnalyzer(
+            run=self.run,
+            key=lambda location, topic: (location, topic),
+            is_available=lambda location, topic: topic in self.cached,
+            load=lambda: self.load,
+            executor=self.executor,
+            enabled=True,
+            **kwargs,
+        )
+
+    async def run(self, location, topic):
+        self.runs.append(topic)
+        await asyncio.sleep(self.seconds)
+        self.cached.add(topic)
+
+    async def settle(self):
+        while self.speculator.stats()["running"] + self.speculator.stats()["queued"]:
+            await asyncio.sleep(0.005)
+
+
+def test_only_the_top_headlines_within_budget_are_scheduled():
+    async def main():
+        harness = Harness(top_k=3, max_jobs=2)
+        harness.cached.add("cached")
+        assert harness.speculator.submit("Global", ["cached", "a", "b", "c", "d"]) == 2
+        await harness.settle()
+        return harness
+
+    harness = asyncio.run(main())
+    stats = harness.speculator.stats()
+    assert harness.runs == ["a", "b"]
+    assert stats["skipped_available"] == 1 and stats["skipped_budget"] == 0
+    assert stats["completed"] == 2 and stats["awaiting_claim"] == 2
+
+
+def test_budget_skips_headlines_while_speculation_is_running():
+    async def main():
+        harness = Harness(max_jobs=1)
+        assert harness.speculator.submit("Global", ["a", "b"]) == 1
+        assert harness.speculator.submit("Global", ["c"]) == 0
+        await harness.settle()
+        return harness
+
+    harness = asyncio.run(main())
+    assert harness.runs == ["a"]
+    assert harness.speculator.stats()["skipped_budget"] == 2
+
+
+def test_nothing_starts_under_load():
+    async def main():
+        harness = Harness(max_load=2)
+        harness.load = 2
+        assert harness.speculator.submit("Global", ["a", "b"]) == 0
+        return harness
+
+    harness = asyncio.run(main())
+    assert harness.runs == []
+    assert harness.speculator.stats()["skipped_load"] == 2
+
+
+def test_unclaimed_runs_are_cancelled_when_load_rises():
+    async def main():
+        harness = Harness(seconds=10, max_load=2)
+        harness.speculator.submit("Global", ["a", "b"])
+        await asyncio.sleep(0.02)
+        # A request joins "a"; "b" is nobody's yet
+        assert harness.speculator.claim("Global", "a") == "in_flight"
+        harness.load = 2
+        await asyncio.sleep(0.05)
+        stats = harness.speculator.stats()
+        await harness.speculator.close()
+        return stats
+
+    stats = asyncio.run(main())
+    assert stats["cancelled"] == 1
+    assert stats["running"] == 1
+    assert stats["hits"] == {"cached": 0, "in_flight": 1}
+
+
+def test_claims_while_running_and_after_finishing():
+    async def main():
+        harness = Harness(seconds=0.05)
+        harness.speculator.submit("Global", ["running", "finished"])
+        await asyncio.sleep(0.01)
+        in_flight = harness.speculator.claim("Global", "running")
+        await harness.settle()
+        cached = harness.speculator.claim("Global", "finished")
+        # Each run answers one claim
+        again = harness.speculator.claim("Global", "finished")
+        return in_flight, cached, again, harness.speculator.stats()
+
+    in_flight, cached, again, stats = asyncio.run(main())
+    assert (in_flight, cached, again) == ("in_flight", "cached", None)
+    assert stats["hits"] == {"cached": 1, "in_flight": 1}
+    assert stats["hit_rate"] == 1.0
+    assert stats["wasted_work_rate"] == 0.0
+    assert stats["awaiting_claim"] == 0
+
+
+def test_runs_not_claimed_within_the_hit_window_are_wasted():
+    async def main():
+        harness = Harness(seconds=0.01, hit_window=0.02)
+        harness.speculator.submit("Global", ["a", "b"])
+        await harness.settle()
+        assert harness.speculator.claim("Global", "a") == "cached"
+        await asyncio.sleep(0.05)
+        assert harness.speculator.claim("Global", "b") is None
+        return harness.speculator.stats()
+
+    stats = asyncio.run(main())
+    assert stats["expired"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert 0 < stats["wasted_work_rate"] < 1
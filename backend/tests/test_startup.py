@@ -0,0 +1,14 @@
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("src.agent", "langchain_core", "langsmith", "langchain_google_genai", "langchain.agents",
+                 "langgraph", "langchain_tavily")
+
+
+def test_importing_the_api_does_not_load_the_agent_stack():
+    # A fresh interpreter: this test process may have imported the agent already
+    code = f"import sys, src.main; print([name for name in {HEAVY_MODULES!r} if name in sys.modules])"
+    output = subprocess.run([sys.executable, "-c", code], cwd=BACKEND, capture_output=True, text=True, check=True)
+    assert output.stdout.strip().splitlines()[-1] == "[]"
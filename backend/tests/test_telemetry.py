@@ -0,0 +1,32 @@
+from src.telemetry import Counter, Histogram, register_collected, render_metrics
+
+
+def test_counter_samples_escape_label_values():
+    counter = Counter("test_requests_total", "Requests", ("path",))
+    counter.inc(path='/a"b')
+    counter.inc(2, path='/a"b')
+    assert counter.samples() == ['test_requests_total{path="/a\\"b"} 3']
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("test_seconds", "Latency", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value)
+    assert histogram.samples() == [
+        'test_seconds_bucket{le="0.1"} 1',
+        'test_seconds_bucket{le="1"} 2',
+        'test_seconds_bucket{le="+Inf"} 3',
+        "test_seconds_sum 5.55",
+        "test_seconds_count 3",
+    ]
+
+
+def test_collected_values_are_read_on_every_scrape():
+    size = {"value": 1}
+    register_collected("test_cache_size", "Entries", lambda: {("search",): size["value"]}, ("cache",))
+    register_collected("test_broken", "Fails to read", lambda: 1 / 0)
+    assert 'test_cache_size{cache="search"} 1' in render_metrics()
+    size["value"] = 2
+    output = render_metrics()
+    assert 'test_cache_size{cache="search"} 2' in output
+    assert "test_broken" not in output
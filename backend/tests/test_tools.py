@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from src.fakes import FakeSearchProvider
+from src.tools import CompactSearchTool, SharedTavilySearch
+
+
+class RecordingSearch:
+    """Search provider that remembers which event loop each search ran on"""
+
+    def __init__(self):
+        self.loops = []
+
+    async def search(self, query, **params):
+        self.loops.append(asyncio.get_running_loop())
+        return {"query": query, "results": [{"title": query, "url": "https://example.com/a", "content": "text"}]}
+
+
+def test_search_tool_invoke_without_a_running_loop():
+    tool = SharedTavilySearch(client=FakeSearchProvider(latency_ms=0, error_rate=0))
+    output = tool.invoke({"query": "lagos floods"})
+    assert output["results"]
+
+
+def test_search_tool_invoke_from_a_thread_uses_the_clients_loop():
+    client = RecordingSearch()
+    tool = SharedTavilySearch(client=client)
+
+    async def main():
+        await tool.ainvoke({"query": "first"})
+        return await asyncio.to_thread(tool.invoke, {"query": "second"})
+
+    output = asyncio.run(main())
+    assert output["query"] == "second"
+    assert client.loops[0] is client.loops[1]
+
+
+def test_search_tool_invoke_inside_the_loop_is_rejected():
+    tool = SharedTavilySearch(client=RecordingSearch())
+
+    async def main():
+        with pytest.raises(RuntimeError, match="ainvoke"):
+            tool._run("query")
+
+    asyncio.run(main())
+
+
+def test_compact_search_tool_invoke_compacts_per_thread():
+    tool = CompactSearchTool(SharedTavilySearch(client=RecordingSearch()))
+    tool.begin("thread-1")
+    config = {"configurable": {"thread_id": "thread-1"}}
+    tool.invoke({"query": "lagos"}, config)
+    second = tool.invoke({"query": "lagos"}, config)
+    assert second["results"][0]["url"] == "https://example.com/a"
+    assert tool.end("thread-1")["duplicates"] == 1
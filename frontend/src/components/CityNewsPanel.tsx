@@ -65,7 +65,9 @@ export default function CityNewsPanel({ cityName, country, cachedNews, onNewsFet
                 'Content-Type': 'application/json',
               },
               body: JSON.stringify({ 
-                topic: `${cityName} ${country}` 
+                topic: `${cityName} ${country}`,
+                // Same location the headlines are analyzed for, so the backend can pre-analyze them
+                location: `${cityName}, ${country}`
               }),
             });
             